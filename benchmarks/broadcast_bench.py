@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+观战广播性能测试
+
+主机按实际帧率运行一场AI对战AI并广播，另一个进程中的大量观众接收并解码，
+其中一部分观众只连接不读取（模拟卡住的观众）。报告主机每帧的广播耗时、
+每个观众的流量，并检查观众解码出的状态与主机一致。
+
+用法:
+    python benchmarks/broadcast_bench.py
+    python benchmarks/broadcast_bench.py --clients 200 --stalled 10 --seconds 20
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import selectors
+import multiprocessing
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.engine.config import FPS
+from src.engine.headless import create_headless_fight
+from src.engine.broadcast import BroadcastServer, SpectatorClient, capture_state, _STATE
+
+
+def run_spectators(port, clients, stalled, seconds, results):
+    """观众进程：连接并接收广播
+    
+    Args:
+        port: 主机端口
+        clients: 正常观众数量
+        stalled: 只连接不读取的观众数量
+        seconds: 接收时长（秒）
+        results: 结果队列
+    """
+    spectators = [SpectatorClient("127.0.0.1", port) for _ in range(clients)]
+    
+    # 接收缓冲区很小且从不读取的连接，很快就会在主机端积压
+    stalled_sockets = []
+    for _ in range(stalled):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect(("127.0.0.1", port))
+        stalled_sockets.append(sock)
+    
+    selector = selectors.DefaultSelector()
+    for spectator in spectators:
+        selector.register(spectator.sock, selectors.EVENT_READ, spectator)
+    
+    last = {}
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        for key, _ in selector.select(timeout=0.1):
+            spectator = key.data
+            for event in spectator.poll():
+                if event[0] == "state":
+                    last[id(spectator)] = (event[1], _STATE.pack(*event[2]))
+    
+    results.put({
+        "bytes": [s.bytes_received for s in spectators],
+        "keyframes": sum(s.keyframes for s in spectators),
+        "deltas": sum(s.deltas for s in spectators),
+        "last_states": list(last.values())
+    })
+    for spectator in spectators:
+        spectator.close()
+    for sock in stalled_sockets:
+        sock.close()
+
+
+def run_host(server, seconds, history=None):
+    """按实际帧率运行战斗并广播
+    
+    Args:
+        server: 广播服务器
+        seconds: 运行时长（秒）
+        history: 记录每帧状态的字典 {帧号: 打包的状态}
+    
+    Returns:
+        平均每帧模拟耗时（微秒）
+    """
+    fight = create_headless_fight("Ryu", "Ken", difficulty=2, seed=1)
+    fight.add_tick_listener(server)
+    update_time = 0.0
+    frames = int(seconds * FPS)
+    next_frame = time.perf_counter()
+    for _ in range(frames):
+        start = time.perf_counter()
+        fight.update()
+        update_time += time.perf_counter() - start
+        if history is not None:
+            history[int(round(fight.sim_time * FPS))] = _STATE.pack(*capture_state(fight))
+        next_frame += 1.0 / FPS
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+    fight.close()
+    return update_time / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="观战广播性能测试")
+    parser.add_argument("--clients", type=int, default=100, help="正常观众数量")
+    parser.add_argument("--stalled", type=int, default=5, help="只连接不读取的观众数量")
+    parser.add_argument("--seconds", type=float, default=10, help="每项测试的时长（秒）")
+    parser.add_argument("--max-backlog", type=int, default=8 * 1024, help="每个观众最多积压的字节数")
+    args = parser.parse_args()
+    
+    # 没有观众
+    server = BroadcastServer("127.0.0.1", 0)
+    update_us = run_host(server, args.seconds / 2)
+    idle = server.stats()
+    server.shutdown()
+    print(f"模拟一帧(参考): {update_us:.1f} 微秒")
+    print(f"没有观众: 平均每帧广播 {idle['avg_broadcast_us']:.1f} 微秒")
+    
+    # 大量观众
+    server = BroadcastServer("127.0.0.1", 0, max_backlog=args.max_backlog)
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=run_spectators,
+        args=(server.address[1], args.clients, args.stalled, args.seconds + 3, results))
+    process.start()
+    time.sleep(2)  # 等待观众连接
+    
+    history = {}
+    run_host(server, args.seconds, history)
+    stats = server.stats()
+    backlog = sum(client.backlog for client in server.clients)
+    result = results.get()
+    process.join()
+    server.shutdown()
+    
+    total = args.clients + args.stalled
+    per_client = sum(result["bytes"]) / max(1, len(result["bytes"])) / args.seconds
+    matched = sum(1 for tick, packed in result["last_states"] if history.get(tick) == packed)
+    print(f"{total}个观众（{args.stalled}个不读取）: 平均每帧广播 {stats['avg_broadcast_us']:.1f} 微秒 "
+          f"（每个观众 {stats['avg_broadcast_us'] / total:.2f} 微秒）")
+    print(f"每个观众流量: {per_client / 1024:.2f} KB/秒, 关键帧 {result['keyframes']}, 增量 {result['deltas']}")
+    print(f"丢弃的消息（积压的观众）: {stats['dropped_messages']}, 主机端积压 {backlog / 1024:.1f} KB")
+    print(f"观众最终状态与主机一致: {matched}/{len(result['last_states'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+窗口缩放性能测试
+
+绘制一帧战斗画面到逻辑画面后，测量不同窗口大小和缩放方式下把逻辑画面缩放到窗口并刷新显示的耗时
+（每帧只缩放一次，与画面内容无关）。
+
+用法:
+    python benchmarks/display_bench.py
+    python benchmarks/display_bench.py --size 2560x1440 --frames 300
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+from src.engine import config
+from src.engine.config import FPS, SCREEN_WIDTH, SCREEN_HEIGHT
+from src.engine.display import Display, SCALE_SMOOTH, SCALE_INTEGER
+from src.engine.headless import create_headless_fight
+
+
+def measure(function, frames):
+    """测量平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(frames):
+        function()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="窗口缩放性能测试")
+    parser.add_argument("--size", default="1920x1080", help="窗口大小，如1920x1080")
+    parser.add_argument("--frames", type=int, default=200, help="每项测试的帧数")
+    args = parser.parse_args()
+    config.DEBUG_OUTPUT = False
+    window_size = tuple(int(value) for value in args.size.lower().split("x"))
+    
+    print(f"帧预算 {1000 / FPS:.2f} 毫秒，逻辑分辨率 {SCREEN_WIDTH}x{SCREEN_HEIGHT}")
+    cases = ((f"{SCREEN_WIDTH}x{SCREEN_HEIGHT} 不缩放", None, SCALE_SMOOTH),
+             (f"{args.size} 平滑缩放", window_size, SCALE_SMOOTH),
+             (f"{args.size} 整数倍缩放", window_size, SCALE_INTEGER))
+    for name, size, scale_mode in cases:
+        display = Display(size, False, scale_mode)
+        fight = create_headless_fight("Ryu", "Ken", seed=0)
+        fight.render(display.surface)
+        print(f"  {name}: 缩放并刷新 {measure(display.present, args.frames):.3f} 毫秒/帧 (显示区域 {display.rect.size})")
+        fight.close()
+
+
+if __name__ == "__main__":
+    main()
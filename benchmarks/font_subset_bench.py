@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+子集字体性能测试
+
+分别用完整字体和子集字体（python -m src.engine.font_subset生成）创建游戏用到的各种字号，
+渲染一遍界面文字，对比耗时和进程内存的增长。每种字体在独立的子进程中测量。
+
+用法:
+    python benchmarks/font_subset_bench.py
+    python benchmarks/font_subset_bench.py --font assets/fonts/simhei.ttf
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# 游戏界面用到的字号
+SIZES = (16, 20, 24, 30, 32, 36, 40, 48, 60, 72)
+
+
+def measure(path):
+    """在当前进程中创建各字号并渲染界面文字，打印耗时（毫秒）和内存增长（KB）"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from src.engine.metrics import memory_rss
+    from src.engine.font_subset import collect_ui_strings
+    
+    strings = sorted({text for found in collect_ui_strings().values() for text in found})
+    pygame.font.init()
+    rss = memory_rss()
+    start = time.perf_counter()
+    fonts = [pygame.font.Font(path, size) for size in SIZES]
+    load = time.perf_counter() - start
+    for font in fonts:
+        for text in strings:
+            font.render(text, True, (255, 255, 255))
+    total = time.perf_counter() - start
+    print(f"{load * 1000:.2f} {total * 1000:.2f} {(memory_rss() - rss) / 1024:.0f}")
+
+
+def main():
+    from src.engine.font_utils import SUBSET_FONT_PATH, resolve_font_path
+    
+    parser = argparse.ArgumentParser(description="子集字体性能测试")
+    parser.add_argument("--font", help="完整字体文件（默认使用游戏查找到的中文字体）")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.measure:
+        measure(args.measure)
+        return
+    
+    font_path = args.font or resolve_font_path()
+    if font_path is None or not os.path.exists(SUBSET_FONT_PATH):
+        parser.error("需要中文字体和子集字体（先运行 python -m src.engine.font_subset）")
+    
+    print(f"{len(SIZES)}种字号: {', '.join(map(str, SIZES))}")
+    for name, path in (("完整字体", font_path), ("子集字体", SUBSET_FONT_PATH)):
+        output = subprocess.run([sys.executable, __file__, "--measure", path], capture_output=True, text=True,
+                                check=True).stdout.split()[-3:]
+        load, total, memory = output
+        print(f"{name} {path} ({os.path.getsize(path) / 1024:.0f}KB): 创建Font {load}毫秒, "
+              f"加渲染界面文字 {total}毫秒, 内存增长 {memory}KB")
+
+
+if __name__ == "__main__":
+    main()
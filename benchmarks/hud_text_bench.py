@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+界面文字绘制性能测试
+
+对比每帧重新渲染文字（render_text、每次创建SysFont）与从字形图集拼出文字的耗时：
+倒计时数字、攻击冷却文字、带阴影和透明度的伤害数字。
+
+用法:
+    python benchmarks/hud_text_bench.py
+    python benchmarks/hud_text_bench.py --frames 5000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from src.engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, YELLOW, BLACK
+from src.engine.font_utils import render_text
+from src.engine.i18n import get_text
+from src.ui.glyph_atlas import get_atlas
+
+DAMAGE_COLOR = (255, 80, 40, 200)
+
+
+def timer_render_text(screen, frame):
+    text = render_text(f"{99 - frame % 99}", 48, YELLOW)
+    screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, 50)))
+
+
+def timer_atlas(screen, frame):
+    get_atlas(48, YELLOW).draw(screen, str(99 - frame % 99), (SCREEN_WIDTH // 2, 50), "center")
+
+
+def cooldown_render_text(screen, frame):
+    text = f"{get_text('fight.cooldown')}{frame % 10 / 10:.1f}{get_text('fight.seconds')}"
+    screen.blit(render_text(text, 16, YELLOW), (50, 90))
+
+
+def cooldown_atlas(screen, frame):
+    get_atlas(16, YELLOW).draw(screen, (get_text("fight.cooldown"), *f"{frame % 10 / 10:.1f}", get_text("fight.seconds")),
+                               (50, 90))
+
+
+def damage_sysfont(screen, frame):
+    font = pygame.font.SysFont(None, 36)
+    text = str(frame % 30)
+    shadow = font.render(text, True, (0, 0, 0, DAMAGE_COLOR[3] // 2))
+    screen.blit(shadow, shadow.get_rect(center=(402, 302)))
+    surface = font.render(text, True, DAMAGE_COLOR)
+    screen.blit(surface, surface.get_rect(center=(400, 300)))
+
+
+def damage_atlas(screen, frame):
+    text = str(frame % 30)
+    get_atlas(36, BLACK, chinese=False).draw(screen, text, (402, 302), "center", DAMAGE_COLOR[3] // 2)
+    get_atlas(36, DAMAGE_COLOR, chinese=False).draw(screen, text, (400, 300), "center", DAMAGE_COLOR[3])
+
+
+CASES = [
+    ("倒计时", timer_render_text, timer_atlas),
+    ("攻击冷却", cooldown_render_text, cooldown_atlas),
+    ("伤害数字(阴影+透明)", damage_sysfont, damage_atlas),
+]
+
+
+def measure(function, screen, frames):
+    """每次调用的平均耗时（微秒）"""
+    function(screen, 0)  # 预热（创建字体和图集）
+    start = time.perf_counter()
+    for frame in range(frames):
+        function(screen, frame)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="界面文字绘制性能测试")
+    parser.add_argument("--frames", type=int, default=2000, help="每项测试的帧数")
+    args = parser.parse_args()
+    
+    pygame.init()
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    
+    for name, before, after in CASES:
+        old = measure(before, screen, args.frames)
+        new = measure(after, screen, args.frames)
+        print(f"{name}: 每帧渲染 {old:.1f} 微秒, 字形图集 {new:.1f} 微秒 ({old / new:.1f}倍)")
+
+
+if __name__ == "__main__":
+    main()
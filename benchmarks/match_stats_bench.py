@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+对战统计性能测试
+
+1. 统计收集器每帧的开销（与一帧模拟的耗时对比）
+2. 生成指定场数的随机统计数据（按列存储），测量各项查询的耗时
+
+用法:
+    python benchmarks/match_stats_bench.py
+    python benchmarks/match_stats_bench.py --matches 5000000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from src.engine.headless import create_headless_fight
+from src.engine.match_stats import (MatchStatsCollector, StatsQuery, REPORTS, TABLE_COLUMNS, DISTANCE_BINS,
+                                    MOVE_FIELDS, load_columns)
+from src.characters.character import CharacterState
+from src.characters.move_table import MOVE_NAMES
+
+
+def measure_collector(frames):
+    """统计收集器每帧的耗时和一帧模拟的耗时（毫秒）"""
+    fight = create_headless_fight("Ryu", "Ken", difficulty=2, seed=0)
+    collector = MatchStatsCollector(fight)
+    fight.tick_listeners.remove(collector)
+    
+    start = time.perf_counter()
+    for _ in range(frames):
+        fight.update()
+    update = (time.perf_counter() - start) / frames * 1000
+    
+    start = time.perf_counter()
+    for _ in range(frames):
+        collector.on_tick(fight)
+    tick = (time.perf_counter() - start) / frames * 1000
+    fight.close()
+    return update, tick
+
+
+def synthetic_columns(directory, matches, seed=0):
+    """生成随机的按列存储统计数据（与export_columns的输出格式相同）"""
+    rng = np.random.default_rng(seed)
+    characters = ["Ryu", "Ken", "Chun-Li"]
+    moves = list(MOVE_NAMES)
+    states = [state.name for state in CharacterState]
+    ids = np.arange(1, matches + 1)
+    
+    columns = {
+        "matches": {
+            "id": ids,
+            "source": np.zeros(matches, dtype=np.int32),
+            "p1": rng.integers(0, len(characters), matches, dtype=np.int32),
+            "p2": rng.integers(0, len(characters), matches, dtype=np.int32),
+            "p1_controller": np.zeros(matches, dtype=np.int32),
+            "p2_controller": np.zeros(matches, dtype=np.int32),
+            "winner": rng.integers(-1, 2, matches),
+            "ko": rng.integers(0, 2, matches),
+            "frames": rng.integers(600, 5940, matches),
+            "p1_health": rng.integers(0, 101, matches),
+            "p2_health": rng.integers(0, 101, matches)
+        }
+    }
+    
+    def child_table(per_match, category, category_count, value_columns):
+        rows = matches * per_match
+        table = {"match_id": np.repeat(ids, per_match)}
+        if category == "bin":
+            table["bin"] = np.tile(np.arange(per_match), matches)
+        else:
+            table["player"] = np.tile(np.arange(per_match) % 2, matches)
+            table[category] = rng.integers(0, category_count, rows, dtype=np.int32)
+        for column in value_columns:
+            table[column] = rng.integers(0, 30, rows)
+        return table
+    
+    columns["moves"] = child_table(8, "move", len(moves), MOVE_FIELDS)
+    columns["states"] = child_table(10, "state", len(states), ("frames",))
+    columns["distance"] = child_table(DISTANCE_BINS, "bin", DISTANCE_BINS, ("frames",))
+    
+    for table, table_columns in TABLE_COLUMNS.items():
+        for column in table_columns:
+            np.save(os.path.join(directory, f"{table}.{column}.npy"), columns[table][column])
+    vocab = {"source": ["collect"], "p1": characters, "p2": characters, "p1_controller": [""],
+             "p2_controller": [""], "move": moves, "state": states}
+    with open(os.path.join(directory, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(vocab, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对战统计性能测试")
+    parser.add_argument("--matches", type=int, default=1000000, help="生成的对战场数")
+    parser.add_argument("--frames", type=int, default=2000, help="测量收集器开销的帧数")
+    args = parser.parse_args()
+    
+    update, tick = measure_collector(args.frames)
+    print(f"一帧模拟: {update:.3f} 毫秒, 统计收集器: {tick * 1000:.2f} 微秒/帧 ({tick / update:.1%})")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        synthetic_columns(directory, args.matches)
+        print(f"生成{args.matches}场对战的统计: {time.perf_counter() - start:.1f}秒")
+        
+        start = time.perf_counter()
+        query = StatsQuery(*load_columns(directory))
+        print(f"  加载: {time.perf_counter() - start:.2f}秒")
+        for report, method in REPORTS.items():
+            start = time.perf_counter()
+            getattr(query, method)()
+            print(f"  {report}: {time.perf_counter() - start:.2f}秒")
+
+
+if __name__ == "__main__":
+    main()
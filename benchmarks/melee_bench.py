@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多人混战性能测试
+
+运行8名AI角色的混战，测量每帧模拟和渲染的耗时（平均值和99分位），
+检查是否在60 FPS的帧预算内；并对比x轴排序扫描与检查所有角色对的粗检测耗时。
+
+用法:
+    python benchmarks/melee_bench.py
+    python benchmarks/melee_bench.py --fighters 8 --teams 2 --seconds 60
+"""
+
+import os
+import sys
+import time
+import timeit
+import argparse
+import itertools
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+from src.engine.config import FPS
+from src.engine.headless import create_headless_melee
+
+ROSTER = ("Ryu", "Ken", "Chun-Li")
+
+
+def percentile(values, fraction):
+    """计算分位数
+    
+    Args:
+        values: 数值列表
+        fraction: 分位（0-1）
+    
+    Returns:
+        分位数
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def all_pairs(fighters, reach):
+    """检查所有角色对（对比用）
+    
+    Args:
+        fighters: 角色列表
+        reach: 最大中心距离
+    
+    Returns:
+        中心距离不超过reach的角色对
+    """
+    result = []
+    for first, second in itertools.combinations(fighters, 2):
+        distance = abs((first.x + first.width / 2) - (second.x + second.width / 2))
+        if distance <= reach:
+            result.append((first, second, distance))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多人混战性能测试")
+    parser.add_argument("--fighters", type=int, default=8, help="角色数量")
+    parser.add_argument("--teams", type=int, default=0, help="队伍数量，0表示各自为战")
+    parser.add_argument("--difficulty", type=int, default=2, help="AI难度")
+    parser.add_argument("--seconds", type=float, default=30, help="模拟时长（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+    
+    names = [ROSTER[i % len(ROSTER)] for i in range(args.fighters)]
+    teams = [i % args.teams for i in range(args.fighters)] if args.teams else None
+    melee = create_headless_melee(names, teams, args.difficulty, args.seed)
+    screen = pygame.display.get_surface()
+    
+    update_times, render_times, pair_counts = [], [], []
+    for _ in range(int(args.seconds * FPS)):
+        if melee.round_over:
+            break
+        start = time.perf_counter()
+        melee.update()
+        middle = time.perf_counter()
+        melee.render(screen)
+        end = time.perf_counter()
+        update_times.append(middle - start)
+        render_times.append(end - middle)
+        pair_counts.append(melee.candidate_pairs)
+    
+    frames = len(update_times)
+    budget = 1.0 / FPS
+    totals = [u + r for u, r in zip(update_times, render_times)]
+    print(f"{args.fighters}名AI角色，{frames}帧，剩余生命值: {[f.health for f in melee.fighters]}")
+    print(f"模拟: 平均 {sum(update_times) / frames * 1000:.3f} 毫秒, "
+          f"99分位 {percentile(update_times, 0.99) * 1000:.3f} 毫秒")
+    print(f"渲染: 平均 {sum(render_times) / frames * 1000:.3f} 毫秒, "
+          f"99分位 {percentile(render_times, 0.99) * 1000:.3f} 毫秒")
+    over_budget = sum(1 for total in totals if total > budget)
+    print(f"帧预算 {budget * 1000:.2f} 毫秒: 99分位 {percentile(totals, 0.99) * 1000:.3f} 毫秒, "
+          f"超出预算的帧 {over_budget}/{frames}")
+    
+    # 粗检测对比（使用最后一帧的站位）
+    fighters = melee.fighters
+    total_pairs = len(fighters) * (len(fighters) - 1) // 2
+    print(f"命中粗检测的候选角色对: 平均 {sum(pair_counts) / frames:.1f} / {total_pairs}")
+    number = 20000
+    sweep = min(timeit.repeat(lambda: (melee.broad_phase.update(), melee.broad_phase.pairs(melee.push_reach)),
+                              number=number, repeat=5))
+    brute = min(timeit.repeat(lambda: all_pairs(fighters, melee.push_reach), number=number, repeat=5))
+    print(f"推挤粗检测: 排序扫描 {sweep / number * 1e6:.2f} 微秒, 检查所有角色对 {brute / number * 1e6:.2f} 微秒")
+
+
+if __name__ == "__main__":
+    main()
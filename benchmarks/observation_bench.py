@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+AI观察性能测试
+
+对比旧的get_state_data字典接口与每帧刷新一次的Observation（含距离等派生特征），
+并测量AI控制器更新和特征提取的耗时。
+
+用法:
+    python benchmarks/observation_bench.py
+    python benchmarks/observation_bench.py --number 200000
+"""
+
+import os
+import sys
+import timeit
+import argparse
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.engine.headless import create_headless_fight
+from src.ai.ai_controller import AIController
+from src.ai.custom_ai import extract_features
+from src.characters.character import observe_fighters
+
+
+def bench(label, func, number):
+    """运行微基准并打印每次调用的平均耗时
+    
+    Args:
+        label: 名称
+        func: 无参数函数
+        number: 调用次数
+    """
+    # 取多次重复中的最小值，减少系统抖动的影响
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{label:<28}{best / number * 1e6:>10.3f} 微秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI观察性能测试")
+    parser.add_argument("--number", type=int, default=100000, help="每项测试的调用次数")
+    args = parser.parse_args()
+    
+    fight = create_headless_fight("Ryu", "Ken", difficulty=2, seed=0)
+    # 先模拟一段时间，使角色进入非初始状态
+    for _ in range(120):
+        fight.update()
+    
+    player1, player2 = fight.player1, fight.player2
+    controller = AIController(player1, difficulty=3, clock=fight.get_sim_time, seed=0)
+    
+    def read_dicts():
+        ai_state = player1.get_state_data()
+        player_state = player2.get_state_data()
+        return abs(ai_state['x'] - player_state['x'])
+    
+    def read_observation():
+        return player1.observation.distance
+    
+    bench("get_state_data x2 + 距离", read_dicts, args.number)
+    bench("observation.distance", read_observation, args.number)
+    bench("每帧刷新双方观察和派生特征", lambda: observe_fighters(player1, player2), args.number)
+    bench("特征提取", lambda: extract_features(player1, player2), args.number)
+    bench("AI控制器更新", lambda: controller.update(1.0 / 60, player2), args.number // 10)
+
+
+if __name__ == "__main__":
+    main()
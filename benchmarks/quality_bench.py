@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+画质调节性能测试
+
+1. 在特效密集的场景（双方每隔几帧出一次重招）中测量各画质档位每帧的绘制耗时；
+2. 用每帧重复绘制多次模拟性能较差的机器，对比固定最高画质与自动调节时
+   超出帧预算的帧数，以及自动调节最终稳定在哪一档。
+
+用法:
+    python benchmarks/quality_bench.py
+    python benchmarks/quality_bench.py --seconds 20 --slowdown 6
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+from src.engine import config
+from src.engine.config import FPS
+from src.engine.headless import create_headless_fight
+from src.engine.quality import QualityGovernor, QUALITY_LEVELS
+
+# 依次触发的攻击特效
+ATTACKS = ("heavy_kick", "heavy_punch", "light_kick", "light_punch")
+
+
+def percentile(values, fraction):
+    """计算分位数"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(governor, frames, slowdown, period):
+    """在特效密集的场景中运行
+    
+    Args:
+        governor: 画质调节器
+        frames: 帧数
+        slowdown: 每帧重复绘制的次数（模拟较慢的机器）
+        period: 每隔多少帧触发一次攻击特效
+    
+    Returns:
+        (每帧耗时列表, 每帧的画质档位列表)
+    """
+    fight = create_headless_fight("Ryu", "Ken", seed=0)
+    fight.quality = governor
+    screen = pygame.display.get_surface()
+    dt = 1.0 / FPS
+    
+    frame_times, levels = [], []
+    for frame in range(frames):
+        start = time.perf_counter()
+        if frame % period == 0:
+            attack = ATTACKS[(frame // period) % len(ATTACKS)]
+            fight.spawn_attack_effect(fight.player1.x + 120, 450, attack)
+            fight.spawn_attack_effect(fight.player2.x - 40, 450, attack)
+        fight.update_effects(dt)
+        for _ in range(slowdown):
+            fight.render(screen)
+        elapsed = time.perf_counter() - start
+        governor.record(elapsed)
+        frame_times.append(elapsed)
+        levels.append(governor.level)
+    fight.close()
+    return frame_times, levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="画质调节性能测试")
+    parser.add_argument("--seconds", type=float, default=10, help="自动调节测试的时长（秒）")
+    parser.add_argument("--slowdown", type=int, default=8, help="模拟慢机器时每帧重复绘制的次数")
+    parser.add_argument("--period", type=int, default=6, help="每隔多少帧触发一次攻击特效")
+    args = parser.parse_args()
+    config.DEBUG_OUTPUT = False
+    
+    budget = 1.0 / FPS
+    print("各画质档位的每帧绘制耗时:")
+    for level, settings in enumerate(QUALITY_LEVELS):
+        frame_times, _ = run(QualityGovernor(level), 300, 1, args.period)
+        print(f"  {settings.name}: 平均 {sum(frame_times) / len(frame_times) * 1000:.3f} 毫秒, "
+              f"99分位 {percentile(frame_times, 0.99) * 1000:.3f} 毫秒")
+    
+    frames = int(args.seconds * FPS)
+    print(f"模拟慢机器（每帧绘制{args.slowdown}次），帧预算 {budget * 1000:.2f} 毫秒:")
+    for name, governor in (("固定最高画质", QualityGovernor(len(QUALITY_LEVELS) - 1)), ("自动调节", QualityGovernor())):
+        frame_times, levels = run(governor, frames, args.slowdown, args.period)
+        # 跳过第一秒（自动调节在统计第一个窗口）
+        settled = frame_times[FPS:]
+        over = sum(1 for value in settled if value > budget)
+        print(f"  {name}: 超出预算的帧 {over}/{len(settled)}, "
+              f"99分位 {percentile(settled, 0.99) * 1000:.2f} 毫秒, "
+              f"最终画质 {QUALITY_LEVELS[levels[-1]].name}, 调整 {governor.changes} 次")
+
+
+if __name__ == "__main__":
+    main()
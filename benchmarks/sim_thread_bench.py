@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+模拟线程性能测试
+
+在AI决策偶尔卡顿（模拟model.predict变慢）和绘制偶尔变慢（模拟特效爆发）的情况下，
+对比模拟和绘制在同一线程中依次进行与模拟在独立线程中运行时的模拟帧率和画面帧间隔。
+
+注意：卡顿用sleep模拟，会释放GIL；纯Python计算造成的卡顿仍会与绘制争用GIL。
+
+用法:
+    python benchmarks/sim_thread_bench.py
+    python benchmarks/sim_thread_bench.py --seconds 20 --ai-stall 0.03 --render-stall 0.02
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+from src.engine import config
+from src.engine.config import FPS
+from src.engine.headless import create_headless_fight
+from src.engine.sim_thread import SimulationThread
+from src.ai.ai_controller import AIController
+
+
+class StallingController:
+    """每隔一定帧数卡顿一次的AI控制器"""
+    
+    def __init__(self, controller, stall, period):
+        """初始化
+        
+        Args:
+            controller: 实际的AI控制器
+            stall: 每次卡顿的时长（秒）
+            period: 卡顿间隔（帧）
+        """
+        self.controller = controller
+        self.stall = stall
+        self.period = period
+        self.calls = 0
+    
+    def update(self, dt, opponent):
+        """更新AI逻辑（每period帧先卡顿stall秒）"""
+        self.calls += 1
+        if self.calls % self.period == 0:
+            time.sleep(self.stall)
+        self.controller.update(dt, opponent)
+
+
+def percentile(values, fraction):
+    """计算分位数"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(threaded, args):
+    """运行一次测试
+    
+    Args:
+        threaded: 是否使用模拟线程
+        args: 命令行参数
+    
+    Returns:
+        (模拟帧数, 画面帧间隔列表)
+    """
+    def factory(character, clock):
+        return StallingController(AIController(character, 2, clock=clock), args.ai_stall, args.ai_period)
+    
+    fight = create_headless_fight("Ryu", "Ken", (factory, factory), seed=args.seed)
+    screen = pygame.display.get_surface()
+    sim_thread = SimulationThread(fight) if threaded else None
+    if sim_thread:
+        sim_thread.start()
+    
+    intervals = []
+    frames = 0
+    ticks = 0
+    interval = 1.0 / FPS
+    start = last = next_frame = time.perf_counter()
+    while time.perf_counter() - start < args.seconds:
+        if sim_thread:
+            sim_thread.render(screen)
+        else:
+            fight.update()
+            ticks += 1
+            fight.render(screen)
+        frames += 1
+        if frames % args.render_period == 0:
+            time.sleep(args.render_stall)
+        
+        # 与游戏主循环一样按帧率等待
+        next_frame += interval
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+        if time.perf_counter() - next_frame > interval:
+            next_frame = time.perf_counter()
+        now = time.perf_counter()
+        intervals.append(now - last)
+        last = now
+    
+    if sim_thread:
+        sim_thread.stop()
+        ticks = sim_thread.ticks
+    fight.close()
+    return ticks, intervals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟线程性能测试")
+    parser.add_argument("--seconds", type=float, default=10, help="每项测试的时长（秒）")
+    parser.add_argument("--ai-stall", type=float, default=0.03, help="AI每次卡顿的时长（秒）")
+    parser.add_argument("--ai-period", type=int, default=20, help="AI卡顿的间隔（帧）")
+    parser.add_argument("--render-stall", type=float, default=0.02, help="绘制每次变慢的时长（秒）")
+    parser.add_argument("--render-period", type=int, default=30, help="绘制变慢的间隔（帧）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+    config.DEBUG_OUTPUT = False
+    
+    budget = 1.0 / FPS
+    for threaded in (False, True):
+        ticks, intervals = run(threaded, args)
+        late = sum(1 for value in intervals if value > budget * 1.5)
+        print(f"{'模拟线程' if threaded else '单线程'}: 模拟 {ticks / args.seconds:.1f} 帧/秒, "
+              f"画面 {len(intervals) / args.seconds:.1f} 帧/秒, "
+              f"帧间隔99分位 {percentile(intervals, 0.99) * 1000:.1f} 毫秒, "
+              f"最大 {max(intervals) * 1000:.1f} 毫秒, "
+              f"超过1.5倍帧预算的画面帧 {late}/{len(intervals)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+战斗快照性能测试
+
+测量角色和整场战斗的保存/恢复耗时，并验证恢复后继续模拟的结果与原始模拟逐位一致。
+
+用法:
+    python benchmarks/snapshot_bench.py
+    python benchmarks/snapshot_bench.py --number 20000 --frames 600
+"""
+
+import os
+import sys
+import timeit
+import argparse
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.engine.headless import create_headless_fight
+from src.engine.snapshot import (
+    snapshot_character, restore_character, snapshot_fight, restore_fight
+)
+
+
+def bench(label, func, number):
+    """运行微基准并打印每次调用的平均耗时
+    
+    Args:
+        label: 名称
+        func: 无参数函数
+        number: 调用次数
+    """
+    # 取多次重复中的最小值，减少系统抖动的影响
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{label:<24}{best / number * 1e6:>10.2f} 微秒")
+
+
+def check_determinism(fight, frames):
+    """验证快照恢复后的模拟与原始模拟一致
+    
+    Args:
+        fight: 战斗界面
+        frames: 恢复后继续模拟的帧数
+    
+    Returns:
+        是否一致
+    """
+    start = snapshot_fight(fight)
+    for _ in range(frames):
+        fight.update()
+    expected = snapshot_fight(fight)
+    
+    restore_fight(fight, start)
+    for _ in range(frames):
+        fight.update()
+    return snapshot_fight(fight).same_simulation_state(expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="战斗快照性能测试")
+    parser.add_argument("--number", type=int, default=10000, help="每项测试的调用次数")
+    parser.add_argument("--frames", type=int, default=300, help="一致性检查模拟的帧数")
+    args = parser.parse_args()
+    
+    fight = create_headless_fight("Ryu", "Ken", difficulty=2)
+    # 先模拟一段时间，使角色和AI进入非初始状态
+    for _ in range(120):
+        fight.update()
+    
+    character = fight.player1
+    character_snapshot = snapshot_character(character)
+    fight_snapshot = snapshot_fight(fight)
+    fight_snapshot_no_random = snapshot_fight(fight, include_random=False)
+    
+    bench("保存角色", lambda: snapshot_character(character), args.number)
+    bench("恢复角色", lambda: restore_character(character, character_snapshot), args.number)
+    bench("保存战斗", lambda: snapshot_fight(fight), args.number)
+    bench("恢复战斗", lambda: restore_fight(fight, fight_snapshot), args.number)
+    bench("保存战斗(不含随机数)", lambda: snapshot_fight(fight, include_random=False), args.number)
+    bench("恢复战斗(不含随机数)", lambda: restore_fight(fight, fight_snapshot_no_random), args.number)
+    bench("模拟一帧(参考)", fight.update, args.number // 100)
+    
+    restore_fight(fight, fight_snapshot)
+    print(f"恢复后模拟{args.frames}帧结果一致: {check_determinism(fight, args.frames)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,10 @@
 
 import pygame
 import sys
-import os
 from src.engine.game import Game
-from src.engine.font_utils import get_chinese_font, download_default_font
+from src.engine import config
+from src.engine.font_utils import get_chinese_font, start_font_download
+from src.engine.i18n import set_language
 
 def main():
     """主函数"""
@@ -20,20 +21,18 @@ def main():
     # 显示pygame版本
     print(f"pygame {pygame.version.ver}")
     
-    # 初始化中文字体
+    # 初始化中文字体（不访问网络；开启FONT_DOWNLOAD时在后台下载缺少的默认字体）
     print("初始化中文字体...")
-    font_path = os.path.join("assets", "fonts", "simhei.ttf")
-    if not os.path.exists(font_path):
-        print("尝试下载中文字体...")
-        try:
-            download_default_font()
-        except Exception as e:
-            print(f"下载字体失败: {e}")
+    if config.FONT_DOWNLOAD:
+        start_font_download()
     
     # 测试字体加载
     test_font = get_chinese_font(32)
     print(f"字体初始化完成: {test_font}")
     
+    # 确定界面语言（没有中文字体时使用英文）
+    print(f"界面语言: {set_language()}")
+    
     # 创建游戏实例
     game = Game()
     
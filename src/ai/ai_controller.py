@@ -4,20 +4,35 @@
 import random
 import time
 import math
+from src.engine import config
+from src.engine import metrics
 from src.engine.config import AI_REACTION_TIME, AI_DECISION_INTERVAL
 
 class AIController:
     """AI控制器，负责控制AI角色的行为"""
     
-    def __init__(self, character, difficulty=1, behavior_mode=None):
+    # 战斗快照需要保存的决策状态（见src/engine/snapshot.py）
+    SNAPSHOT_FIELDS = (
+        "last_decision_time", "current_action", "action_start_time", "action_duration",
+        "next_action_queue", "last_attack_time", "avoid_overlap_counter",
+        "is_repositioning", "attack_count"
+    )
+    
+    def __init__(self, character, difficulty=1, behavior_mode=None, clock=None, seed=None):
         """初始化AI控制器
         
         Args:
             character: AI控制的角色
             difficulty: AI难度 (1-3)
             behavior_mode: AI行为模式 ("aggressive", "defensive", "balanced", None)
+            clock: 返回当前时间（秒）的函数，默认使用time.time；
+                战斗界面会传入模拟时钟，使无界面对战可以快进
+            seed: 随机种子，战斗界面会按战斗种子重新播种self.rng
         """
         self.character = character
+        self.clock = clock or time.time
+        # 独立的随机数流，不受特效等其他子系统影响
+        self.rng = random.Random(seed)
         self.difficulty = min(max(difficulty, 1), 3)  # 确保难度在1-3之间
         self.reaction_time = AI_REACTION_TIME[self.difficulty]
         self.decision_interval = AI_DECISION_INTERVAL[self.difficulty]
@@ -30,7 +45,7 @@ class AIController:
         self.next_action_queue = []
         
         # 添加更多状态控制变量
-        self.last_attack_time = time.time() - 10  # 记录上次攻击时间，初始化为过去时间
+        self.last_attack_time = self.clock() - 10  # 记录上次攻击时间，初始化为过去时间
         self.min_attack_interval = 2.5  # 最小攻击间隔（秒）
         self.avoid_overlap_counter = 0  # 避免重叠计数器
         self.is_repositioning = False  # 是否正在重新定位
@@ -53,7 +68,7 @@ class AIController:
             self.aggression = 0.3 + (self.difficulty * 0.2)  # 攻击性 (0.5-0.9)
             self.defense = 0.2 + (self.difficulty * 0.2)     # 防御性 (0.4-0.8)
             self.movement = 0.4 + (self.difficulty * 0.1)    # 移动性 (0.5-0.7)
-            
+        
         # 降低总体攻击性，提高防御性和移动性
         self.aggression *= 0.6  # 降低攻击欲望
         self.defense *= 1.2     # 提高防御性
@@ -70,12 +85,11 @@ class AIController:
             dt: 时间增量（秒）
             player_character: 玩家角色
         """
-        current_time = time.time()
+        current_time = self.clock()
         
-        # 获取角色状态数据
-        ai_state = self.character.get_state_data()
-        player_state = player_character.get_state_data()
-        distance = abs(ai_state['x'] - player_state['x'])
+        # 获取角色状态数据（距离、方向等派生特征每帧只计算一次）
+        ai_state = self.character.observation
+        distance = ai_state.distance
         
         # 紧急避免重叠检测 - 每帧都检查以确保快速反应
         if distance < 100 and not self.character.is_attacking and not player_character.is_attacking:
@@ -93,11 +107,11 @@ class AIController:
                 self._execute_action(self._jump, 0.5)
                 
                 # 确定后退方向
-                direction = 'left' if ai_state['x'] > player_state['x'] else 'right'
+                direction = 'left' if ai_state.dx < 0 else 'right'
                 self.next_action_queue.append((lambda: self._move(direction), 0.8))
                 
                 # 可能的再次跳跃
-                if random.random() < 0.4:
+                if self.rng.random() < 0.4:
                     self.next_action_queue.append((self._jump, 0.5))
                     self.next_action_queue.append((lambda: self._move(direction), 0.5))
                 
@@ -105,7 +119,7 @@ class AIController:
                 self.avoid_overlap_counter = 0
             else:
                 # 简单后退
-                direction = 'left' if ai_state['x'] > player_state['x'] else 'right'
+                direction = 'left' if ai_state.dx < 0 else 'right'
                 self._move(direction)  # 直接调用移动而不是通过_execute_action
             
             # 设置标记以记录正在重新定位
@@ -156,18 +170,19 @@ class AIController:
             self._make_decision(player_character)
             self.last_decision_time = current_time
     
+    @metrics.timed(metrics.decision_histogram("AIController"))
     def _make_decision(self, player_character):
         """根据游戏状态做出决策
         
         Args:
             player_character: 玩家角色
         """
-        current_time = time.time()
-        ai_state = self.character.get_state_data()
-        player_state = player_character.get_state_data()
+        current_time = self.clock()
+        ai_state = self.character.observation
+        player_state = player_character.observation
         
         # 计算与玩家的距离
-        distance = abs(ai_state['x'] - player_state['x'])
+        distance = ai_state.distance
         
         # 检查攻击冷却时间和间隔时间
         can_attack = self.character.attack_cooldown <= 0
@@ -175,21 +190,21 @@ class AIController:
         
         # 强制攻击机制：每10秒必须尝试攻击一次，防止AI永远不攻击的情况
         force_attack = (attack_interval > 10.0)
-        if force_attack:
+        if force_attack and config.DEBUG_OUTPUT:
             print(f"{self.character.name} 触发强制攻击机制!")
         
         # 如果正在重新定位，优先考虑移动和保持距离
         if self.is_repositioning and not force_attack:
             # 保持距离，直到定位完成
-            direction = 'left' if ai_state['x'] > player_state['x'] else 'right'
+            direction = 'left' if ai_state.dx < 0 else 'right'
             self._execute_action(lambda: self._move(direction), 0.8)
             
             # 随机跳跃以避免卡位
-            if random.random() < 0.3:
+            if self.rng.random() < 0.3:
                 self.next_action_queue.append((self._jump, 0.6))
             
             # 有一定概率重置重新定位状态
-            if random.random() < 0.2:
+            if self.rng.random() < 0.2:
                 self.is_repositioning = False
             
             return
@@ -197,10 +212,10 @@ class AIController:
         # 检查是否重叠或距离过近，如果是则先拉开距离
         if distance < 120 and not force_attack:  # 扩大距离检测范围
             # 向远离对方的方向移动，更长时间以确保拉开足够距离
-            direction = 'left' if ai_state['x'] > player_state['x'] else 'right'
+            direction = 'left' if ai_state.dx < 0 else 'right'
             self._execute_action(lambda: self._move(direction), 1.0)
             # 增加跳跃的概率，避免水平方向的卡位
-            if random.random() < 0.5:  # 提高跳跃概率
+            if self.rng.random() < 0.5:  # 提高跳跃概率
                 self.next_action_queue.append((self._jump, 0.6))
             return
         
@@ -208,7 +223,7 @@ class AIController:
         allow_attack = (can_attack and 
                        (attack_interval >= self.min_attack_interval or force_attack) and 
                        (self.attack_count < self.max_consecutive_attacks or force_attack))
-                       
+        
         # 在可以攻击的情况下，提高攻击概率
         # 如果两个AI一段时间没有攻击，增加攻击概率
         attack_chance = 0.65  # 提高攻击概率（原为0.25）
@@ -226,23 +241,23 @@ class AIController:
             attack_chance *= 0.7  # 如果刚过最小间隔不久，减少攻击概率
         
         # 优先考虑防御，但降低优先级，增加攻击机会
-        if player_state['is_attacking'] and random.random() < self.defense * 1.2 and not force_attack:
+        if player_state.is_attacking and self.rng.random() < self.defense * 1.2 and not force_attack:
             # 对手正在攻击，有一定概率防御
             self._execute_action(self._block, 0.7)
             # 防御后立即安排后续行动，后退或跳跃
-            if random.random() < 0.7:
-                direction = 'left' if ai_state['x'] > player_state['x'] else 'right'
+            if self.rng.random() < 0.7:
+                direction = 'left' if ai_state.dx < 0 else 'right'
                 self.next_action_queue.append((lambda: self._move(direction), 0.6))
             return
         
         # 检查是否满足攻击条件并决定是否进行攻击
-        if (allow_attack and random.random() < attack_chance) or force_attack:
+        if (allow_attack and self.rng.random() < attack_chance) or force_attack:
             # 接近对手的中距离（不要太近，避免重叠）
             ideal_attack_distance = 150  # 理想攻击距离
             
             if abs(distance - ideal_attack_distance) > 50 and not force_attack:
                 # 先调整到理想攻击距离
-                direction = 'right' if ai_state['x'] < player_state['x'] - ideal_attack_distance else 'left'
+                direction = 'right' if ai_state.x < player_state.x - ideal_attack_distance else 'left'
                 self._execute_action(lambda: self._move(direction), 0.5)
                 
                 # 安排攻击
@@ -256,12 +271,12 @@ class AIController:
                 else:
                     # 随机选择，但轻型攻击更常见
                     attack_choices = ['light_punch', 'light_kick', 'heavy_punch', 'heavy_kick']
-                    
-                attack_type = random.choice(attack_choices)
+                
+                attack_type = self.rng.choice(attack_choices)
                 self.next_action_queue.append((lambda: self._attack(attack_type), 0.4))
                 
                 # 攻击后后退
-                back_direction = 'left' if ai_state['x'] > player_state['x'] else 'right'
+                back_direction = 'left' if ai_state.dx < 0 else 'right'
                 self.next_action_queue.append((lambda: self._move(back_direction), 0.6))
             else:
                 # 在理想距离或强制攻击情况下，直接攻击
@@ -275,14 +290,14 @@ class AIController:
                 else:
                     # 随机选择，但轻型攻击更常见
                     attack_choices = ['light_punch', 'light_kick', 'heavy_punch', 'heavy_kick']
-                    
-                attack_type = random.choice(attack_choices)
+                
+                attack_type = self.rng.choice(attack_choices)
                 self._execute_action(lambda: self._attack(attack_type), 0.5)
                 self.last_attack_time = current_time
                 self.attack_count += 1
                 
                 # 攻击后后退
-                direction = 'left' if ai_state['x'] > player_state['x'] else 'right'
+                direction = 'left' if ai_state.dx < 0 else 'right'
                 self.next_action_queue.append((lambda: self._move(direction), 0.7))
             return
         
@@ -290,7 +305,7 @@ class AIController:
         # 更多随机移动，保持战场活跃度
         move_chance = self.movement * 1.2  # 提高移动概率
         
-        if random.random() < move_chance:
+        if self.rng.random() < move_chance:
             # 随机决定动作：后退、接近或跳跃
             # 为AI角色分配不同的行为偏好，增加个性差异
             if hasattr(self.character, 'name') and 'AI 1' in self.character.name:
@@ -302,60 +317,60 @@ class AIController:
             else:
                 # 默认权重
                 weights = [0.4, 0.3, 0.2, 0.1]  # [approach, retreat, jump, idle]
-                
-            action_type = random.choices(
+            
+            action_type = self.rng.choices(
                 ['approach', 'retreat', 'jump', 'idle'], 
                 weights=weights
             )[0]
             
             if action_type == 'approach':
                 # 靠近对手，但保持适当距离
-                direction = 'right' if ai_state['x'] < player_state['x'] - 150 else 'left'
-                self._execute_action(lambda: self._move(direction), random.uniform(0.5, 0.8))
+                direction = 'right' if ai_state.x < player_state.x - 150 else 'left'
+                self._execute_action(lambda: self._move(direction), self.rng.uniform(0.5, 0.8))
                 
                 # 接近后随机跳跃
-                if random.random() < 0.3:
+                if self.rng.random() < 0.3:
                     self.next_action_queue.append((self._jump, 0.5))
-                    
+            
             elif action_type == 'retreat':
                 # 后退拉开距离
-                direction = 'left' if ai_state['x'] > player_state['x'] - 200 else 'right'
-                self._execute_action(lambda: self._move(direction), random.uniform(0.6, 1.0))
-                
+                direction = 'left' if ai_state.x > player_state.x - 200 else 'right'
+                self._execute_action(lambda: self._move(direction), self.rng.uniform(0.6, 1.0))
+            
             elif action_type == 'jump':
                 # 跳跃移动
                 self._execute_action(self._jump, 0.6)
                 
                 # 跳跃时随机移动
-                if random.random() < 0.7:
-                    direction = random.choice(['left', 'right'])
+                if self.rng.random() < 0.7:
+                    direction = self.rng.choice(['left', 'right'])
                     self.next_action_queue.append((lambda: self._move(direction), 0.4))
-                    
+            
             else:  # idle
                 # 短暂原地等待，然后准备下一个动作
                 self._execute_action(self._stop_moving, 0.3)
                 
                 # 随机决定下一步行动
-                if random.random() < 0.5:
+                if self.rng.random() < 0.5:
                     self.next_action_queue.append((self._jump, 0.5))
                 else:
-                    direction = random.choice(['left', 'right'])
+                    direction = self.rng.choice(['left', 'right'])
                     self.next_action_queue.append((lambda: self._move(direction), 0.5))
         else:
             # 防御或者观察
-            if random.random() < self.defense and distance < 250:
+            if self.rng.random() < self.defense and distance < 250:
                 # 在适当距离内随机防御
-                self._execute_action(self._block, random.uniform(0.3, 0.7))
+                self._execute_action(self._block, self.rng.uniform(0.3, 0.7))
                 
                 # 防御后立即准备移动
-                direction = 'left' if ai_state['x'] > player_state['x'] else 'right'
+                direction = 'left' if ai_state.dx < 0 else 'right'
                 self.next_action_queue.append((lambda: self._move(direction), 0.5))
             else:
                 # 短暂等待观察
                 self._execute_action(self._stop_moving, 0.2)
                 
                 # 随后进行移动
-                direction = 'right' if ai_state['x'] < player_state['x'] else 'left'
+                direction = 'right' if ai_state.dx > 0 else 'left'
                 self.next_action_queue.append((lambda: self._move(direction), 0.4))
     
     def _execute_action(self, action_func, duration):
@@ -367,7 +382,7 @@ class AIController:
         """
         action_func()
         self.current_action = action_func
-        self.action_start_time = time.time()
+        self.action_start_time = self.clock()
         self.action_duration = duration
     
     def _move(self, direction):
@@ -406,12 +421,13 @@ class AIController:
         
         Args:
             attack_type: 攻击类型
-            
+        
         Returns:
             bool: 是否成功执行攻击
         """
         # 调试信息 - 记录攻击尝试
-        print(f"AI尝试攻击: {attack_type}, 冷却状态: {self.character.attack_cooldown}")
+        if config.DEBUG_OUTPUT:
+            print(f"AI尝试攻击: {attack_type}, 冷却状态: {self.character.attack_cooldown}")
         
         # 只有在攻击冷却结束时才执行攻击
         if self.character.attack_cooldown <= 0:
@@ -423,9 +439,10 @@ class AIController:
                 self.character.light_kick()
             elif attack_type == 'heavy_kick':
                 self.character.heavy_kick()
-            print(f"AI成功执行攻击: {attack_type}")
+            if config.DEBUG_OUTPUT:
+                print(f"AI成功执行攻击: {attack_type}")
             return True
-        else:
+        elif config.DEBUG_OUTPUT:
             print(f"AI攻击失败: 冷却未结束, 剩余: {self.character.attack_cooldown:.2f}秒")
         return False
     
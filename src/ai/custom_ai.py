@@ -12,6 +12,7 @@ import random
 import numpy as np
 import time
 import os
+from src.engine import metrics
 
 # 动作映射与train_model.py中保持一致
 ACTIONS = {
@@ -27,16 +28,57 @@ ACTIONS = {
     9: "重腿"
 }
 
+# 已加载模型缓存 {模型路径: 模型}
+_MODEL_CACHE = {}
+
+# 模型输入特征数量（与train_model.py中的网络输入保持一致）
+FEATURE_COUNT = 10
+
+def extract_features(character, opponent):
+    """从双方角色状态提取模型输入特征
+    
+    MLBasedAI推理和对战数据记录共用此函数，保证训练与推理的特征一致。
+    读取角色的observation（战斗界面每帧刷新一次，距离等派生特征已算好），不构造状态字典。
+    
+    Args:
+        character: 决策方角色
+        opponent: 对手角色
+    
+    Returns:
+        长度为FEATURE_COUNT的特征列表
+    """
+    ai_state = character.observation
+    player_state = opponent.observation
+    
+    # 构建特征向量 - 10个特征以匹配模型期望
+    return [
+        ai_state.x/800,  # 归一化AI位置x
+        ai_state.y/600,  # 归一化AI位置y
+        ai_state.health/100,  # 归一化AI生命值
+        player_state.x/800,  # 归一化玩家位置x
+        player_state.y/600,  # 归一化玩家位置y
+        player_state.health/100,  # 归一化玩家生命值
+        1 if player_state.is_attacking else 0,  # 玩家是否攻击中
+        1 if ai_state.is_blocking else 0,       # AI是否格挡
+        ai_state.distance/800,  # 归一化水平距离
+        ai_state.vertical_distance/600  # 归一化垂直距离
+    ]
+
 class CustomAIBase:
     """自定义AI基类"""
     
-    def __init__(self, character):
+    def __init__(self, character, clock=None, seed=None):
         """初始化自定义AI
         
         Args:
             character: AI控制的角色
+            clock: 返回当前时间（秒）的函数，默认使用time.time
+            seed: 随机种子，战斗界面会按战斗种子重新播种self.rng
         """
         self.character = character
+        self.clock = clock or time.time
+        # 独立的随机数流，不受特效等其他子系统影响
+        self.rng = random.Random(seed)
     
     def update(self, dt, player_character):
         """更新AI逻辑
@@ -60,9 +102,9 @@ class CustomAIBase:
 class SimpleCustomAI(CustomAIBase):
     """简单的自定义AI示例"""
     
-    def __init__(self, character):
+    def __init__(self, character, clock=None, seed=None):
         """初始化简单自定义AI"""
-        super().__init__(character)
+        super().__init__(character, clock, seed)
     
     def make_decision(self, player_character):
         """一个简单的AI决策逻辑示例
@@ -70,17 +112,16 @@ class SimpleCustomAI(CustomAIBase):
         Args:
             player_character: 玩家角色
         """
-        # 获取AI角色和玩家角色的状态数据
-        ai_state = self.character.get_state_data()
-        player_state = player_character.get_state_data()
+        # 获取AI角色的状态数据（包含与玩家的相对位置）
+        ai_state = self.character.observation
         
-        # 计算与玩家的水平距离
-        distance = abs(ai_state['x'] - player_state['x'])
+        # 与玩家的水平距离
+        distance = ai_state.distance
         
         # 简单的决策逻辑：接近并攻击
         if distance > 100:
             # 如果距离大于100像素，向玩家移动
-            if ai_state['x'] < player_state['x']:
+            if ai_state.dx > 0:
                 self.character.move_right()
             else:
                 self.character.move_left()
@@ -89,7 +130,7 @@ class SimpleCustomAI(CustomAIBase):
             self.character.stop_moving()
             
             # 随机选择一种攻击
-            attack = random.choice(['light_punch', 'heavy_punch', 'light_kick', 'heavy_kick'])
+            attack = self.rng.choice(['light_punch', 'heavy_punch', 'light_kick', 'heavy_kick'])
             
             if attack == 'light_punch':
                 self.character.light_punch()
@@ -104,24 +145,36 @@ class SimpleCustomAI(CustomAIBase):
 class MLBasedAI(CustomAIBase):
     """基于机器学习的AI"""
     
-    def __init__(self, character, model_path="models/fighting_ai_model.h5"):
+    # 战斗快照需要保存的决策状态（见src/engine/snapshot.py）
+    SNAPSHOT_FIELDS = (
+        "last_decision_time", "current_action", "action_cooldown",
+        "combo_state", "strategy_weights"
+    )
+    
+    def __init__(self, character, model_path="models/fighting_ai_model.h5", clock=None, seed=None):
         """初始化基于机器学习的AI
         
         Args:
             character: AI控制的角色
             model_path: 机器学习模型路径
+            clock: 返回当前时间（秒）的函数，默认使用time.time
+            seed: 随机种子
         """
-        super().__init__(character)
+        super().__init__(character, clock, seed)
         
         # 检查模型文件是否存在
         if not os.path.exists(model_path):
             print(f"警告: AI模型文件不存在: {model_path}")
             print("使用简单AI替代")
             self.model = None
-            self.fallback_ai = SimpleCustomAI(character)
+            self.fallback_ai = SimpleCustomAI(character, clock)
         else:
             self.model = self._load_model(model_path)
-            self.fallback_ai = SimpleCustomAI(character) if self.model is None else None
+            self.fallback_ai = SimpleCustomAI(character, clock) if self.model is None else None
+        
+        # 替代AI与本AI共用同一个随机数流，重新播种时一起生效
+        if self.fallback_ai is not None:
+            self.fallback_ai.rng = self.rng
         
         # 防止AI过于频繁做决策
         self.last_decision_time = 0
@@ -169,10 +222,14 @@ class MLBasedAI(CustomAIBase):
         
         Args:
             model_path: 模型路径
-            
+        
         Returns:
             加载的模型或None
         """
+        # 同一进程内复用已加载的模型（批量对战时避免每局重新加载）
+        if model_path in _MODEL_CACHE:
+            return _MODEL_CACHE[model_path]
+        
         try:
             # 导入TensorFlow
             import tensorflow as tf
@@ -182,6 +239,7 @@ class MLBasedAI(CustomAIBase):
             print(f"正在加载AI模型: {model_path}")
             model = load_model(model_path)
             print("AI模型加载成功!")
+            _MODEL_CACHE[model_path] = model
             return model
         except ImportError:
             print("错误: 未找到TensorFlow。请确保已安装tensorflow库。")
@@ -200,26 +258,34 @@ class MLBasedAI(CustomAIBase):
         if self.fallback_ai:
             self.fallback_ai.make_decision(player_character)
             return
-            
-        current_time = time.time()
+        
+        current_time = self.clock()
         
         # 控制决策频率
         if current_time - self.last_decision_time < self.decision_interval:
             return
         
         self.last_decision_time = current_time
+        self._decide(player_character)
+    
+    @metrics.timed(metrics.decision_histogram("MLBasedAI"))
+    def _decide(self, player_character):
+        """一次决策：预测动作概率并执行（每个决策间隔一次）
         
+        Args:
+            player_character: 玩家角色
+        """
         # 更新冷却时间
         for action_type in self.action_cooldown:
             if self.action_cooldown[action_type] > 0:
                 self.action_cooldown[action_type] -= self.decision_interval
         
         # 获取状态数据
-        ai_state = self.character.get_state_data()
-        player_state = player_character.get_state_data()
+        ai_state = self.character.observation
+        player_state = player_character.observation
         
         # 计算与玩家的距离
-        distance = abs(ai_state['x'] - player_state['x'])
+        distance = ai_state.distance
         
         # 更新连招状态
         self._update_combo_state(ai_state, player_state, distance)
@@ -255,8 +321,8 @@ class MLBasedAI(CustomAIBase):
         actions_sorted.sort(key=lambda x: x[1], reverse=True)
         
         # 是否开始新的连招
-        if not self.combo_state["current_combo"] and distance < 150 and random.random() < 0.3:
-            selected_combo = random.choice(self.combos)
+        if not self.combo_state["current_combo"] and distance < 150 and self.rng.random() < 0.3:
+            selected_combo = self.rng.choice(self.combos)
             self.combo_state["current_combo"] = selected_combo.copy()
             self.combo_state["combo_timer"] = 0
             # 执行第一个连招动作
@@ -288,7 +354,7 @@ class MLBasedAI(CustomAIBase):
         self.combo_state["last_distance"] = current_distance
         
         # 记录玩家动作
-        self.combo_state["last_player_action"] = player_state["state"]
+        self.combo_state["last_player_action"] = player_state.state
     
     def _analyze_player_behavior(self, player_state):
         """分析玩家行为模式
@@ -297,8 +363,8 @@ class MLBasedAI(CustomAIBase):
             player_state: 玩家状态
         """
         # 记录玩家攻击模式
-        if player_state["is_attacking"]:
-            attack_type = player_state["state"]
+        if player_state.is_attacking:
+            attack_type = player_state.state
             if attack_type not in self.combo_state["player_attack_patterns"]:
                 self.combo_state["player_attack_patterns"][attack_type] = 0
             self.combo_state["player_attack_patterns"][attack_type] += 1
@@ -311,30 +377,30 @@ class MLBasedAI(CustomAIBase):
             ai_state: AI状态
             player_state: 玩家状态
             distance: 当前距离
-            
+        
         Returns:
             调整后的动作概率
         """
         adjusted_probs = base_probs.copy()
         
         # 根据玩家生命值调整策略
-        if player_state["health"] < 30:
+        if player_state.health < 30:
             # 玩家血量低时，提高攻击性
             self.strategy_weights["aggressive"] += 0.2
         
         # 根据自身生命值调整策略
-        if ai_state["health"] < 30:
+        if ai_state.health < 30:
             # AI血量低时，提高防御性
             self.strategy_weights["defensive"] += 0.2
         
         # 玩家攻击时提高防御概率
-        if player_state["is_attacking"] and distance < 150:
+        if player_state.is_attacking and distance < 150:
             adjusted_probs[5] *= (1.0 + self.strategy_weights["defensive"] * 2)  # 增加格挡概率
         
         # 根据距离调整动作概率
         if distance > 200:
             # 远距离提高移动和跳跃概率
-            move_dir = 1 if ai_state["x"] > player_state["x"] else 2  # 向左或向右
+            move_dir = 1 if ai_state.dx < 0 else 2  # 向左或向右
             adjusted_probs[move_dir] *= 1.5
             adjusted_probs[3] *= 1.3  # 提高跳跃概率
         elif distance < 100:
@@ -343,8 +409,8 @@ class MLBasedAI(CustomAIBase):
                 adjusted_probs[action_id] *= (1.0 + self.strategy_weights["aggressive"])
         
         # 添加一定随机性，避免AI太容易预测
-        if random.random() < self.strategy_weights["unpredictable"]:
-            random_action = random.randint(0, len(adjusted_probs)-1)
+        if self.rng.random() < self.strategy_weights["unpredictable"]:
+            random_action = self.rng.randint(0, len(adjusted_probs)-1)
             adjusted_probs[random_action] *= 1.5
         
         # 根据玩家攻击模式，预判和应对
@@ -367,7 +433,7 @@ class MLBasedAI(CustomAIBase):
         Args:
             move: 连招动作
             player_character: 玩家角色
-            
+        
         Returns:
             是否成功执行
         """
@@ -397,10 +463,8 @@ class MLBasedAI(CustomAIBase):
                 self.action_cooldown["jump"] = 0.7
                 return True
         elif move == "move_close":
-            # 获取状态数据计算方向
-            ai_state = self.character.get_state_data()
-            player_state = player_character.get_state_data()
-            direction = "right" if ai_state["x"] < player_state["x"] else "left"
+            # 根据相对位置确定方向
+            direction = "right" if self.character.observation.dx > 0 else "left"
             if self.action_cooldown["move"] <= 0:
                 if direction == "left":
                     self.character.move_left()
@@ -408,7 +472,7 @@ class MLBasedAI(CustomAIBase):
                     self.character.move_right()
                 self.action_cooldown["move"] = 0.1
                 return True
-                
+        
         return False
     
     def _try_execute_action(self, action_id, player_character):
@@ -417,7 +481,7 @@ class MLBasedAI(CustomAIBase):
         Args:
             action_id: 动作ID
             player_character: 玩家角色
-            
+        
         Returns:
             是否成功执行
         """
@@ -425,61 +489,61 @@ class MLBasedAI(CustomAIBase):
         if action_id == 0:  # 无动作
             self.character.stop_moving()
             return True
-            
+        
         elif action_id == 1:  # 向左移动
             if self.action_cooldown["move"] <= 0:
                 self.character.move_left()
                 self.action_cooldown["move"] = 0.1
                 return True
-                
+        
         elif action_id == 2:  # 向右移动
             if self.action_cooldown["move"] <= 0:
                 self.character.move_right()
                 self.action_cooldown["move"] = 0.1
                 return True
-                
+        
         elif action_id == 3:  # 跳跃
             if self.action_cooldown["jump"] <= 0:
                 self.character.jump()
                 self.action_cooldown["jump"] = 1.0
                 return True
-                
+        
         elif action_id == 4:  # 蹲下
             if self.action_cooldown["crouch"] <= 0:
                 self.character.crouch()
                 self.action_cooldown["crouch"] = 0.5
                 return True
-                
+        
         elif action_id == 5:  # 格挡
             if self.action_cooldown["block"] <= 0:
                 self.character.block()
                 self.action_cooldown["block"] = 0.5
                 return True
-                
+        
         elif action_id == 6:  # 轻拳
             if self.action_cooldown["attack"] <= 0:
                 self.character.light_punch()
                 self.action_cooldown["attack"] = 0.5
                 return True
-                
+        
         elif action_id == 7:  # 重拳
             if self.action_cooldown["attack"] <= 0:
                 self.character.heavy_punch()
                 self.action_cooldown["attack"] = 0.7
                 return True
-                
+        
         elif action_id == 8:  # 轻腿
             if self.action_cooldown["attack"] <= 0:
                 self.character.light_kick()
                 self.action_cooldown["attack"] = 0.5
                 return True
-                
+        
         elif action_id == 9:  # 重腿
             if self.action_cooldown["attack"] <= 0:
                 self.character.heavy_kick()
                 self.action_cooldown["attack"] = 0.7
                 return True
-                
+        
         return False
     
     def _prepare_input_data(self, player_character):
@@ -487,36 +551,8 @@ class MLBasedAI(CustomAIBase):
         
         Args:
             player_character: 玩家角色
-            
+        
         Returns:
             输入数据数组
         """
-        # 获取AI角色和玩家角色的状态数据
-        ai_state = self.character.get_state_data()
-        player_state = player_character.get_state_data()
-        
-        # 特征工程：计算相对位置和距离等
-        horizontal_distance = player_state['x'] - ai_state['x']
-        vertical_distance = player_state['y'] - ai_state['y']
-        absolute_distance = np.sqrt(horizontal_distance**2 + vertical_distance**2)
-        
-        # 距离归一化
-        normalized_horizontal_distance = horizontal_distance / 800  # 屏幕宽度
-        normalized_vertical_distance = vertical_distance / 600  # 屏幕高度
-        normalized_absolute_distance = absolute_distance / 1000
-        
-        # 构建特征向量 - 调整为10个特征以匹配模型期望
-        features = [
-            ai_state['x']/800,  # 归一化AI位置x
-            ai_state['y']/600,  # 归一化AI位置y
-            ai_state['health']/100,  # 归一化AI生命值
-            player_state['x']/800,  # 归一化玩家位置x
-            player_state['y']/600,  # 归一化玩家位置y
-            player_state['health']/100,  # 归一化玩家生命值
-            1 if player_state['is_attacking'] else 0,  # 玩家是否攻击中
-            1 if ai_state['is_blocking'] else 0,       # AI是否格挡
-            abs(horizontal_distance)/800,  # 归一化水平距离
-            abs(vertical_distance)/600     # 归一化垂直距离
-        ]
-        
-        return np.array(features) 
\ No newline at end of file
+        return np.array(extract_features(self.character, player_character)) 
\ No newline at end of file
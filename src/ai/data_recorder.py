@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+对战数据记录器
+
+挂接到战斗界面的每帧回调，把(观察特征, 实际动作, 对战结果)样本
+以二进制分片的形式追加写入磁盘，供train_model.py直接训练。
+
+样本先在内存中缓冲，一局结束后补上胜负结果，累计到一定数量再整体写盘，
+不会每帧写文件。
+
+用法:
+    python -m src.ai.data_recorder --matches 50 --out data/selfplay
+"""
+
+import os
+import glob
+import time
+import argparse
+import numpy as np
+from src.engine.config import ROUND_TIME
+from src.engine.rng import derive_seed, make_rng
+from src.characters.character import CharacterCommand
+from src.ai.custom_ai import ACTIONS, FEATURE_COUNT, extract_features
+
+# 分片文件头：魔数 + 版本号 + 特征数量
+SHARD_MAGIC = b"FKSP"
+SHARD_VERSION = 1
+SHARD_HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("feature_count", "<u2")
+])
+
+# 单条样本记录格式
+SAMPLE_DTYPE = np.dtype([
+    ("episode", "<u4"),       # 分片内的对局编号
+    ("frame", "<u4"),         # 对局内的帧号
+    ("player", "u1"),         # 0: 玩家1, 1: 玩家2
+    ("action", "u1"),         # 动作ID（与ACTIONS一致）
+    ("outcome", "i1"),        # 对局结果：1胜 0平 -1负
+    ("reward", "<f4"),        # 本帧造成伤害减去受到伤害
+    ("obs", "<f4", (FEATURE_COUNT,))  # 观察特征
+])
+
+# 指令到动作ID的映射，同一帧有多条指令时按优先级取一个
+_ATTACK_ACTIONS = {
+    CharacterCommand.LIGHT_PUNCH: 6,
+    CharacterCommand.HEAVY_PUNCH: 7,
+    CharacterCommand.LIGHT_KICK: 8,
+    CharacterCommand.HEAVY_KICK: 9
+}
+_OTHER_ACTIONS = (
+    (CharacterCommand.BLOCK, 5),
+    (CharacterCommand.JUMP, 3),
+    (CharacterCommand.CROUCH, 4),
+    (CharacterCommand.MOVE_LEFT, 1),
+    (CharacterCommand.MOVE_RIGHT, 2)
+)
+
+
+def commands_to_action(commands):
+    """把一帧内的角色指令转换为动作ID
+    
+    攻击优先，其次格挡、跳跃、蹲下、移动；只有停止类指令时视为无动作。
+    
+    Args:
+        commands: CharacterCommand列表
+    
+    Returns:
+        动作ID (0-9)
+    """
+    for command in commands:
+        if command in _ATTACK_ACTIONS:
+            return _ATTACK_ACTIONS[command]
+    for command, action in _OTHER_ACTIONS:
+        if command in commands:
+            return action
+    return 0
+
+
+class SelfPlayRecorder:
+    """对战数据记录器（战斗界面的每帧监听器）"""
+    
+    def __init__(self, output_dir, flush_samples=65536, shard_samples=1000000,
+                 skip_idle_frames=True):
+        """初始化记录器
+        
+        Args:
+            output_dir: 分片输出目录
+            flush_samples: 缓冲样本数达到该值时写盘
+            shard_samples: 单个分片文件的最大样本数，超过后换新文件
+            skip_idle_frames: 是否跳过没有任何指令的帧（AI只在决策时下达指令）
+        """
+        self.output_dir = output_dir
+        self.flush_samples = flush_samples
+        self.shard_samples = shard_samples
+        self.skip_idle_frames = skip_idle_frames
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # 分片文件名包含时间和进程号，多个进程可以同时写入同一目录
+        self.shard_prefix = f"selfplay_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self.shard_index = 0
+        self.shard_written = 0
+        
+        # 缓冲区
+        self.pending_rows = []   # 当前对局的样本（等待结果）
+        self.buffered = []       # 已完成对局的样本数组
+        self.buffered_count = 0
+        self.episode = 0
+        
+        # 上一帧结束时的观察和血量（即本帧决策时看到的状态）
+        self.frame = 0
+        self.last_obs = None
+        self.last_health = None
+    
+    def on_tick(self, fight):
+        """每帧回调：记录双方本帧的动作
+        
+        Args:
+            fight: 战斗界面
+        """
+        fighters = (fight.player1, fight.player2)
+        health = (fight.player1.health, fight.player2.health)
+        
+        if self.last_obs is not None:
+            for i, fighter in enumerate(fighters):
+                commands = fighter.command_log
+                if not commands and self.skip_idle_frames:
+                    continue
+                # 奖励：本帧对手掉血减去自己掉血
+                reward = ((self.last_health[1 - i] - health[1 - i]) -
+                          (self.last_health[i] - health[i]))
+                self.pending_rows.append((
+                    self.episode, self.frame, i,
+                    commands_to_action(commands), 0, reward,
+                    self.last_obs[i]
+                ))
+        
+        # 本帧结束时的状态作为下一帧的观察
+        self.last_obs = (extract_features(fight.player1, fight.player2),
+                         extract_features(fight.player2, fight.player1))
+        self.last_health = health
+        self.frame += 1
+    
+    def on_round_end(self, fight):
+        """回合结束回调：补充对局结果并转入写盘缓冲
+        
+        Args:
+            fight: 战斗界面
+        """
+        if fight.winner is fight.player1:
+            outcomes = (1, -1)
+        elif fight.winner is fight.player2:
+            outcomes = (-1, 1)
+        else:
+            outcomes = (0, 0)
+        
+        if self.pending_rows:
+            rows = np.array(self.pending_rows, dtype=SAMPLE_DTYPE)
+            rows["outcome"] = np.where(rows["player"] == 0, outcomes[0], outcomes[1])
+            self.buffered.append(rows)
+            self.buffered_count += len(rows)
+        
+        self._reset_episode()
+        self.episode += 1
+        
+        if self.buffered_count >= self.flush_samples:
+            self.flush()
+    
+    def _reset_episode(self):
+        """清空当前对局的状态"""
+        self.pending_rows = []
+        self.frame = 0
+        self.last_obs = None
+        self.last_health = None
+    
+    def flush(self):
+        """把缓冲的样本追加写入分片文件"""
+        if not self.buffered:
+            return
+        rows = np.concatenate(self.buffered)
+        self.buffered = []
+        self.buffered_count = 0
+        
+        start = 0
+        while start < len(rows):
+            if self.shard_written >= self.shard_samples:
+                self.shard_index += 1
+                self.shard_written = 0
+            count = min(len(rows) - start, self.shard_samples - self.shard_written)
+            path = os.path.join(self.output_dir, f"{self.shard_prefix}_{self.shard_index:04d}.bin")
+            with open(path, "ab") as f:
+                if self.shard_written == 0:
+                    header = np.array([(SHARD_MAGIC, SHARD_VERSION, FEATURE_COUNT)], dtype=SHARD_HEADER)
+                    f.write(header.tobytes())
+                f.write(rows[start:start + count].tobytes())
+            self.shard_written += count
+            start += count
+    
+    def close(self):
+        """写出剩余数据；未结束的对局没有结果，直接丢弃"""
+        self._reset_episode()
+        self.flush()
+
+
+def read_shard(path):
+    """读取单个分片文件
+    
+    Args:
+        path: 分片文件路径
+    
+    Returns:
+        SAMPLE_DTYPE结构化数组
+    """
+    header = np.fromfile(path, dtype=SHARD_HEADER, count=1)
+    if len(header) == 0 or header[0]["magic"] != SHARD_MAGIC:
+        raise ValueError(f"不是有效的数据分片: {path}")
+    if header[0]["version"] != SHARD_VERSION or header[0]["feature_count"] != FEATURE_COUNT:
+        raise ValueError(f"数据分片版本或特征数量不匹配: {path}")
+    return np.fromfile(path, dtype=SAMPLE_DTYPE, offset=SHARD_HEADER.itemsize)
+
+
+def load_training_data(data_dir, winners_only=False, include_draws=True):
+    """把目录中的所有分片转换为训练数据
+    
+    Args:
+        data_dir: 分片目录
+        winners_only: 是否只保留获胜方的样本（模仿胜者的行为）
+        include_draws: winners_only时是否保留平局样本
+    
+    Returns:
+        特征数组 (N, FEATURE_COUNT) 和one-hot标签数组 (N, len(ACTIONS))
+    """
+    paths = sorted(glob.glob(os.path.join(data_dir, "*.bin")))
+    if not paths:
+        raise FileNotFoundError(f"目录中没有数据分片: {data_dir}")
+    
+    samples = np.concatenate([read_shard(path) for path in paths])
+    if winners_only:
+        min_outcome = 0 if include_draws else 1
+        samples = samples[samples["outcome"] >= min_outcome]
+    
+    X = samples["obs"].astype(np.float32)
+    y = np.zeros((len(samples), len(ACTIONS)), dtype=np.float32)
+    y[np.arange(len(samples)), samples["action"]] = 1
+    return X, y
+
+
+def record_selfplay(output_dir, matches=10, difficulty=2, max_time=None, seed=None):
+    """运行AI对战AI并记录数据
+    
+    Args:
+        output_dir: 分片输出目录
+        matches: 对局数量
+        difficulty: AI难度 (1-3)
+        max_time: 每局最长模拟时间（秒），None表示完整回合
+        seed: 总随机种子，None表示不可复现
+    """
+    from src.engine.headless import run_headless_match
+    
+    characters = ["Ryu", "Ken", "Chun-Li"]
+    rng = make_rng(seed, "selfplay", "characters")
+    recorder = SelfPlayRecorder(output_dir)
+    try:
+        for i in range(matches):
+            p1_name, p2_name = rng.choice(characters), rng.choice(characters)
+            match_seed = derive_seed(seed, "selfplay", "match", i) if seed is not None else None
+            result = run_headless_match(p1_name, p2_name, difficulty=difficulty,
+                                        listeners=[recorder],
+                                        max_time=max_time or ROUND_TIME,
+                                        seed=match_seed)
+            print(f"对局 {i + 1}/{matches}: {p1_name} vs {p2_name}, "
+                  f"胜者={result['winner']}, 帧数={result['frames']}")
+    finally:
+        recorder.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="运行AI对战AI并记录训练数据")
+    parser.add_argument("--out", default="data/selfplay", help="分片输出目录")
+    parser.add_argument("--matches", type=int, default=10, help="对局数量")
+    parser.add_argument("--difficulty", type=int, default=2, help="AI难度 (1-3)")
+    parser.add_argument("--max-time", type=float, default=None, help="每局最长模拟时间（秒）")
+    parser.add_argument("--seed", type=int, default=None, help="总随机种子（指定后结果可复现）")
+    args = parser.parse_args()
+    record_selfplay(args.out, args.matches, args.difficulty, args.max_time, args.seed)
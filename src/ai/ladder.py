@@ -0,0 +1,418 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+AI天梯评分工具
+
+在进程池中以无界面模式循环赛对战所有AI控制器，使用TrueSkill计算评分和置信区间，
+排名稳定后提前结束，结果保存为JSON，新模型或规则修改后可以几分钟内得到客观排名。
+
+用法:
+    python -m src.ai.ladder --workers 8
+    python -m src.ai.ladder --resume --entrant ml-v2=ml:models/new_model.h5
+"""
+
+import os
+import json
+import math
+import time
+import signal
+import argparse
+import importlib
+import itertools
+import multiprocessing
+from statistics import NormalDist
+from src.engine import config
+from src.engine.config import ROUND_TIME
+from src.engine.rng import derive_seed
+from src.engine.match_stats import StatsWarehouse
+
+# 对战使用的角色（双方使用相同角色，消除角色强弱差异）
+LADDER_CHARACTERS = ["Ryu", "Ken", "Chun-Li"]
+
+# 默认结果文件
+DEFAULT_RESULTS_PATH = os.path.join("results", "ladder.json")
+
+# 参赛的搜索AI每次决策的迭代次数（与默认时间预算下单进程的迭代次数相当）；
+# 固定迭代次数而不是搜索时间，进程池负载不同时对局结果也相同
+LADDER_MCTS_ITERATIONS = 10
+
+# TrueSkill默认参数
+DEFAULT_MU = 25.0
+DEFAULT_SIGMA = DEFAULT_MU / 3
+DEFAULT_BETA = DEFAULT_SIGMA / 2
+DEFAULT_TAU = DEFAULT_SIGMA / 100
+DEFAULT_DRAW_PROBABILITY = 0.3  # AI对战超时平局较多
+
+_NORMAL = NormalDist()
+
+
+def default_roster():
+    """默认参赛AI列表
+    
+    Returns:
+        {名称: 控制器描述}字典
+    """
+    roster = {}
+    for mode in ("aggressive", "defensive", "balanced"):
+        for difficulty in (1, 2, 3):
+            roster[f"{mode}-{difficulty}"] = f"ai:{mode}:{difficulty}"
+    roster["ml"] = "ml:models/fighting_ai_model.h5"
+    roster["simple"] = "simple"
+    roster["mcts"] = f"mcts-iter:{LADDER_MCTS_ITERATIONS}"
+    return roster
+
+
+def build_controller(spec, character, clock):
+    """根据控制器描述创建控制器
+    
+    支持的描述格式:
+        ai:<行为模式>:<难度>       AIController
+        ml:<模型路径>              MLBasedAI
+        simple                     SimpleCustomAI
+        mcts[:<毫秒>]              MCTSAI（可指定每次决策的搜索时间）
+        mcts-iter:<次数>           MCTSAI，每次决策固定迭代次数（结果可复现）
+        custom:<模块路径>:<类名>   任意CustomAIBase子类
+    
+    Args:
+        spec: 控制器描述字符串
+        character: 被控制的角色
+        clock: 模拟时钟函数
+    
+    Returns:
+        控制器实例
+    """
+    from src.ai.ai_controller import AIController
+    from src.ai.custom_ai import MLBasedAI, SimpleCustomAI
+    from src.ai.mcts_ai import MCTSAI
+    
+    kind, _, rest = spec.partition(":")
+    if kind == "ai":
+        mode, difficulty = rest.split(":")
+        return AIController(character, int(difficulty), mode, clock=clock)
+    if kind == "ml":
+        return MLBasedAI(character, rest, clock=clock)
+    if kind == "simple":
+        return SimpleCustomAI(character, clock)
+    if kind == "mcts":
+        if rest:
+            return MCTSAI(character, clock, time_budget=float(rest) / 1000)
+        return MCTSAI(character, clock)
+    if kind == "mcts-iter":
+        return MCTSAI(character, clock, time_budget=None, max_iterations=int(rest))
+    if kind == "custom":
+        module_name, class_name = rest.split(":")
+        controller_class = getattr(importlib.import_module(module_name), class_name)
+        try:
+            return controller_class(character, clock=clock)
+        except TypeError:
+            # 旧的自定义AI只接受character参数
+            controller = controller_class(character)
+            controller.clock = clock
+            return controller
+    raise ValueError(f"无法识别的控制器描述: {spec}")
+
+
+def _init_worker():
+    """进程池初始化：每个进程只初始化一次无界面环境"""
+    from src.engine.headless import init_headless
+    init_headless()
+    # SDL初始化时会接管SIGTERM（转为退出事件），恢复默认处理，保证进程池能正常结束工作进程
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def _play_match(job):
+    """在工作进程中运行一场对战
+    
+    Args:
+        job: (描述1, 描述2, 角色名称, 最长时间, 随机种子)
+    
+    Returns:
+        对战结果字典
+    """
+    from src.engine.headless import run_headless_match
+    
+    spec1, spec2, character_name, max_time, seed = job
+    factories = (
+        lambda character, clock: build_controller(spec1, character, clock),
+        lambda character, clock: build_controller(spec2, character, clock)
+    )
+    return run_headless_match(character_name, character_name, factories, max_time=max_time, seed=seed)
+
+
+class Rating:
+    """TrueSkill评分（均值和标准差）"""
+    
+    __slots__ = ("mu", "sigma")
+    
+    def __init__(self, mu=DEFAULT_MU, sigma=DEFAULT_SIGMA):
+        self.mu = mu
+        self.sigma = sigma
+    
+    def interval(self, z=1.96):
+        """置信区间（默认95%）"""
+        return self.mu - z * self.sigma, self.mu + z * self.sigma
+    
+    def conservative(self):
+        """保守评分 mu - 3*sigma"""
+        return self.mu - 3 * self.sigma
+
+
+def _v_win(t, eps):
+    """胜负更新的均值修正系数"""
+    x = t - eps
+    denom = _NORMAL.cdf(x)
+    return _NORMAL.pdf(x) / denom if denom > 1e-12 else -x
+
+
+def _w_win(t, eps):
+    """胜负更新的方差修正系数"""
+    x = t - eps
+    v = _v_win(t, eps)
+    return min(max(v * (v + x), 1e-6), 1 - 1e-6)
+
+
+def _v_draw(t, eps):
+    """平局更新的均值修正系数"""
+    a = eps - abs(t)
+    b = -eps - abs(t)
+    denom = _NORMAL.cdf(a) - _NORMAL.cdf(b)
+    v = (_NORMAL.pdf(b) - _NORMAL.pdf(a)) / denom if denom > 1e-12 else a
+    return -v if t < 0 else v
+
+
+def _w_draw(t, eps):
+    """平局更新的方差修正系数"""
+    a = eps - abs(t)
+    b = -eps - abs(t)
+    denom = _NORMAL.cdf(a) - _NORMAL.cdf(b)
+    if denom <= 1e-12:
+        return 1 - 1e-6
+    v = _v_draw(abs(t), eps)
+    return min(max(v * v + (a * _NORMAL.pdf(a) - b * _NORMAL.pdf(b)) / denom, 1e-6), 1 - 1e-6)
+
+
+def rate_1vs1(rating_a, rating_b, drawn=False, beta=DEFAULT_BETA, tau=DEFAULT_TAU,
+              draw_probability=DEFAULT_DRAW_PROBABILITY):
+    """按一场对局结果更新双方评分（a为胜者，平局时不区分）
+    
+    Args:
+        rating_a: 胜者评分
+        rating_b: 负者评分
+        drawn: 是否平局
+        beta: 表现波动
+        tau: 每局增加的不确定性（防止评分僵化）
+        draw_probability: 平局概率（决定平局边界）
+    """
+    eps = _NORMAL.inv_cdf((draw_probability + 1) / 2) * math.sqrt(2) * beta
+    var_a = rating_a.sigma ** 2 + tau ** 2
+    var_b = rating_b.sigma ** 2 + tau ** 2
+    c = math.sqrt(2 * beta ** 2 + var_a + var_b)
+    t = (rating_a.mu - rating_b.mu) / c
+    e = eps / c
+    
+    if drawn:
+        v, w = _v_draw(t, e), _w_draw(t, e)
+    else:
+        v, w = _v_win(t, e), _w_win(t, e)
+    
+    rating_a.mu += var_a / c * v
+    rating_b.mu -= var_b / c * v
+    rating_a.sigma = math.sqrt(var_a * (1 - var_a / c ** 2 * w))
+    rating_b.sigma = math.sqrt(var_b * (1 - var_b / c ** 2 * w))
+
+
+class Ladder:
+    """天梯：维护评分、战绩和对战记录"""
+    
+    def __init__(self, roster, draw_probability=DEFAULT_DRAW_PROBABILITY, seed=0):
+        """初始化天梯
+        
+        Args:
+            roster: {名称: 控制器描述}字典
+            draw_probability: 平局概率
+            seed: 总种子，每场对局的种子由它和轮次、场次派生
+        """
+        self.roster = dict(roster)
+        self.draw_probability = draw_probability
+        self.seed = seed
+        self.ratings = {name: Rating() for name in self.roster}
+        self.records = {name: {"wins": 0, "losses": 0, "draws": 0} for name in self.roster}
+        self.matches = []
+        self.passes = 0
+    
+    def schedule_pass(self, max_time):
+        """生成一轮循环赛：每对AI交换位置各打一场
+        
+        Args:
+            max_time: 每局最长时间（秒）
+        
+        Returns:
+            [(名称1, 名称2, job)]列表
+        """
+        jobs = []
+        for index, (a, b) in enumerate(itertools.combinations(sorted(self.roster), 2)):
+            character = LADDER_CHARACTERS[(self.passes + index) % len(LADDER_CHARACTERS)]
+            for side, (p1, p2) in enumerate(((a, b), (b, a))):
+                seed = derive_seed(self.seed, "match", self.passes, index, side)
+                jobs.append((p1, p2, (self.roster[p1], self.roster[p2], character, max_time, seed)))
+        return jobs
+    
+    def record(self, p1, p2, character, result):
+        """记录一场对局并更新评分
+        
+        Args:
+            p1: 玩家1位置的AI名称
+            p2: 玩家2位置的AI名称
+            character: 使用的角色
+            result: run_headless_match的返回值
+        """
+        if result["winner"] is None:
+            rate_1vs1(self.ratings[p1], self.ratings[p2], drawn=True,
+                      draw_probability=self.draw_probability)
+            self.records[p1]["draws"] += 1
+            self.records[p2]["draws"] += 1
+        else:
+            winner, loser = (p1, p2) if result["winner"] == 0 else (p2, p1)
+            rate_1vs1(self.ratings[winner], self.ratings[loser],
+                      draw_probability=self.draw_probability)
+            self.records[winner]["wins"] += 1
+            self.records[loser]["losses"] += 1
+        
+        self.matches.append({
+            "p1": p1,
+            "p2": p2,
+            "character": character,
+            "winner": result["winner"],
+            "p1_health": result["p1_health"],
+            "p2_health": result["p2_health"],
+            "frames": result["frames"]
+        })
+    
+    def ranking(self):
+        """按评分均值排序的名称列表"""
+        return sorted(self.roster, key=lambda name: self.ratings[name].mu, reverse=True)
+    
+    def run(self, workers=None, max_passes=20, min_passes=3, patience=2, max_time=ROUND_TIME, save_path=None):
+        """运行循环赛直到排名稳定
+        
+        Args:
+            workers: 进程数，None表示CPU核数
+            max_passes: 最多轮数
+            min_passes: 最少轮数
+            patience: 排名连续多少轮不变时提前结束
+            max_time: 每局最长时间（秒）
+            save_path: 结果文件路径，每轮结束后保存（中断后可以用load继续），None表示不保存
+        """
+        stable_passes = 0
+        last_ranking = self.ranking()
+        
+        # 每场对战的详细统计写入统计仓库
+        warehouse = StatsWarehouse(config.MATCH_STATS_DB) if config.MATCH_STATS_DB else None
+        
+        try:
+            with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+                for _ in range(max_passes):
+                    start = time.time()
+                    jobs = self.schedule_pass(max_time)
+                    # 使用有序map，保证评分更新顺序可复现
+                    results = pool.map(_play_match, [job for _, _, job in jobs])
+                    for (p1, p2, job), result in zip(jobs, results):
+                        self.record(p1, p2, job[2], result)
+                        if warehouse is not None:
+                            warehouse.add(result["match_stats"], "ladder", job[:2])
+                    self.passes += 1
+                    if save_path is not None:
+                        self.save(save_path)
+                    
+                    ranking = self.ranking()
+                    stable_passes = stable_passes + 1 if ranking == last_ranking else 0
+                    last_ranking = ranking
+                    print(f"第{self.passes}轮完成: {len(jobs)}场, 用时{time.time() - start:.1f}秒, "
+                          f"排名连续稳定{stable_passes}轮")
+                    
+                    if self.passes >= min_passes and stable_passes >= patience:
+                        print("排名已稳定，提前结束")
+                        break
+        finally:
+            if warehouse is not None:
+                warehouse.close()
+    
+    def report(self):
+        """生成排名表文本"""
+        lines = [f"{'排名':<4}{'AI':<16}{'评分':>8}{'95%置信区间':>20}{'胜':>6}{'负':>6}{'平':>6}"]
+        for rank, name in enumerate(self.ranking(), 1):
+            rating = self.ratings[name]
+            low, high = rating.interval()
+            record = self.records[name]
+            lines.append(f"{rank:<4}{name:<16}{rating.mu:>8.2f}{f'[{low:.2f}, {high:.2f}]':>20}"
+                         f"{record['wins']:>6}{record['losses']:>6}{record['draws']:>6}")
+        return "\n".join(lines)
+    
+    def save(self, path):
+        """保存评分和对战记录到JSON文件
+        
+        Args:
+            path: 文件路径
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {
+            "passes": self.passes,
+            "draw_probability": self.draw_probability,
+            "roster": self.roster,
+            "ratings": {name: {"mu": r.mu, "sigma": r.sigma, **self.records[name]}
+                        for name, r in self.ratings.items()},
+            "matches": self.matches
+        }
+        # 先写临时文件再替换，保存时被中断也不会损坏之前的结果
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    
+    def load(self, path):
+        """从JSON文件加载之前的评分，作为本次天梯的先验
+        
+        Args:
+            path: 文件路径
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.passes = data.get("passes", 0)
+        self.matches = data.get("matches", [])
+        for name, saved in data.get("ratings", {}).items():
+            if name not in self.roster:
+                continue
+            self.ratings[name] = Rating(saved["mu"], saved["sigma"])
+            self.records[name] = {key: saved.get(key, 0) for key in ("wins", "losses", "draws")}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI天梯评分")
+    parser.add_argument("--workers", type=int, default=None, help="进程数（默认CPU核数）")
+    parser.add_argument("--max-passes", type=int, default=20, help="最多循环赛轮数")
+    parser.add_argument("--min-passes", type=int, default=3, help="最少循环赛轮数")
+    parser.add_argument("--patience", type=int, default=2, help="排名连续稳定多少轮后结束")
+    parser.add_argument("--max-time", type=float, default=ROUND_TIME, help="每局最长模拟时间（秒）")
+    parser.add_argument("--entrant", action="append", default=[],
+                        help="额外参赛AI，格式: 名称=控制器描述（如 ml-v2=ml:models/new.h5）")
+    parser.add_argument("--only", nargs="*", default=None, help="只让指定名称的AI参赛")
+    parser.add_argument("--results", default=DEFAULT_RESULTS_PATH, help="结果文件路径")
+    parser.add_argument("--resume", action="store_true", help="在已有结果的基础上继续")
+    parser.add_argument("--seed", type=int, default=0, help="总随机种子")
+    args = parser.parse_args()
+    
+    roster = default_roster()
+    for entrant in args.entrant:
+        name, spec = entrant.split("=", 1)
+        roster[name] = spec
+    if args.only:
+        roster = {name: spec for name, spec in roster.items() if name in args.only}
+    
+    ladder = Ladder(roster, seed=args.seed)
+    if args.resume and os.path.exists(args.results):
+        ladder.load(args.results)
+    
+    ladder.run(args.workers, args.max_passes, args.min_passes, args.patience, args.max_time, args.results)
+    print(ladder.report())
+    print(f"结果已保存到 {args.results}")
@@ -0,0 +1,540 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+搜索型AI（蒙特卡洛树搜索）
+
+每次决策时从当前局面出发，在一个精简的战斗模拟（只包含移动、重力、攻击判定和受击规则，
+不含动画和特效）上对十种动作进行蒙特卡洛树搜索，在限定的时间预算内选出平均收益最高的动作。
+
+搜索树按动作序列组织（开环搜索），决策后保留所选动作的子树，下一次决策在其基础上继续搜索。
+对手在模拟中按简单的"接近并攻击"策略行动。
+"""
+
+import math
+import time
+from src.engine.config import (
+    GRAVITY, JUMP_FORCE, WALK_SPEED, STAGE_WIDTH, STAGE_HEIGHT,
+    AI_SEARCH_TIME_BUDGET
+)
+from src.engine import metrics
+from src.engine.snapshot import CHARACTER_FIELDS, snapshot_character
+from src.characters.character import CharacterState, Direction, ATTACK_STATES, MOVE_INDEX
+from src.ai.custom_ai import CustomAIBase, ACTIONS
+
+# 动作ID到攻击状态的映射（帧数、判定框、伤害等从角色的招式表读取）
+_ACTION_ATTACKS = {
+    6: CharacterState.LIGHT_PUNCH,
+    7: CharacterState.HEAVY_PUNCH,
+    8: CharacterState.LIGHT_KICK,
+    9: CharacterState.HEAVY_KICK
+}
+
+_NO_ATTACK_STATES = (CharacterState.JUMPING, CharacterState.FALLING, CharacterState.DEFEATED)
+_NO_MOVE_STATES = (CharacterState.DEFEATED, CharacterState.HIT)
+
+_ACTION_COUNT = len(ACTIONS)
+
+
+class FighterParams:
+    """模拟角色的常量参数（从真实角色读取一次）"""
+    
+    __slots__ = ("width", "height", "ground_y", "max_x", "rect_w", "rect_h",
+                 "moves", "hit_stun_duration", "is_ai")
+    
+    def __init__(self, character):
+        """从真实角色读取参数
+        
+        Args:
+            character: 角色
+        """
+        self.width = character.width
+        self.height = character.height
+        self.ground_y = STAGE_HEIGHT - character.height
+        self.max_x = STAGE_WIDTH - character.width
+        self.rect_w = character.rect.w
+        self.rect_h = character.rect.h
+        self.moves = character.moves
+        self.hit_stun_duration = character.hit_stun_duration
+        self.is_ai = character.name.startswith('AI')
+
+
+class SimFighter:
+    """精简模拟中的角色状态（属性与快照字段一致）"""
+    
+    __slots__ = CHARACTER_FIELDS + ("params",)
+    
+    @classmethod
+    def from_values(cls, values, params):
+        """由快照元组创建
+        
+        Args:
+            values: 按CHARACTER_FIELDS顺序排列的属性值
+            params: FighterParams
+        
+        Returns:
+            SimFighter
+        """
+        fighter = cls.__new__(cls)
+        for name, value in zip(CHARACTER_FIELDS, values):
+            setattr(fighter, name, value)
+        fighter.params = params
+        return fighter
+
+
+def apply_action(fighter, action):
+    """对模拟角色执行动作，规则与角色的指令方法一致
+    
+    Args:
+        fighter: SimFighter
+        action: 动作ID (0-9)
+    """
+    p = fighter.params
+    on_ground = fighter.y >= p.ground_y
+    
+    # 切换到其他动作时先解除格挡和下蹲
+    if action != 5 and fighter.is_blocking:
+        fighter.is_blocking = False
+        fighter.state = CharacterState.IDLE
+    if action != 4 and fighter.is_crouching:
+        fighter.is_crouching = False
+        fighter.state = CharacterState.IDLE
+    
+    if action == 1 or action == 2:
+        if fighter.state not in _NO_MOVE_STATES and not fighter.is_attacking:
+            fighter.vel_x = -WALK_SPEED if action == 1 else WALK_SPEED
+            fighter.direction = Direction.LEFT if action == 1 else Direction.RIGHT
+            if on_ground and not fighter.is_crouching:
+                fighter.state = CharacterState.WALKING
+        return
+    
+    if action == 3:
+        if on_ground and not fighter.is_jumping and not fighter.is_attacking:
+            fighter.vel_y = JUMP_FORCE
+            fighter.is_jumping = True
+            fighter.state = CharacterState.JUMPING
+        return
+    
+    # 其余动作原地执行
+    fighter.vel_x = 0
+    if on_ground and fighter.state == CharacterState.WALKING:
+        fighter.state = CharacterState.IDLE
+    
+    if action == 4:
+        if on_ground and not fighter.is_jumping and not fighter.is_attacking:
+            fighter.is_crouching = True
+            fighter.state = CharacterState.CROUCHING
+    elif action == 5:
+        if not fighter.is_attacking:
+            fighter.is_blocking = True
+            fighter.state = CharacterState.BLOCKING
+    elif action in _ACTION_ATTACKS:
+        if (not fighter.is_attacking and fighter.attack_cooldown <= 0 and
+                fighter.state not in _NO_ATTACK_STATES):
+            attack = _ACTION_ATTACKS[action]
+            fighter.is_attacking = True
+            fighter.attack_frame = 0
+            fighter.attack_move = MOVE_INDEX[attack]
+            fighter.state = attack
+            fighter.has_hit_opponent = False
+
+
+def _take_damage(fighter, damage):
+    """模拟角色受到伤害（与Character.take_damage一致）"""
+    if fighter.is_blocking:
+        return
+    fighter.health -= damage
+    fighter.state = CharacterState.HIT
+    fighter.hit_recovery_timer = 0
+    knockback = 10.0 if damage >= 3 else 5.0
+    fighter.vel_x = -knockback if fighter.direction == Direction.RIGHT else knockback
+    if fighter.health <= 0:
+        fighter.health = 0
+        fighter.state = CharacterState.DEFEATED
+
+
+def _check_hit(fighter, opponent, p, q):
+    """攻击判定窗口内的命中检测（与Character._check_hit一致）"""
+    if fighter.state not in ATTACK_STATES:
+        return
+    moves = p.moves
+    move = fighter.attack_move
+    if not moves.active_start[move] <= fighter.attack_frame <= moves.active_end[move]:
+        return
+    
+    distance = abs((fighter.x + p.width / 2) - (opponent.x + q.width / 2))
+    max_distance = p.width * 2.0 + (50 if p.is_ai else 0)
+    damage = moves.damage[move]
+    
+    # AI对战AI时双方都在地面上即命中
+    if (p.is_ai and q.is_ai and fighter.y >= p.ground_y and opponent.y >= q.ground_y and
+            distance <= max_distance * 1.2):
+        fighter.has_hit_opponent = True
+        _take_damage(opponent, damage)
+        return
+    
+    if distance > max_distance or opponent.is_blocking:
+        return
+    
+    # 判定框与对手矩形相交
+    width = moves.hitbox_width[move]
+    height = moves.hitbox_height[move]
+    offset_y = moves.hitbox_y[move]
+    if fighter.direction == Direction.RIGHT:
+        box_x = int(fighter.x + p.width - 10)
+    else:
+        box_x = int(fighter.x - width + 10)
+    box_y = int(fighter.y + offset_y)
+    rect_x = int(opponent.x)
+    rect_y = int(opponent.y)
+    if (box_x < rect_x + q.rect_w and rect_x < box_x + width and
+            box_y < rect_y + q.rect_h and rect_y < box_y + height):
+        fighter.has_hit_opponent = True
+        _take_damage(opponent, damage)
+
+
+def step_fighter(fighter, opponent, dt):
+    """推进一个模拟角色一帧（与Character.update的顺序一致，省略动画）
+    
+    Args:
+        fighter: SimFighter
+        opponent: 对手SimFighter
+        dt: 时间增量（秒）
+    """
+    p = fighter.params
+    q = opponent.params
+    
+    # 受击硬直恢复
+    if fighter.state == CharacterState.HIT:
+        fighter.hit_recovery_timer += dt
+        if fighter.hit_recovery_timer >= p.hit_stun_duration:
+            fighter.state = CharacterState.IDLE
+            fighter.hit_recovery_timer = 0
+    
+    # AI角色始终朝向对手
+    if p.is_ai and not fighter.is_attacking:
+        fighter.direction = Direction.RIGHT if fighter.x < opponent.x else Direction.LEFT
+    
+    # 物理
+    if fighter.state != CharacterState.DEFEATED:
+        if fighter.y < p.ground_y:
+            fighter.vel_y += GRAVITY
+            if fighter.vel_y > 0:
+                fighter.state = CharacterState.FALLING
+        elif fighter.state == CharacterState.FALLING:
+            fighter.vel_y = 0
+            fighter.is_jumping = False
+            fighter.state = CharacterState.IDLE
+        
+        fighter.x += fighter.vel_x * dt * 60
+        fighter.y += fighter.vel_y * dt * 60
+        
+        if fighter.y > p.ground_y:
+            fighter.y = p.ground_y
+            fighter.vel_y = 0
+            fighter.is_jumping = False
+            if fighter.state == CharacterState.FALLING:
+                fighter.state = CharacterState.IDLE
+        
+        if fighter.x < 0:
+            fighter.x = 0
+            fighter.vel_x = 0
+        elif fighter.x > p.max_x:
+            fighter.x = p.max_x
+            fighter.vel_x = 0
+    
+    # 攻击
+    if fighter.is_attacking:
+        move = fighter.attack_move
+        fighter.attack_frame += 1
+        if fighter.attack_frame > p.moves.total_frames[move]:
+            fighter.is_attacking = False
+            fighter.attack_frame = 0
+            fighter.attack_move = -1
+            fighter.has_hit_opponent = False
+            fighter.state = CharacterState.IDLE
+            fighter.attack_cooldown = p.moves.cooldown[move]
+        elif not fighter.has_hit_opponent:
+            _check_hit(fighter, opponent, p, q)
+    
+    # 攻击冷却
+    if fighter.attack_cooldown > 0:
+        fighter.attack_cooldown = max(fighter.attack_cooldown - dt, 0)
+    
+    # 角色碰撞推开
+    if (fighter.y >= p.ground_y and opponent.y >= q.ground_y and
+            not fighter.is_attacking and not opponent.is_attacking and
+            fighter.state != CharacterState.HIT and opponent.state != CharacterState.HIT and
+            fighter.state != CharacterState.DEFEATED and opponent.state != CharacterState.DEFEATED):
+        distance = abs(fighter.x - opponent.x)
+        min_distance = p.width * 1.0
+        if distance < min_distance:
+            push = (min_distance - distance) * 0.7
+            if fighter.x >= opponent.x:
+                push = -push
+            fighter.x = min(max(fighter.x - push, 0), p.max_x)
+            opponent.x = min(max(opponent.x + push, 0), q.max_x)
+
+
+def opponent_policy(opponent, fighter, rng):
+    """模拟中对手的动作：距离远时接近，距离近时随机攻击或格挡
+    
+    Args:
+        opponent: 对手SimFighter
+        fighter: 搜索方SimFighter
+        rng: 随机数生成器
+    
+    Returns:
+        动作ID
+    """
+    distance = abs(opponent.x - fighter.x)
+    if distance > 150:
+        return 2 if opponent.x < fighter.x else 1
+    roll = rng.random()
+    if roll < 0.5:
+        return rng.randint(6, 9)
+    if roll < 0.7:
+        return 5
+    return 0
+
+
+class _Node:
+    """搜索树节点（按动作序列组织）"""
+    
+    __slots__ = ("children", "visits", "value")
+    
+    def __init__(self):
+        self.children = None
+        self.visits = 0
+        self.value = 0.0
+
+
+class MCTSAI(CustomAIBase):
+    """基于蒙特卡洛树搜索的AI"""
+    
+    # 战斗快照需要保存的决策状态（搜索树只影响搜索效率，不保存）
+    SNAPSHOT_FIELDS = ("frames_until_decision", "current_action")
+    
+    def __init__(self, character, clock=None, time_budget=AI_SEARCH_TIME_BUDGET,
+                 max_iterations=None, action_frames=6, tree_depth=4, rollout_depth=4,
+                 exploration=1.0, seed=None):
+        """初始化搜索AI
+        
+        Args:
+            character: AI控制的角色
+            clock: 返回当前时间（秒）的函数
+            time_budget: 每次决策的搜索时间预算（秒）
+            max_iterations: 每次决策的最大迭代次数，设置后搜索结果可复现（如回放、测试）
+            action_frames: 每个动作持续的帧数（即决策间隔）
+            tree_depth: 搜索树的最大深度（动作数）
+            rollout_depth: 叶节点之后随机推演的动作数
+            exploration: UCT探索系数
+            seed: 搜索使用的随机种子
+        """
+        super().__init__(character, clock, seed)
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.action_frames = action_frames
+        self.tree_depth = tree_depth
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+        self.dt = 1.0 / 60
+        
+        self.frames_until_decision = 0
+        self.current_action = 0
+        self.root = _Node()
+        self.params = None
+        self.moves_first = True
+        
+        # 最近一次决策的统计信息
+        self.last_iterations = 0
+        self.last_simulated_frames = 0
+    
+    def update(self, dt, player_character):
+        """每帧调用：到达决策时刻时搜索并执行新动作
+        
+        Args:
+            dt: 时间增量（秒）
+            player_character: 对手角色
+        """
+        self.dt = dt
+        if self.frames_until_decision > 0:
+            self.frames_until_decision -= 1
+            return
+        self.make_decision(player_character)
+        self.frames_until_decision = self.action_frames - 1
+    
+    @metrics.timed(metrics.decision_histogram("MCTSAI"))
+    def make_decision(self, player_character):
+        """搜索并执行动作
+        
+        Args:
+            player_character: 对手角色
+        """
+        if self.params is None:
+            # 对手和角色名称在战斗开始后才确定，首次决策时再读取参数
+            self.params = (FighterParams(self.character), FighterParams(player_character))
+            self.moves_first = self.character.player_index < player_character.player_index
+        
+        action = self.search(player_character)
+        self.current_action = action
+        self._execute(action)
+        
+        # 复用所选动作的子树
+        children = self.root.children
+        self.root = children[action] if children and children[action] else _Node()
+    
+    def search(self, player_character):
+        """从当前局面搜索最佳动作
+        
+        Args:
+            player_character: 对手角色
+        
+        Returns:
+            动作ID
+        """
+        own_values = snapshot_character(self.character).values
+        opponent_values = snapshot_character(player_character).values
+        own_params, opponent_params = self.params
+        
+        deadline = time.perf_counter() + self.time_budget if self.time_budget else None
+        max_iterations = self.max_iterations
+        iterations = 0
+        simulated = 0
+        
+        while True:
+            if max_iterations is not None and iterations >= max_iterations:
+                break
+            if deadline is not None and iterations > 0 and time.perf_counter() >= deadline:
+                break
+            fighter = SimFighter.from_values(own_values, own_params)
+            opponent = SimFighter.from_values(opponent_values, opponent_params)
+            simulated += self._iterate(fighter, opponent)
+            iterations += 1
+        
+        self.last_iterations = iterations
+        self.last_simulated_frames = simulated
+        
+        children = self.root.children
+        if not children:
+            return 0
+        best = max(range(_ACTION_COUNT),
+                   key=lambda a: children[a].visits if children[a] else -1)
+        return best
+    
+    def _iterate(self, fighter, opponent):
+        """一次搜索迭代：选择、扩展、推演、回传
+        
+        Returns:
+            本次模拟的帧数
+        """
+        rng = self.rng
+        start_own = fighter.health
+        start_opponent = opponent.health
+        
+        path = [self.root]
+        node = self.root
+        frames = 0
+        
+        # 选择与扩展
+        for _ in range(self.tree_depth):
+            if node.children is None:
+                node.children = [None] * _ACTION_COUNT
+            action = self._select(node)
+            child = node.children[action]
+            expanded = child is None
+            if expanded:
+                child = node.children[action] = _Node()
+            frames += self._simulate_action(fighter, opponent, action)
+            path.append(child)
+            node = child
+            if expanded or fighter.health <= 0 or opponent.health <= 0:
+                break
+        
+        # 随机推演
+        for _ in range(self.rollout_depth):
+            if fighter.health <= 0 or opponent.health <= 0:
+                break
+            frames += self._simulate_action(fighter, opponent, rng.randrange(_ACTION_COUNT))
+        
+        value = self._evaluate(fighter, opponent, start_own, start_opponent)
+        for visited in path:
+            visited.visits += 1
+            visited.value += value
+        return frames
+    
+    def _select(self, node):
+        """UCT选择子节点，未访问过的动作优先（随机顺序）"""
+        children = node.children
+        unvisited = [a for a in range(_ACTION_COUNT) if children[a] is None]
+        if unvisited:
+            return self.rng.choice(unvisited)
+        
+        log_visits = math.log(node.visits + 1)
+        exploration = self.exploration
+        best_action = 0
+        best_score = -math.inf
+        for action, child in enumerate(children):
+            score = child.value / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_score = score
+                best_action = action
+        return best_action
+    
+    def _simulate_action(self, fighter, opponent, action):
+        """执行一个动作并模拟action_frames帧
+        
+        Returns:
+            模拟的帧数
+        """
+        dt = self.dt
+        apply_action(fighter, action)
+        apply_action(opponent, opponent_policy(opponent, fighter, self.rng))
+        # 按真实战斗中的更新顺序推进双方
+        first, second = (fighter, opponent) if self.moves_first else (opponent, fighter)
+        for _ in range(self.action_frames):
+            step_fighter(first, second, dt)
+            step_fighter(second, first, dt)
+        return self.action_frames
+    
+    def _evaluate(self, fighter, opponent, start_own, start_opponent):
+        """评估推演结束时的局面（搜索方视角）
+        
+        伤害差为主，击倒给额外奖励，并略微鼓励靠近对手。
+        """
+        value = ((start_opponent - opponent.health) - (start_own - fighter.health)) / 20.0
+        if opponent.health <= 0:
+            value += 1.0
+        elif fighter.health <= 0:
+            value -= 1.0
+        value -= abs(fighter.x - opponent.x) / STAGE_WIDTH * 0.1
+        return value
+    
+    def _execute(self, action):
+        """对真实角色执行动作（与apply_action的规则一致）"""
+        character = self.character
+        if action != 5 and character.is_blocking:
+            character.stop_blocking()
+        if action != 4 and character.is_crouching:
+            character.stand_up()
+        
+        if action == 1:
+            character.move_left()
+        elif action == 2:
+            character.move_right()
+        elif action == 3:
+            character.jump()
+        else:
+            character.stop_moving()
+            if action == 4:
+                character.crouch()
+            elif action == 5:
+                character.block()
+            elif action == 6:
+                character.light_punch()
+            elif action == 7:
+                character.heavy_punch()
+            elif action == 8:
+                character.light_kick()
+            elif action == 9:
+                character.heavy_kick()
@@ -0,0 +1,670 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+AI锦标赛
+
+按单败淘汰、双败淘汰或瑞士制编排AI之间的多局系列赛（如三局两胜），在进程池中并行进行，
+每个系列赛的每一局都保存到SQLite。赛程完全由参赛名单、赛制、随机种子和已完成的系列赛结果决定，
+中断后以相同的名称重新运行会从数据库读取已完成的系列赛，只进行剩下的系列赛。
+
+用法:
+    python -m src.ai.tournament --name cup --format double --best-of 3 --workers 8
+    python -m src.ai.tournament --name swiss --format swiss --rounds 5 --only aggressive-3 defensive-3 mcts simple
+"""
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+import multiprocessing
+from src.engine import config
+from src.engine.config import ROUND_TIME
+from src.engine.rng import derive_seed
+from src.engine.match_stats import StatsWarehouse
+from src.ai.ladder import LADDER_CHARACTERS, default_roster, _init_worker, _play_match
+
+# 默认数据库文件
+DEFAULT_DB_PATH = os.path.join("results", "tournament.db")
+
+# 赛制
+SINGLE_ELIMINATION = "single"
+DOUBLE_ELIMINATION = "double"
+SWISS = "swiss"
+FORMATS = (SINGLE_ELIMINATION, DOUBLE_ELIMINATION, SWISS)
+
+# 每积累这么多个系列赛写入一次数据库（一个事务）
+DEFAULT_BATCH_SIZE = 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    format TEXT NOT NULL,
+    config TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS series (
+    tournament_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    p1 TEXT NOT NULL,
+    p2 TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    p1_wins INTEGER NOT NULL,
+    p2_wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    PRIMARY KEY (tournament_id, key)
+);
+CREATE TABLE IF NOT EXISTS games (
+    tournament_id INTEGER NOT NULL,
+    series_key TEXT NOT NULL,
+    game INTEGER NOT NULL,
+    p1 TEXT NOT NULL,
+    p2 TEXT NOT NULL,
+    character TEXT NOT NULL,
+    seed TEXT NOT NULL,  -- 64位无符号种子，超出SQLite整数范围
+    winner TEXT,
+    p1_health INTEGER NOT NULL,
+    p2_health INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    PRIMARY KEY (tournament_id, series_key, game)
+);
+"""
+
+
+def _play_series(job):
+    """在工作进程中进行一个系列赛（先赢下过半局数者胜，平局不计）
+    
+    双方交替使用玩家1位置，角色按局数轮换。平局过多时最多进行best_of的两倍局数。
+    
+    Args:
+        job: (系列赛编号, 名称1, 描述1, 名称2, 描述2, 局数, 每局最长时间, 系列赛种子)
+    
+    Returns:
+        (系列赛编号, [每局结果字典])
+    """
+    key, name1, spec1, name2, spec2, best_of, max_time, seed = job
+    need = best_of // 2 + 1
+    wins = {name1: 0, name2: 0}
+    games = []
+    for game in range(best_of * 2):
+        if max(wins.values()) >= need:
+            break
+        p1, p2, p1_spec, p2_spec = (name1, name2, spec1, spec2) if game % 2 == 0 else (name2, name1, spec2, spec1)
+        character = LADDER_CHARACTERS[game % len(LADDER_CHARACTERS)]
+        game_seed = derive_seed(seed, "game", game)
+        result = _play_match((p1_spec, p2_spec, character, max_time, game_seed))
+        winner = None if result["winner"] is None else (p1, p2)[result["winner"]]
+        if winner is not None:
+            wins[winner] += 1
+        games.append({
+            "game": game,
+            "p1": p1,
+            "p2": p2,
+            "character": character,
+            "seed": game_seed,
+            "winner": winner,
+            "p1_health": result["p1_health"],
+            "p2_health": result["p2_health"],
+            "frames": result["frames"],
+            "match_stats": result["match_stats"]
+        })
+    return key, games
+
+
+def series_result(key, name1, name2, games):
+    """汇总系列赛结果
+    
+    胜局数相同时（平局过多）比较各局剩余生命值之差的总和，仍相同时种子靠前的一方（名称1）胜。
+    
+    Args:
+        key: 系列赛编号
+        name1: 种子靠前的一方
+        name2: 另一方
+        games: _play_series返回的每局结果
+    
+    Returns:
+        系列赛结果字典
+    """
+    wins = {name1: 0, name2: 0}
+    margin = 0  # 名称1一方的剩余生命值之差总和
+    for game in games:
+        if game["winner"] is not None:
+            wins[game["winner"]] += 1
+        difference = game["p1_health"] - game["p2_health"]
+        margin += difference if game["p1"] == name1 else -difference
+    
+    if wins[name1] != wins[name2]:
+        winner = name1 if wins[name1] > wins[name2] else name2
+    else:
+        winner = name1 if margin >= 0 else name2
+    return {
+        "key": key,
+        "p1": name1,
+        "p2": name2,
+        "winner": winner,
+        "p1_wins": wins[name1],
+        "p2_wins": wins[name2],
+        "draws": sum(1 for game in games if game["winner"] is None)
+    }
+
+
+def seeding_order(size):
+    """标准淘汰赛签位：第1和第2种子只可能在决赛相遇
+    
+    Args:
+        size: 签位数（2的幂）
+    
+    Returns:
+        每个签位的种子序号（从0开始），如size=8时为[0, 7, 3, 4, 1, 6, 2, 5]
+    """
+    order = [0]
+    while len(order) < size:
+        count = len(order) * 2
+        order = [seed for top in order for seed in (top, count - 1 - top)]
+    return order
+
+
+class EliminationBracket:
+    """单败或双败淘汰赛
+    
+    每个系列赛的双方来自种子签位、另一个系列赛的胜者或负者；参赛人数不是2的幂时空出的签位为轮空，
+    轮空的系列赛不进行比赛，另一方直接晋级（双方都轮空时晋级者也是轮空）。
+    双败淘汰的总决赛中败者组冠军获胜时，再进行一个系列赛决出冠军。
+    """
+    
+    def __init__(self, entrants, double=False):
+        """编排赛程
+        
+        Args:
+            entrants: 按种子排列的参赛者名称（至少2个）
+            double: 是否双败淘汰
+        """
+        if len(entrants) < 2:
+            raise ValueError("至少需要2名参赛者")
+        self.entrants = list(entrants)
+        self.double = double
+        self.nodes = {}  # {编号: (来源1, 来源2)}，来源为("seed", 序号)、("winner", 编号)或("loser", 编号)
+        
+        rounds = 1
+        while 2 ** rounds < len(entrants):
+            rounds += 1
+        size = 2 ** rounds
+        order = seeding_order(size)
+        
+        # 胜者组
+        for match in range(size // 2):
+            self.nodes[f"W1-{match + 1}"] = (("seed", order[2 * match]), ("seed", order[2 * match + 1]))
+        for round_number in range(2, rounds + 1):
+            for match in range(size // 2 ** round_number):
+                self.nodes[f"W{round_number}-{match + 1}"] = (
+                    ("winner", f"W{round_number - 1}-{2 * match + 1}"),
+                    ("winner", f"W{round_number - 1}-{2 * match + 2}"))
+        self.final = f"W{rounds}-1"
+        if not double:
+            return
+        
+        # 败者组：奇数轮在败者组内部对决，偶数轮迎战从胜者组掉下来的选手（交替倒序，减少重复对决）
+        if rounds == 1:
+            loser_champion = ("loser", "W1-1")
+        else:
+            for match in range(size // 4):
+                self.nodes[f"L1-{match + 1}"] = (("loser", f"W1-{2 * match + 1}"), ("loser", f"W1-{2 * match + 2}"))
+            for step in range(1, rounds):
+                count = size // 2 ** (step + 1)
+                for match in range(count):
+                    dropped = count - match if step % 2 == 1 else match + 1
+                    self.nodes[f"L{2 * step}-{match + 1}"] = (
+                        ("winner", f"L{2 * step - 1}-{match + 1}"), ("loser", f"W{step + 1}-{dropped}"))
+                if step < rounds - 1:
+                    for match in range(count // 2):
+                        self.nodes[f"L{2 * step + 1}-{match + 1}"] = (
+                            ("winner", f"L{2 * step}-{2 * match + 1}"), ("winner", f"L{2 * step}-{2 * match + 2}"))
+            loser_champion = ("winner", f"L{2 * (rounds - 1)}-1")
+        
+        self.nodes["GF"] = (("winner", self.final), loser_champion)
+        self.nodes["GF2"] = (("winner", "GF"), ("loser", "GF"))
+        self.winners_final = self.final
+        self.final = "GF2"
+    
+    def _resolve(self, source, results, cache):
+        """解析来源
+        
+        Returns:
+            (是否已确定, 名称或None)，None表示轮空
+        """
+        kind, value = source
+        if kind == "seed":
+            return True, self.entrants[value] if value < len(self.entrants) else None
+        outcome = self._outcome(value, results, cache)
+        if outcome is None:
+            return False, None
+        return True, outcome[0] if kind == "winner" else outcome[1]
+    
+    def _outcome(self, key, results, cache):
+        """系列赛的结果
+        
+        Returns:
+            (胜者, 负者)，尚未进行时返回None
+        """
+        if key in cache:
+            return cache[key]
+        first, second = self.nodes[key]
+        ready1, name1 = self._resolve(first, results, cache)
+        ready2, name2 = self._resolve(second, results, cache)
+        if not (ready1 and ready2):
+            outcome = None
+        elif name1 is None or name2 is None:
+            outcome = (name1 if name1 is not None else name2, None)
+        elif key == "GF2" and name1 == self._outcome(self.winners_final, results, cache)[0]:
+            # 胜者组冠军赢下总决赛，不需要再赛
+            outcome = (name1, None)
+        elif key in results:
+            winner = results[key]["winner"]
+            outcome = (winner, name2 if winner == name1 else name1)
+        else:
+            outcome = None
+        cache[key] = outcome
+        return outcome
+    
+    def runnable(self, results):
+        """可以进行的系列赛
+        
+        Args:
+            results: {编号: 系列赛结果}
+        
+        Returns:
+            [(编号, 名称1, 名称2)]，名称1种子靠前或来自胜者一方
+        """
+        cache = {}
+        ready = []
+        for key, (first, second) in self.nodes.items():
+            if key in results:
+                continue
+            ready1, name1 = self._resolve(first, results, cache)
+            ready2, name2 = self._resolve(second, results, cache)
+            if ready1 and ready2 and self._outcome(key, results, cache) is None:
+                ready.append((key, name1, name2))
+        return ready
+    
+    def champion(self, results):
+        """冠军名称，尚未决出时返回None"""
+        outcome = self._outcome(self.final, results, {})
+        return outcome[0] if outcome else None
+    
+    def report(self, results):
+        """生成赛果文本"""
+        lines = []
+        for key in self.nodes:
+            if key in results:
+                series = results[key]
+                lines.append(f"{key:<8}{series['p1']:>16} {series['p1_wins']}-{series['p2_wins']} "
+                             f"{series['p2']:<16}胜者: {series['winner']}")
+        champion = self.champion(results)
+        lines.append(f"冠军: {champion}" if champion else "冠军尚未决出")
+        return "\n".join(lines)
+
+
+class SwissBracket:
+    """瑞士制：每轮按积分配对，尽量避免重复对决
+    
+    积分相同时按对手积分总和（Buchholz）、胜局数和种子排序；人数为奇数时排名最低且未轮空过的选手轮空，
+    轮空记1分。每一轮的配对都由之前各轮的结果决定，所以可以从已完成的系列赛重新推算。
+    """
+    
+    def __init__(self, entrants, rounds=None):
+        """初始化
+        
+        Args:
+            entrants: 按种子排列的参赛者名称（至少2个）
+            rounds: 轮数，None表示log2(人数)向上取整
+        """
+        if len(entrants) < 2:
+            raise ValueError("至少需要2名参赛者")
+        self.entrants = list(entrants)
+        if rounds is None:
+            rounds = 1
+            while 2 ** rounds < len(entrants):
+                rounds += 1
+        self.rounds = rounds
+    
+    def _standings(self, played_rounds, results):
+        """按已完成的轮次计算积分
+        
+        Returns:
+            {名称: {"points", "buchholz", "game_wins", "opponents", "byes"}}
+        """
+        table = {name: {"points": 0, "buchholz": 0, "game_wins": 0, "opponents": [], "byes": 0}
+                 for name in self.entrants}
+        for pairs, bye in played_rounds:
+            if bye is not None:
+                table[bye]["points"] += 1
+                table[bye]["byes"] += 1
+            for key, name1, name2 in pairs:
+                series = results[key]
+                table[series["winner"]]["points"] += 1
+                table[name1]["game_wins"] += series["p1_wins"]
+                table[name2]["game_wins"] += series["p2_wins"]
+                table[name1]["opponents"].append(name2)
+                table[name2]["opponents"].append(name1)
+        for row in table.values():
+            row["buchholz"] = sum(table[opponent]["points"] for opponent in row["opponents"])
+        return table
+    
+    def _ranking(self, table):
+        """按积分排序的名称列表"""
+        seeds = {name: index for index, name in enumerate(self.entrants)}
+        return sorted(self.entrants, key=lambda name: (-table[name]["points"], -table[name]["buchholz"],
+                                                       -table[name]["game_wins"], seeds[name]))
+    
+    def _pair(self, ranked, table):
+        """从高到低配对，回溯避免重复对决；无法避免时按排名相邻配对"""
+        def search(remaining):
+            if not remaining:
+                return []
+            first = remaining[0]
+            for index in range(1, len(remaining)):
+                second = remaining[index]
+                if second in table[first]["opponents"]:
+                    continue
+                rest = search(remaining[1:index] + remaining[index + 1:])
+                if rest is not None:
+                    return [(first, second)] + rest
+            return None
+        
+        pairs = search(ranked)
+        if pairs is None:
+            pairs = [(ranked[i], ranked[i + 1]) for i in range(0, len(ranked), 2)]
+        return pairs
+    
+    def _rounds(self, results):
+        """推算所有已能确定配对的轮次
+        
+        Returns:
+            [(配对列表[(编号, 名称1, 名称2)], 轮空者或None)]
+        """
+        rounds = []
+        for round_number in range(1, self.rounds + 1):
+            if rounds and any(key not in results for key, _, _ in rounds[-1][0]):
+                break  # 上一轮还没有完成
+            
+            table = self._standings(rounds, results)
+            if round_number == 1:
+                ranked = list(self.entrants)
+            else:
+                ranked = self._ranking(table)
+            
+            bye = None
+            if len(ranked) % 2 == 1:
+                bye = next((name for name in reversed(ranked) if table[name]["byes"] == 0), ranked[-1])
+                ranked.remove(bye)
+            
+            if round_number == 1:
+                # 第一轮上半区对下半区
+                half = len(ranked) // 2
+                pairs = list(zip(ranked[:half], ranked[half:]))
+            else:
+                pairs = self._pair(ranked, table)
+            rounds.append(([(f"S{round_number}-{table_number + 1}", name1, name2)
+                            for table_number, (name1, name2) in enumerate(pairs)], bye))
+        return rounds
+    
+    def runnable(self, results):
+        """可以进行的系列赛（当前轮次中尚未完成的）"""
+        rounds = self._rounds(results)
+        if not rounds:
+            return []
+        return [pair for pair in rounds[-1][0] if pair[0] not in results]
+    
+    def standings(self, results):
+        """已完成轮次的排名
+        
+        Returns:
+            [(名称, 积分行)]
+        """
+        rounds = [round_ for round_ in self._rounds(results)
+                  if all(key in results for key, _, _ in round_[0])]
+        table = self._standings(rounds, results)
+        return [(name, table[name]) for name in self._ranking(table)]
+    
+    def champion(self, results):
+        """全部轮次完成后排名第一的选手，否则返回None"""
+        rounds = self._rounds(results)
+        if len(rounds) < self.rounds or self.runnable(results):
+            return None
+        return self.standings(results)[0][0]
+    
+    def report(self, results):
+        """生成积分榜文本"""
+        lines = [f"{'排名':<4}{'AI':<16}{'积分':>6}{'对手分':>8}{'胜局':>6}"]
+        for rank, (name, row) in enumerate(self.standings(results), 1):
+            lines.append(f"{rank:<4}{name:<16}{row['points']:>6}{row['buchholz']:>8}{row['game_wins']:>6}")
+        champion = self.champion(results)
+        lines.append(f"冠军: {champion}" if champion else "比赛尚未结束")
+        return "\n".join(lines)
+
+
+class TournamentStore:
+    """锦标赛数据库：系列赛和每局结果，分批在一个事务中写入"""
+    
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        """打开（或创建）数据库
+        
+        Args:
+            path: 数据库文件路径
+            batch_size: 每批写入的系列赛数量
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+        self.batch_size = batch_size
+        self.pending_series = []
+        self.pending_games = []
+    
+    def open_tournament(self, name, format_name, config):
+        """获取锦标赛编号，不存在时创建
+        
+        Args:
+            name: 锦标赛名称
+            format_name: 赛制
+            config: 决定赛程的配置（参赛名单、局数、种子等），续赛时必须一致
+        
+        Returns:
+            锦标赛编号
+        """
+        encoded = json.dumps(config, ensure_ascii=False, sort_keys=True)
+        row = self.connection.execute("SELECT id, format, config FROM tournaments WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            if row[1] != format_name or row[2] != encoded:
+                raise ValueError(f"锦标赛{name}已存在且配置不同，请使用新的名称")
+            return row[0]
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO tournaments (name, format, config, created) VALUES (?, ?, ?, ?)",
+                (name, format_name, encoded, time.time()))
+        return cursor.lastrowid
+    
+    def load_series(self, tournament_id):
+        """读取已完成的系列赛
+        
+        Returns:
+            {编号: 系列赛结果}
+        """
+        rows = self.connection.execute(
+            "SELECT key, p1, p2, winner, p1_wins, p2_wins, draws FROM series WHERE tournament_id = ?",
+            (tournament_id,))
+        return {row[0]: dict(zip(("key", "p1", "p2", "winner", "p1_wins", "p2_wins", "draws"), row)) for row in rows}
+    
+    def add(self, tournament_id, series, games):
+        """记录一个系列赛（积累到batch_size个后写入）
+        
+        Args:
+            tournament_id: 锦标赛编号
+            series: 系列赛结果
+            games: 每局结果
+        """
+        self.pending_series.append((tournament_id, series["key"], series["p1"], series["p2"], series["winner"],
+                                    series["p1_wins"], series["p2_wins"], series["draws"]))
+        for game in games:
+            self.pending_games.append((tournament_id, series["key"], game["game"], game["p1"], game["p2"],
+                                       game["character"], str(game["seed"]), game["winner"], game["p1_health"],
+                                       game["p2_health"], game["frames"]))
+        if len(self.pending_series) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """在一个事务中写入积累的结果"""
+        if not self.pending_series:
+            return
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                        self.pending_series)
+            self.connection.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                        self.pending_games)
+        self.pending_series = []
+        self.pending_games = []
+    
+    def close(self):
+        """写入剩余结果并关闭"""
+        self.flush()
+        self.connection.close()
+
+
+class Tournament:
+    """锦标赛：编排赛程、分发系列赛并记录结果"""
+    
+    def __init__(self, store, name, roster, format_name=SINGLE_ELIMINATION, best_of=3, seed=0,
+                 max_time=ROUND_TIME, rounds=None):
+        """初始化（数据库中已有同名锦标赛时读取已完成的系列赛）
+        
+        Args:
+            store: TournamentStore
+            name: 锦标赛名称
+            roster: {名称: 控制器描述}字典，按种子排列
+            format_name: 赛制（single、double或swiss）
+            best_of: 每个系列赛的局数（奇数）
+            seed: 总随机种子
+            max_time: 每局最长时间（秒）
+            rounds: 瑞士制的轮数，None表示自动
+        """
+        if format_name not in FORMATS:
+            raise ValueError(f"未知的赛制: {format_name}")
+        if best_of < 1 or best_of % 2 == 0:
+            raise ValueError("局数必须是正奇数")
+        self.store = store
+        self.roster = dict(roster)
+        self.best_of = best_of
+        self.seed = seed
+        self.max_time = max_time
+        
+        entrants = list(self.roster)
+        if format_name == SWISS:
+            self.bracket = SwissBracket(entrants, rounds)
+        else:
+            self.bracket = EliminationBracket(entrants, format_name == DOUBLE_ELIMINATION)
+        
+        config = {"roster": self.roster, "best_of": best_of, "seed": seed, "max_time": max_time}
+        if format_name == SWISS:
+            config["rounds"] = self.bracket.rounds
+        self.tournament_id = store.open_tournament(name, format_name, config)
+        self.results = store.load_series(self.tournament_id)
+    
+    def _job(self, key, name1, name2):
+        """系列赛的工作进程参数"""
+        return (key, name1, self.roster[name1], name2, self.roster[name2], self.best_of, self.max_time,
+                derive_seed(self.seed, "series", key))
+    
+    def run(self, workers=None):
+        """进行所有尚未完成的系列赛
+        
+        同一批可以进行的系列赛互不依赖，全部交给进程池；完成后根据结果得到下一批。
+        
+        Args:
+            workers: 进程数，None表示CPU核数
+        
+        Returns:
+            本次进行的系列赛数量
+        """
+        ready = self.bracket.runnable(self.results)
+        if not ready:
+            # 已全部完成（续赛时）：不创建进程池
+            return 0
+        
+        played = 0
+        # 每局的详细统计写入统计仓库
+        warehouse = StatsWarehouse(config.MATCH_STATS_DB) if config.MATCH_STATS_DB else None
+        pool = multiprocessing.Pool(workers, initializer=_init_worker)
+        try:
+            while ready:
+                start = time.time()
+                names = {key: (name1, name2) for key, name1, name2 in ready}
+                jobs = [self._job(key, name1, name2) for key, name1, name2 in ready]
+                for key, games in pool.imap_unordered(_play_series, jobs):
+                    series = series_result(key, *names[key], games)
+                    self.results[key] = series
+                    self.store.add(self.tournament_id, series, games)
+                    if warehouse is not None:
+                        for game in games:
+                            warehouse.add(game["match_stats"], "tournament",
+                                          (self.roster[game["p1"]], self.roster[game["p2"]]))
+                    played += 1
+                self.store.flush()
+                print(f"完成{len(ready)}个系列赛: {', '.join(key for key, _, _ in ready)}，"
+                      f"用时{time.time() - start:.1f}秒")
+                ready = self.bracket.runnable(self.results)
+        except BaseException:
+            # 中断或出错时才强制结束工作进程
+            pool.terminate()
+            raise
+        finally:
+            # 中断时也写入已完成的系列赛，续赛时不再重复进行
+            self.store.flush()
+            if warehouse is not None:
+                warehouse.close()
+        pool.close()
+        pool.join()
+        return played
+    
+    def champion(self):
+        """冠军名称，尚未决出时返回None"""
+        return self.bracket.champion(self.results)
+    
+    def report(self):
+        """生成赛果文本"""
+        return self.bracket.report(self.results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI锦标赛")
+    parser.add_argument("--name", required=True, help="锦标赛名称（同名时继续之前中断的锦标赛）")
+    parser.add_argument("--format", choices=FORMATS, default=SINGLE_ELIMINATION, help="赛制")
+    parser.add_argument("--best-of", type=int, default=3, help="每个系列赛的局数（奇数）")
+    parser.add_argument("--rounds", type=int, default=None, help="瑞士制轮数（默认log2(人数)）")
+    parser.add_argument("--workers", type=int, default=None, help="进程数（默认CPU核数）")
+    parser.add_argument("--max-time", type=float, default=ROUND_TIME, help="每局最长模拟时间（秒）")
+    parser.add_argument("--entrant", action="append", default=[],
+                        help="额外参赛AI，格式: 名称=控制器描述（如 ml-v2=ml:models/new.h5）")
+    parser.add_argument("--only", nargs="*", default=None, help="只让指定名称的AI参赛（按给出的顺序排种子）")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="数据库文件路径")
+    parser.add_argument("--seed", type=int, default=0, help="总随机种子")
+    args = parser.parse_args()
+    
+    roster = default_roster()
+    for entrant in args.entrant:
+        name, spec = entrant.split("=", 1)
+        roster[name] = spec
+    if args.only:
+        roster = {name: roster[name] for name in args.only if name in roster}
+    
+    store = TournamentStore(args.db)
+    try:
+        tournament = Tournament(store, args.name, roster, args.format, args.best_of, args.seed,
+                                args.max_time, args.rounds)
+        if tournament.results:
+            print(f"继续锦标赛{args.name}：已完成{len(tournament.results)}个系列赛")
+        tournament.run(args.workers)
+        print(tournament.report())
+    finally:
+        store.close()
+    print(f"结果已保存到 {args.db}")
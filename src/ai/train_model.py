@@ -6,6 +6,8 @@
 """
 
 import os
+import sys
+import argparse
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
@@ -14,6 +16,11 @@ from tensorflow.keras.optimizers import Adam
 import random
 import math
 
+# 以脚本方式运行时（python src/ai/train_model.py）把项目根目录加入搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.engine.rng import derive_seed, make_rng, make_numpy_rng
+
 # 创建模型保存目录
 os.makedirs("models", exist_ok=True)
 
@@ -74,28 +81,30 @@ def create_model(use_lstm=False):
     
     return model
 
-def generate_advanced_training_data(num_samples=10000):
+def generate_advanced_training_data(num_samples=10000, rng=None):
     """生成高级训练数据，融入更多格斗游戏策略
     
     Args:
         num_samples: 生成的样本数量
-        
+        rng: 随机数生成器，None表示不可复现
+    
     Returns:
         特征和标签
     """
+    rng = rng or random.Random()
     X = []  # 特征
     y = []  # 标签
     
     for _ in range(num_samples):
         # 生成随机状态
-        ai_x = random.randint(0, 800)
-        ai_y = random.randint(200, 400)
-        ai_health = random.randint(1, 100)
-        player_x = random.randint(0, 800)
-        player_y = random.randint(200, 400)
-        player_health = random.randint(1, 100)
-        player_attacking = random.choice([0, 1])
-        ai_blocking = random.choice([0, 1])
+        ai_x = rng.randint(0, 800)
+        ai_y = rng.randint(200, 400)
+        ai_health = rng.randint(1, 100)
+        player_x = rng.randint(0, 800)
+        player_y = rng.randint(200, 400)
+        player_health = rng.randint(1, 100)
+        player_attacking = rng.choice([0, 1])
+        ai_blocking = rng.choice([0, 1])
         
         # 计算距离
         horizontal_distance = player_x - ai_x
@@ -121,7 +130,7 @@ def generate_advanced_training_data(num_samples=10000):
             ai_x, ai_y, ai_health, 
             player_x, player_y, player_health, 
             horizontal_distance, vertical_distance,
-            player_attacking, ai_blocking
+            player_attacking, ai_blocking, rng
         )
         
         # 添加到训练数据
@@ -138,7 +147,7 @@ def _decide_action_with_advanced_strategy(
     ai_x, ai_y, ai_health, 
     player_x, player_y, player_health, 
     horizontal_distance, vertical_distance,
-    player_attacking, ai_blocking
+    player_attacking, ai_blocking, rng
 ):
     """使用高级策略决定动作
     
@@ -153,53 +162,53 @@ def _decide_action_with_advanced_strategy(
     if player_attacking:
         # 近距离时大概率格挡
         if abs_horizontal_distance < 120:
-            if random.random() < 0.75:  # 75%概率格挡
+            if rng.random() < 0.75:  # 75%概率格挡
                 return 5  # 格挡
-            elif random.random() < 0.5:
+            elif rng.random() < 0.5:
                 return 3  # 跳跃躲避
             else:
                 return 4  # 蹲下躲避
         
         # 中距离时有可能后退
         elif abs_horizontal_distance < 250:
-            if random.random() < 0.4:  # 40%概率后退
+            if rng.random() < 0.4:  # 40%概率后退
                 return 1 if ai_x > player_x else 2  # 向相反方向移动
-            elif random.random() < 0.4:
+            elif rng.random() < 0.4:
                 return 5  # 格挡
             else:
                 # 逆向思维：攻击是最好的防守
-                return random.choice([6, 7, 8, 9])
+                return rng.choice([6, 7, 8, 9])
     
     # 2. 处理距离因素
     # 太近，需要拉开距离
     if abs_horizontal_distance < 50:
         # 血量低的时候更倾向于拉开距离
-        if ai_health < player_health and random.random() < 0.7:
+        if ai_health < player_health and rng.random() < 0.7:
             return 1 if ai_x < player_x else 2  # 向远离玩家的方向移动
         # 否则更倾向于攻击
         else:
             # 根据玩家位置选择合适的攻击
             if abs(vertical_distance) > 50:  # 垂直距离较大时
-                return random.choice([8, 9])  # 使用腿法攻击，范围更大
+                return rng.choice([8, 9])  # 使用腿法攻击，范围更大
             else:
-                return random.choice([6, 7])  # 使用拳法攻击，速度更快
+                return rng.choice([6, 7])  # 使用拳法攻击，速度更快
     
     # 近距离，适合攻击
     elif abs_horizontal_distance < 120:
         # 攻击判断
-        if ai_health > player_health or random.random() < 0.7:
+        if ai_health > player_health or rng.random() < 0.7:
             # 健康时更激进
             attack_chance = 0.8
         else:
             # 血量低时更保守
             attack_chance = 0.3
         
-        if random.random() < attack_chance:
+        if rng.random() < attack_chance:
             # 垂直距离影响攻击选择
             if abs(vertical_distance) > 50:
-                return random.choice([8, 9])  # 使用腿法
+                return rng.choice([8, 9])  # 使用腿法
             else:
-                return random.choice([6, 7])  # 使用拳法
+                return rng.choice([6, 7])  # 使用拳法
         else:
             return 5  # 格挡
     
@@ -207,17 +216,17 @@ def _decide_action_with_advanced_strategy(
     elif abs_horizontal_distance < 300:
         # 血量高于玩家时更倾向于靠近
         if ai_health >= player_health:
-            if random.random() < 0.7:  # 70%概率接近玩家
+            if rng.random() < 0.7:  # 70%概率接近玩家
                 return 2 if ai_x < player_x else 1  # 向玩家方向移动
-            elif random.random() < 0.2:
+            elif rng.random() < 0.2:
                 return 3  # 跳跃接近
             else:
                 return 0  # 站立不动，等待玩家接近
         # 血量低于玩家时更倾向于保持距离
         else:
-            if random.random() < 0.6:  # 60%概率保持距离
+            if rng.random() < 0.6:  # 60%概率保持距离
                 return 1 if ai_x < player_x else 2  # 向远离玩家方向移动
-            elif random.random() < 0.3:
+            elif rng.random() < 0.3:
                 return 5  # 尝试格挡
             else:
                 return 0  # 站立不动，评估形势
@@ -229,9 +238,9 @@ def _decide_action_with_advanced_strategy(
         if ai_health < player_health * 0.5:  # 血量低于玩家一半
             approach_chance = 0.5
         
-        if random.random() < approach_chance:
+        if rng.random() < approach_chance:
             # 大部分时候选择移动接近
-            if random.random() < 0.8:
+            if rng.random() < 0.8:
                 return 2 if ai_x < player_x else 1  # 向玩家方向移动
             else:
                 return 3  # 跳跃接近
@@ -239,22 +248,68 @@ def _decide_action_with_advanced_strategy(
             return 0  # 站立不动，可能是等待时机
     
     # 默认行为：随机选择
-    return random.randrange(len(ACTIONS))
+    return rng.randrange(len(ACTIONS))
 
-def train_model():
-    """训练模型并保存"""
+def load_recorded_data(data_dir, winners_only=False, val_fraction=0.1, rng=None):
+    """加载对战记录分片并划分训练集和验证集
+    
+    Args:
+        data_dir: 分片目录（由src/ai/data_recorder.py生成）
+        winners_only: 是否只使用获胜方的样本
+        val_fraction: 验证集比例
+        rng: numpy随机数生成器（用于打乱），None表示不可复现
+    
+    Returns:
+        X_train, y_train, X_val, y_val
+    """
+    from src.ai.data_recorder import load_training_data
+    
+    X, y = load_training_data(data_dir, winners_only=winners_only)
+    print(f"从 {data_dir} 加载了 {len(X)} 个对战样本")
+    
+    # 打乱后划分验证集
+    order = (rng or np.random.default_rng()).permutation(len(X))
+    X, y = X[order], y[order]
+    val_count = max(1, int(len(X) * val_fraction))
+    return X[val_count:], y[val_count:], X[:val_count], y[:val_count]
+
+def train_model(data_dir=None, winners_only=False, mix_synthetic=False, seed=None):
+    """训练模型并保存
+    
+    Args:
+        data_dir: 对战记录分片目录，为None时只使用规则生成的数据
+        winners_only: 是否只使用获胜方的对战样本
+        mix_synthetic: 使用对战数据时是否同时混入规则生成的数据
+        seed: 总随机种子，None表示不可复现
+    """
     print("开始训练AI模型...")
     
+    # 数据生成、数据集划分和网络初始化各用独立的随机数流
+    if seed is not None:
+        tf.random.set_seed(derive_seed(seed, "train", "tensorflow") % 2 ** 31)
+    synthetic_rng = make_rng(seed, "train", "synthetic")
+    
     # 创建模型
     use_lstm = False  # 使用普通前馈网络，因为LSTM需要更多数据
     model = create_model(use_lstm)
     
-    # 生成高级训练数据
-    print("生成训练数据...")
-    X_train, y_train = generate_advanced_training_data(20000)  # 增加到20000个样本
-    
-    # 生成验证数据
-    X_val, y_val = generate_advanced_training_data(3000)  # 增加到3000个样本
+    if data_dir:
+        # 使用真实对战数据
+        X_train, y_train, X_val, y_val = load_recorded_data(
+            data_dir, winners_only, rng=make_numpy_rng(seed, "train", "split"))
+        if mix_synthetic:
+            print("混入规则生成的训练数据...")
+            X_syn, y_syn = generate_advanced_training_data(20000, synthetic_rng)
+            X_train = np.concatenate([X_train, X_syn])
+            y_train = np.concatenate([y_train, y_syn])
+    else:
+        # 生成高级训练数据
+        print("生成训练数据...")
+        X_train, y_train = generate_advanced_training_data(20000, synthetic_rng)  # 增加到20000个样本
+        
+        # 生成验证数据
+        X_val, y_val = generate_advanced_training_data(
+            3000, make_rng(seed, "train", "validation"))  # 增加到3000个样本
     
     # 训练回调
     callbacks = [
@@ -293,4 +348,10 @@ def train_model():
     return model
 
 if __name__ == "__main__":
-    train_model() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="训练格斗游戏AI模型")
+    parser.add_argument("--data", default=None, help="对战记录分片目录（不指定则使用规则生成的数据）")
+    parser.add_argument("--winners-only", action="store_true", help="只使用获胜方的样本")
+    parser.add_argument("--mix-synthetic", action="store_true", help="同时混入规则生成的数据")
+    parser.add_argument("--seed", type=int, default=None, help="总随机种子（指定后结果可复现）")
+    args = parser.parse_args()
+    train_model(args.data, args.winners_only, args.mix_synthetic, args.seed)
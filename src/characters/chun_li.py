@@ -8,6 +8,9 @@ from src.characters.character import Character, CharacterState, Direction
 class ChunLi(Character):
     """Chun-Li角色类"""
     
+    # 招式帧数据见src/characters/moves/chun_li.json
+    MOVE_TABLE = "chun_li"
+    
     def __init__(self, x, y):
         """初始化Chun-Li角色"""
         super().__init__(x, y, "Chun-Li")
@@ -167,15 +170,3 @@ class ChunLi(Character):
                 sprites[state][Direction.LEFT].append(flipped)
         
         return sprites
-    
-    # Chun-Li的特殊能力
-    def light_kick(self):
-        """Chun-Li的轻腿（可能比基类伤害更高）"""
-        super().light_kick()
-        # Chun-Li的腿法更强，但这需要修改父类方法
-        # 这里只是示例，实际效果依赖于Character类的实现
-    
-    def heavy_kick(self):
-        """Chun-Li的重腿（可能有特殊效果）"""
-        super().heavy_kick()
-        # Chun-Li的重腿可能有特殊效果 
\ No newline at end of file
@@ -8,6 +8,9 @@ from src.characters.character import Character, CharacterState, Direction
 class Ken(Character):
     """Ken角色类"""
     
+    # 招式帧数据见src/characters/moves/ken.json
+    MOVE_TABLE = "ken"
+    
     def __init__(self, x, y):
         """初始化Ken角色"""
         super().__init__(x, y, "Ken")
@@ -167,10 +170,3 @@ class Ken(Character):
                 sprites[state][Direction.LEFT].append(flipped)
         
         return sprites
-    
-    # Ken的特殊能力
-    def heavy_punch(self):
-        """Ken的重拳（可能比基类伤害更高）"""
-        super().heavy_punch()
-        # Ken的重拳伤害更高，但这需要修改父类方法
-        # 这里只是示例，实际效果依赖于Character类的实现 
\ No newline at end of file
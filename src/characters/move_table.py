@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+招式帧数据表
+
+每个角色的招式参数（前摇/判定/收招帧数、判定框、伤害、冷却、动画速度）保存在
+src/characters/moves/<表名>.json 中，加载时编译为按招式编号索引的扁平元组，
+命中检测只做下标查找。调整平衡只需修改JSON，不需要改代码。
+
+帧以FPS为单位：招式开始后第1帧起计数，前摇startup帧之后的active帧内可以命中，
+再经过recovery帧收招。冷却帧数在收招时换算为秒写入attack_cooldown。
+"""
+
+import os
+import json
+from src.engine.config import FPS
+
+# 招式名称，顺序即招式编号
+MOVE_NAMES = ("light_punch", "heavy_punch", "light_kick", "heavy_kick")
+
+# 招式表目录
+MOVE_TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "moves")
+
+# 已加载的招式表缓存 {表名: MoveTable}
+_TABLE_CACHE = {}
+
+
+class MoveTable:
+    """编译后的招式表（每个属性是按招式编号索引的元组）"""
+    
+    __slots__ = ("name", "startup", "active_start", "active_end", "total_frames",
+                 "damage", "cooldown", "max_cooldown", "hitbox_width", "hitbox_height",
+                 "hitbox_y", "animation_speed")
+    
+    def __init__(self, name, moves):
+        """编译招式表
+        
+        Args:
+            name: 表名
+            moves: {招式名称: 招式参数字典}，见moves目录中的JSON
+        
+        Raises:
+            ValueError: 缺少招式或参数不合法
+        """
+        self.name = name
+        rows = []
+        for move_name in MOVE_NAMES:
+            if move_name not in moves:
+                raise ValueError(f"招式表 {name} 缺少招式: {move_name}")
+            move = moves[move_name]
+            try:
+                startup = int(move["startup"])
+                active = int(move["active"])
+                recovery = int(move["recovery"])
+                hitbox = move["hitbox"]
+                row = (
+                    startup,
+                    startup + 1,
+                    startup + active,
+                    startup + active + recovery,
+                    int(move["damage"]),
+                    int(move["cooldown"]) / FPS,
+                    int(hitbox["width"]),
+                    int(hitbox["height"]),
+                    int(hitbox["y"]),
+                    float(move["animation_speed"])
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"招式表 {name} 的招式 {move_name} 参数不合法: {e}")
+            if startup < 0 or active < 1 or recovery < 0:
+                raise ValueError(f"招式表 {name} 的招式 {move_name} 帧数不合法")
+            rows.append(row)
+        
+        (self.startup, self.active_start, self.active_end, self.total_frames,
+         self.damage, self.cooldown, self.hitbox_width, self.hitbox_height,
+         self.hitbox_y, self.animation_speed) = zip(*rows)
+        self.max_cooldown = max(self.cooldown)
+
+
+def load_move_table(name):
+    """加载并编译招式表（同一进程内只加载一次）
+    
+    Args:
+        name: 表名（moves目录中的文件名，不含扩展名）
+    
+    Returns:
+        MoveTable
+    """
+    table = _TABLE_CACHE.get(name)
+    if table is None:
+        path = os.path.join(MOVE_TABLE_DIR, f"{name}.json")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        table = MoveTable(name, data["moves"])
+        _TABLE_CACHE[name] = table
+    return table
@@ -8,6 +8,9 @@ from src.characters.character import Character, CharacterState, Direction
 class Ryu(Character):
     """Ryu角色类"""
     
+    # 招式帧数据见src/characters/moves/ryu.json
+    MOVE_TABLE = "ryu"
+    
     def __init__(self, x, y):
         """初始化Ryu角色"""
         super().__init__(x, y, "Ryu")
@@ -240,21 +243,3 @@ class Ryu(Character):
                 sprites[state][Direction.LEFT].append(flipped)
         
         return sprites
-    
-    # 重写特定方法给予Ryu独特的能力
-    def light_punch(self):
-        """Ryu的轻拳（伤害稍高）"""
-        super().light_punch()
-        # 如果需要可以修改特定属性，例如伤害调整
-    
-    def heavy_punch(self):
-        """Ryu的重拳（伤害更高）"""
-        super().heavy_punch()
-        # 增加攻击判定框大小，使攻击更加明显
-        if self.attack_hitbox:
-            # 扩大攻击判定框
-            if self.direction == Direction.RIGHT:
-                self.attack_hitbox.width += 10
-            else:
-                self.attack_hitbox.x -= 10
-                self.attack_hitbox.width += 10 
\ No newline at end of file
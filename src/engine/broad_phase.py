@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+碰撞粗检测
+
+多人模式下每帧需要找出可能互相命中或推挤的角色对。所有角色都站在同一条地平线上，
+只按x轴做排序扫描（sort and sweep）：按中心x排序后从左向右扫描，
+只有中心距离不超过给定范围的角色对才交给精确判定，不再检查所有角色对。
+
+角色每帧只移动几个像素，上一帧的顺序几乎已经有序，插入排序通常是线性时间。
+"""
+
+
+class SweepAndPrune:
+    """x轴排序扫描"""
+    
+    def __init__(self, bodies):
+        """初始化
+        
+        Args:
+            bodies: 参与检测的对象（需要x和width属性）
+        """
+        self.order = list(bodies)  # 按中心x排序的对象
+        self.centers = []          # 与order对应的中心x
+        self.positions = {}        # {id(对象): 在order中的下标}
+        self.update()
+    
+    def update(self):
+        """按当前位置重新排序（坐标变化后调用）"""
+        order = self.order
+        centers = [body.x + body.width / 2 for body in order]
+        
+        # 插入排序：利用帧间的连贯性，顺序基本不变时只需一次扫描
+        for i in range(1, len(order)):
+            body, center = order[i], centers[i]
+            j = i - 1
+            while j >= 0 and centers[j] > center:
+                order[j + 1] = order[j]
+                centers[j + 1] = centers[j]
+                j -= 1
+            order[j + 1] = body
+            centers[j + 1] = center
+        
+        self.centers = centers
+        self.positions = {id(body): index for index, body in enumerate(order)}
+    
+    def pairs(self, reach):
+        """找出中心距离不超过reach的所有对象对
+        
+        Args:
+            reach: 最大中心距离（像素）
+        
+        Returns:
+            [(左侧对象, 右侧对象, 中心距离)]，按左侧对象的位置排列
+        """
+        order, centers = self.order, self.centers
+        count = len(order)
+        result = []
+        for i in range(count):
+            center = centers[i]
+            for j in range(i + 1, count):
+                distance = centers[j] - center
+                if distance > reach:
+                    break  # 之后的对象更远
+                result.append((order[i], order[j], distance))
+        return result
+    
+    def nearby(self, body, reach):
+        """从近到远遍历某个对象附近的其他对象
+        
+        Args:
+            body: 中心对象（必须已参与检测）
+            reach: 最大中心距离（像素）
+        
+        Yields:
+            (对象, 中心距离)，距离相同时左侧的在前
+        """
+        order, centers = self.order, self.centers
+        index = self.positions[id(body)]
+        center = centers[index]
+        left, right = index - 1, index + 1
+        while True:
+            left_distance = center - centers[left] if left >= 0 else None
+            right_distance = centers[right] - center if right < len(order) else None
+            if left_distance is not None and (right_distance is None or left_distance <= right_distance):
+                if left_distance > reach:
+                    return
+                yield order[left], left_distance
+                left -= 1
+            elif right_distance is not None:
+                if right_distance > reach:
+                    return
+                yield order[right], right_distance
+                right += 1
+            else:
+                return
@@ -0,0 +1,590 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+观战广播
+
+主机上的战斗界面每帧把双方位置、状态、血量和攻击特效触发通过TCP广播给任意数量的观众。
+每帧只发送与上一帧相比变化的字段，每隔固定帧数发送一次完整状态的关键帧；
+同一帧的消息只编码一次，所有观众共享。
+
+每个观众有独立的发送队列：积压超过上限的观众暂时跳过增量，
+追上后补发关键帧，慢观众不会拖慢主机，也不会占用无限的内存。
+
+用法:
+    # 无界面主机，循环进行AI对战AI并广播
+    python -m src.engine.broadcast host --port 7200
+    
+    # 观看
+    python -m src.engine.broadcast watch --host 127.0.0.1 --port 7200
+"""
+
+import time
+import json
+import socket
+import struct
+import argparse
+from collections import deque
+import pygame
+from src.engine.config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, WHITE,
+    BROADCAST_KEYFRAME_INTERVAL, BROADCAST_MAX_BACKLOG
+)
+from src.engine.snapshot import sync_character_image
+from src.characters.character import CharacterState, Direction
+
+# 默认端口
+DEFAULT_PORT = 7200
+
+# 消息头：长度（不含消息头）, 类型
+_MESSAGE_HEADER = struct.Struct("<IB")
+MSG_HELLO = 1       # 战斗开始：角色和名称（JSON）
+MSG_KEYFRAME = 2    # 完整状态
+MSG_DELTA = 3       # 与上一帧相比变化的字段
+
+# 广播的字段（玩家1和玩家2各6个，之后是回合状态）
+STATE_FIELDS = (
+    "p1_x", "p1_y", "p1_state", "p1_direction", "p1_animation_frame", "p1_health",
+    "p2_x", "p2_y", "p2_state", "p2_direction", "p2_animation_frame", "p2_health",
+    "round_time", "round_over", "winner"
+)
+_FIELD_FORMATS = "ffBBBh" * 2 + "f?b"
+_FIELD_STRUCTS = tuple(struct.Struct("<" + c) for c in _FIELD_FORMATS)
+_STATE = struct.Struct("<" + _FIELD_FORMATS)
+
+# 关键帧：帧号；增量：帧号, 变化字段的位掩码
+_TICK = struct.Struct("<I")
+_DELTA_HEADER = struct.Struct("<IH")
+
+# 攻击特效：攻击类型编号, x, y
+_EFFECT = struct.Struct("<Bhh")
+ATTACK_TYPES = ("light_punch", "heavy_punch", "light_kick", "heavy_kick")
+_ATTACK_CODES = {name: code for code, name in enumerate(ATTACK_TYPES)}
+
+
+def capture_state(fight):
+    """获取战斗界面的广播状态
+    
+    Args:
+        fight: 战斗界面
+    
+    Returns:
+        按STATE_FIELDS顺序排列的元组
+    """
+    p1, p2 = fight.player1, fight.player2
+    if fight.winner is p1:
+        winner = 0
+    elif fight.winner is p2:
+        winner = 1
+    else:
+        winner = -1
+    return (p1.x, p1.y, p1.state.value, p1.direction.value, p1.animation_frame, p1.health,
+            p2.x, p2.y, p2.state.value, p2.direction.value, p2.animation_frame, p2.health,
+            fight.round_time, fight.round_over, winner)
+
+
+def _message(message_type, payload):
+    """加上消息头"""
+    return _MESSAGE_HEADER.pack(len(payload), message_type) + payload
+
+
+def _encode_effects(triggers):
+    """编码本帧的攻击特效触发"""
+    triggers = triggers[:255]
+    return bytes([len(triggers)]) + b"".join(
+        _EFFECT.pack(_ATTACK_CODES[attack_type], int(x), int(y))
+        for attack_type, x, y in triggers)
+
+
+def encode_keyframe(tick, state, triggers=()):
+    """编码关键帧消息
+    
+    Args:
+        tick: 帧号
+        state: capture_state返回的状态
+        triggers: 本帧的攻击特效触发 [(攻击类型, x, y)]
+    
+    Returns:
+        消息字节串
+    """
+    return _message(MSG_KEYFRAME, _TICK.pack(tick) + _STATE.pack(*state) + _encode_effects(triggers))
+
+
+def encode_delta(tick, previous, state, triggers=()):
+    """编码增量消息
+    
+    Args:
+        tick: 帧号
+        previous: 上一帧的状态
+        state: 本帧的状态
+        triggers: 本帧的攻击特效触发
+    
+    Returns:
+        消息字节串
+    """
+    mask = 0
+    values = []
+    for index, (old, new) in enumerate(zip(previous, state)):
+        if old != new:
+            mask |= 1 << index
+            values.append(_FIELD_STRUCTS[index].pack(new))
+    return _message(MSG_DELTA, _DELTA_HEADER.pack(tick, mask) + b"".join(values) +
+                    _encode_effects(triggers))
+
+
+class _Client:
+    """一个观众连接"""
+    
+    __slots__ = ("sock", "address", "queue", "offset", "backlog", "needs_keyframe")
+    
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.queue = deque()       # 待发送的消息
+        self.offset = 0            # 队首消息已发送的字节数
+        self.backlog = 0           # 队列中未发送的字节数
+        self.needs_keyframe = True
+
+
+class BroadcastServer:
+    """观战广播服务器（战斗界面的每帧监听器）
+    
+    在游戏线程中以非阻塞方式接受连接和发送数据，不需要额外的线程。
+    一个服务器可以依次挂到多场战斗上，观众连接在战斗之间保持。
+    """
+    
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT,
+                 keyframe_interval=BROADCAST_KEYFRAME_INTERVAL, max_backlog=BROADCAST_MAX_BACKLOG):
+        """初始化
+        
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            keyframe_interval: 关键帧间隔（帧）
+            max_backlog: 每个观众最多积压的字节数
+        """
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((host, port))
+        self.listener.listen(128)
+        self.listener.setblocking(False)
+        
+        self.keyframe_interval = keyframe_interval
+        self.max_backlog = max_backlog
+        self.clients = []
+        
+        self.fight = None
+        self.hello = None
+        self.last_state = None
+        
+        # 统计
+        self.ticks = 0
+        self.bytes_sent = 0
+        self.dropped_messages = 0
+        self.broadcast_time = 0.0
+    
+    @property
+    def address(self):
+        """监听地址"""
+        return self.listener.getsockname()
+    
+    def on_tick(self, fight):
+        """每帧回调：广播本帧状态
+        
+        Args:
+            fight: 战斗界面
+        """
+        self._broadcast(fight)
+    
+    def on_round_end(self, fight):
+        """回合结束回调：广播最终状态
+        
+        Args:
+            fight: 战斗界面
+        """
+        self._broadcast(fight)
+    
+    def close(self):
+        """战斗结束（观众连接保持，等待下一场战斗）"""
+        self.fight = None
+    
+    def shutdown(self):
+        """关闭所有连接"""
+        for client in self.clients:
+            client.sock.close()
+        self.clients = []
+        self.listener.close()
+    
+    def _start_fight(self, fight):
+        """开始广播一场新的战斗"""
+        # 延迟导入，避免引擎模块与角色模块循环依赖
+        from src.engine.headless import character_key
+        
+        self.fight = fight
+        self.last_state = None
+        info = {
+            "characters": [character_key(fight.player1), character_key(fight.player2)],
+            "names": [fight.player1.name, fight.player2.name]
+        }
+        self.hello = _message(MSG_HELLO, json.dumps(info, ensure_ascii=False).encode("utf-8"))
+        for client in self.clients:
+            client.queue.append(self.hello)
+            client.backlog += len(self.hello)
+            client.needs_keyframe = True
+    
+    def _accept(self):
+        """接受新的观众连接"""
+        while True:
+            try:
+                sock, address = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # 限制内核发送缓冲区，慢观众尽快进入积压处理，而不是在内核中排队看过时的画面
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.max_backlog)
+            client = _Client(sock, address)
+            if self.hello is not None:
+                client.queue.append(self.hello)
+                client.backlog = len(self.hello)
+            self.clients.append(client)
+    
+    def _broadcast(self, fight):
+        """编码本帧消息并发送给所有观众"""
+        start = time.perf_counter()
+        if fight is not self.fight:
+            self._start_fight(fight)
+        self._accept()
+        
+        tick = int(round(fight.sim_time * FPS))
+        state = capture_state(fight)
+        keyframe = None
+        delta = None
+        if self.last_state is None or tick % self.keyframe_interval == 0:
+            keyframe = encode_keyframe(tick, state, fight.effect_triggers)
+        
+        for client in list(self.clients):
+            if client.backlog > self.max_backlog:
+                # 积压过多：丢弃未开始发送的增量，追上后补发关键帧
+                self.dropped_messages += self._trim_backlog(client)
+                self._flush(client)
+                continue
+            
+            if keyframe is not None or client.needs_keyframe:
+                if keyframe is None:
+                    keyframe = encode_keyframe(tick, state, fight.effect_triggers)
+                message = keyframe
+                client.needs_keyframe = False
+            else:
+                if delta is None:
+                    delta = encode_delta(tick, self.last_state, state, fight.effect_triggers)
+                message = delta
+            client.queue.append(message)
+            client.backlog += len(message)
+            self._flush(client)
+        
+        self.last_state = state
+        self.ticks += 1
+        self.broadcast_time += time.perf_counter() - start
+    
+    def _trim_backlog(self, client):
+        """丢弃观众队列中未开始发送的状态消息（保留战斗开始消息）
+        
+        Returns:
+            丢弃的消息数
+        """
+        client.needs_keyframe = True
+        kept = deque()
+        backlog = 0
+        for index, message in enumerate(client.queue):
+            if (index == 0 and client.offset > 0) or message[4] == MSG_HELLO:
+                kept.append(message)
+                backlog += len(message) - (client.offset if index == 0 else 0)
+        dropped = len(client.queue) - len(kept)
+        client.queue = kept
+        client.backlog = backlog
+        if not kept:
+            client.offset = 0
+        return dropped
+    
+    def _flush(self, client):
+        """尽量发送观众队列中的消息（不阻塞）"""
+        while client.queue:
+            head = client.queue[0]
+            try:
+                sent = client.sock.send(memoryview(head)[client.offset:])
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # 观众断开
+                client.sock.close()
+                self.clients.remove(client)
+                return
+            client.offset += sent
+            client.backlog -= sent
+            self.bytes_sent += sent
+            if client.offset < len(head):
+                return
+            client.queue.popleft()
+            client.offset = 0
+    
+    def stats(self):
+        """统计信息
+        
+        Returns:
+            统计字典
+        """
+        return {
+            "clients": len(self.clients),
+            "ticks": self.ticks,
+            "bytes_sent": self.bytes_sent,
+            "dropped_messages": self.dropped_messages,
+            "avg_broadcast_us": self.broadcast_time / self.ticks * 1e6 if self.ticks else 0.0
+        }
+
+
+class SpectatorClient:
+    """观众端：接收并解码广播"""
+    
+    def __init__(self, host, port, timeout=5.0):
+        """连接主机
+        
+        Args:
+            host: 主机地址
+            port: 主机端口
+            timeout: 连接超时（秒）
+        """
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setblocking(False)
+        self.buffer = bytearray()
+        self.closed = False
+        
+        # 当前战斗信息和状态
+        self.info = None
+        self.state = None
+        self.tick = 0
+        
+        # 统计
+        self.bytes_received = 0
+        self.keyframes = 0
+        self.deltas = 0
+    
+    def poll(self):
+        """读取已到达的数据（不阻塞）
+        
+        Returns:
+            事件列表：("hello", 战斗信息) 或 ("state", 帧号, 状态列表, 攻击特效列表)
+        """
+        while not self.closed:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                self.closed = True
+                break
+            if not data:
+                self.closed = True
+                break
+            self.buffer.extend(data)
+            self.bytes_received += len(data)
+        
+        events = []
+        offset = 0
+        while len(self.buffer) - offset >= _MESSAGE_HEADER.size:
+            length, message_type = _MESSAGE_HEADER.unpack_from(self.buffer, offset)
+            end = offset + _MESSAGE_HEADER.size + length
+            if end > len(self.buffer):
+                break
+            event = self._handle(message_type, bytes(self.buffer[offset + _MESSAGE_HEADER.size:end]))
+            if event is not None:
+                events.append(event)
+            offset = end
+        del self.buffer[:offset]
+        return events
+    
+    def _handle(self, message_type, payload):
+        """处理一条消息"""
+        if message_type == MSG_HELLO:
+            self.info = json.loads(payload.decode("utf-8"))
+            self.state = None
+            return ("hello", self.info)
+        
+        if message_type == MSG_KEYFRAME:
+            (self.tick,) = _TICK.unpack_from(payload)
+            self.state = list(_STATE.unpack_from(payload, _TICK.size))
+            position = _TICK.size + _STATE.size
+            self.keyframes += 1
+        elif message_type == MSG_DELTA:
+            if self.state is None:
+                # 还没有收到关键帧
+                return None
+            self.tick, mask = _DELTA_HEADER.unpack_from(payload)
+            position = _DELTA_HEADER.size
+            for index, field in enumerate(_FIELD_STRUCTS):
+                if mask & (1 << index):
+                    (self.state[index],) = field.unpack_from(payload, position)
+                    position += field.size
+            self.deltas += 1
+        else:
+            return None
+        
+        effects = []
+        for _ in range(payload[position]):
+            code, x, y = _EFFECT.unpack_from(payload, position + 1 + len(effects) * _EFFECT.size)
+            effects.append((ATTACK_TYPES[code], x, y))
+        return ("state", self.tick, self.state, effects)
+    
+    def close(self):
+        """断开连接"""
+        self.sock.close()
+        self.closed = True
+
+
+def create_spectator_fight(info):
+    """按战斗信息创建用于显示广播状态的战斗界面（不运行模拟）
+    
+    Args:
+        info: 战斗开始消息中的战斗信息
+    
+    Returns:
+        FightScreen实例
+    """
+    # 延迟导入，FightScreen依赖AI模块
+    from src.ui.fight_screen import FightScreen
+    from src.engine.headless import HeadlessGame, create_character
+    
+    player1 = create_character(info["characters"][0], 100, 400)
+    player2 = create_character(info["characters"][1], 600, 400)
+    fight = FightScreen(HeadlessGame(), player1, player2, True, 1, 0)
+    player1.name, player2.name = info["names"]
+    return fight
+
+
+def apply_state(fight, tick, state, effects=()):
+    """把广播状态应用到观众端的战斗界面
+    
+    Args:
+        fight: create_spectator_fight创建的战斗界面
+        tick: 帧号
+        state: 状态列表（按STATE_FIELDS顺序）
+        effects: 本帧的攻击特效触发
+    """
+    fight.sim_time = tick / FPS
+    for character, offset in ((fight.player1, 0), (fight.player2, 6)):
+        x, y, state_value, direction, animation_frame, health = state[offset:offset + 6]
+        character.x = x
+        character.y = y
+        character.state = CharacterState(state_value)
+        character.direction = Direction(direction)
+        character.animation_frame = animation_frame
+        character.health = health
+        sync_character_image(character)
+    
+    fight.round_time, fight.round_over, winner = state[12:15]
+    fight.winner = (fight.player1, fight.player2)[winner] if winner >= 0 else None
+    
+    fight.effect_triggers.clear()
+    for attack_type, x, y in effects:
+        fight.spawn_attack_effect(x, y, attack_type)
+
+
+def watch(host, port):
+    """打开窗口观看广播
+    
+    Args:
+        host: 主机地址
+        port: 主机端口
+    """
+    # 延迟导入，字体模块需要先初始化pygame
+    from src.engine.font_utils import render_text
+    from src.engine.i18n import get_text
+    
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(f"观战 - {host}:{port}")
+    clock = pygame.time.Clock()
+    client = SpectatorClient(host, port)
+    fight = None
+    
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        
+        for event in client.poll():
+            if event[0] == "hello":
+                fight = create_spectator_fight(event[1])
+            elif fight is not None:
+                _, tick, state, effects = event
+                apply_state(fight, tick, state, effects)
+        
+        if fight is not None and client.state is not None:
+            fight.update_effects(1.0 / FPS)
+            fight.render(screen)
+        else:
+            screen.fill((0, 0, 0))
+            text = render_text(get_text("broadcast.waiting"), 32, WHITE)
+            screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+        if client.closed:
+            screen.blit(render_text(get_text("broadcast.disconnected"), 24, WHITE), (10, SCREEN_HEIGHT - 30))
+        pygame.display.flip()
+        clock.tick(FPS)
+    
+    client.close()
+
+
+def host_fights(port, fights=0, difficulty=2, realtime=True):
+    """无界面主机：循环进行AI对战AI并广播
+    
+    Args:
+        port: 监听端口
+        fights: 进行的场数，0表示一直进行
+        difficulty: AI难度
+        realtime: 是否按实际帧率运行（否则尽快运行）
+    """
+    # 延迟导入，避免引擎模块与角色模块循环依赖
+    from src.engine.headless import create_headless_fight
+    
+    server = BroadcastServer("0.0.0.0", port)
+    print(f"广播地址: {server.address[0]}:{server.address[1]}")
+    count = 0
+    try:
+        while fights <= 0 or count < fights:
+            fight = create_headless_fight("Ryu", "Ken", difficulty=difficulty)
+            fight.add_tick_listener(server)
+            next_frame = time.perf_counter()
+            while not fight.round_over:
+                fight.update()
+                if realtime:
+                    next_frame += 1.0 / FPS
+                    time.sleep(max(0.0, next_frame - time.perf_counter()))
+            fight.close()
+            count += 1
+            stats = server.stats()
+            print(f"第{count}场结束: 观众 {stats['clients']}, 已发送 {stats['bytes_sent']} 字节, "
+                  f"平均每帧广播耗时 {stats['avg_broadcast_us']:.1f} 微秒")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="观战广播")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    host_parser = subparsers.add_parser("host", help="无界面主机，循环进行AI对战AI并广播")
+    host_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="监听端口")
+    host_parser.add_argument("--fights", type=int, default=0, help="进行的场数，0表示一直进行")
+    host_parser.add_argument("--difficulty", type=int, default=2, help="AI难度")
+    host_parser.add_argument("--fast", action="store_true", help="不按实际帧率，尽快运行")
+    
+    watch_parser = subparsers.add_parser("watch", help="观看广播")
+    watch_parser.add_argument("--host", default="127.0.0.1", help="主机地址")
+    watch_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="主机端口")
+    
+    args = parser.parse_args()
+    if args.command == "host":
+        host_fights(args.port, args.fights, args.difficulty, not args.fast)
+    else:
+        watch(args.host, args.port)
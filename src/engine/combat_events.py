@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+战斗事件
+
+角色在模拟中直接发出带类型的战斗事件（出招、命中、被格挡、落空、击倒），
+写入战斗界面每帧清空的事件队列。物理更新结束后战斗界面统一分发给订阅者
+（特效、音效、统计等），订阅者不需要再比较前后两帧的生命值去猜测是否命中。
+
+事件只是模拟的输出，不参与模拟本身：回放和回滚重新模拟时会重新产生同样的事件。
+"""
+
+from enum import Enum
+
+
+class CombatEventType(Enum):
+    """战斗事件类型"""
+    ATTACK_STARTED = 0  # 开始出招
+    HIT = 1             # 命中并造成伤害
+    BLOCKED = 2         # 被格挡（每次出招最多一次）
+    WHIFF = 3           # 收招时既没有命中也没有被格挡
+    KO = 4              # 命中后对手生命值归零
+
+
+class CombatEvent:
+    """一个战斗事件"""
+    
+    __slots__ = ("kind", "attacker", "defender", "move", "damage")
+    
+    def __init__(self, kind, attacker, defender, move, damage=0):
+        """初始化
+        
+        Args:
+            kind: CombatEventType
+            attacker: 出招的角色
+            defender: 被攻击的角色（出招和落空事件为None）
+            move: 招式名称（如"light_punch"）
+            damage: 实际造成的伤害
+        """
+        self.kind = kind
+        self.attacker = attacker
+        self.defender = defender
+        self.move = move
+        self.damage = damage
+    
+    def __repr__(self):
+        return f"CombatEvent({self.kind.name}, {self.attacker.name}, {self.move}, {self.damage})"
+
+
+class CombatEventQueue:
+    """每帧的战斗事件队列"""
+    
+    def __init__(self):
+        """初始化"""
+        self.events = []        # 本帧产生的事件，按产生顺序
+        self.subscribers = []   # [(回调, 关心的事件类型集合或None)]
+        self.muted = False      # 为True时不分发（回滚重新模拟时使用）
+    
+    def emit(self, kind, attacker, defender=None, move=None, damage=0):
+        """记录一个事件
+        
+        Args:
+            kind: CombatEventType
+            attacker: 出招的角色
+            defender: 被攻击的角色
+            move: 招式名称
+            damage: 实际造成的伤害
+        """
+        self.events.append(CombatEvent(kind, attacker, defender, move, damage))
+    
+    def clear(self):
+        """清空本帧的事件（每帧开始时调用）"""
+        self.events.clear()
+    
+    def subscribe(self, callback, kinds=None):
+        """订阅事件
+        
+        Args:
+            callback: 以CombatEvent为参数的函数
+            kinds: 只接收这些类型的事件，None表示全部
+        """
+        self.subscribers.append((callback, frozenset(kinds) if kinds is not None else None))
+    
+    def unsubscribe(self, callback):
+        """取消订阅
+        
+        Args:
+            callback: subscribe时传入的函数
+        """
+        self.subscribers = [item for item in self.subscribers if item[0] != callback]
+    
+    def dispatch(self):
+        """把本帧的事件按顺序分发给订阅者（物理更新之后调用）"""
+        if self.muted:
+            return
+        for event in self.events:
+            for callback, kinds in self.subscribers:
+                if kinds is None or event.kind in kinds:
+                    callback(event)
+
+
+class CombatStats:
+    """按事件统计每个角色的出招、命中、格挡、落空和伤害"""
+    
+    FIELDS = ("attacks", "hits", "blocked", "whiffs", "damage", "kos")
+    
+    def __init__(self, player_count=2):
+        """初始化
+        
+        Args:
+            player_count: 角色数量（按角色的player_index统计）
+        """
+        self.players = [dict.fromkeys(self.FIELDS, 0) for _ in range(player_count)]
+    
+    def __call__(self, event):
+        """处理一个事件（直接作为订阅回调使用）
+        
+        Args:
+            event: CombatEvent
+        """
+        stats = self.players[event.attacker.player_index]
+        kind = event.kind
+        if kind is CombatEventType.ATTACK_STARTED:
+            stats["attacks"] += 1
+        elif kind is CombatEventType.HIT:
+            stats["hits"] += 1
+            stats["damage"] += event.damage
+        elif kind is CombatEventType.BLOCKED:
+            stats["blocked"] += 1
+        elif kind is CombatEventType.WHIFF:
+            stats["whiffs"] += 1
+        elif kind is CombatEventType.KO:
+            stats["kos"] += 1
+    
+    def as_dict(self):
+        """获取统计结果
+        
+        Returns:
+            {"p1": {...}, "p2": {...}, ...}
+        """
+        return {f"p{index + 1}": dict(stats) for index, stats in enumerate(self.players)}
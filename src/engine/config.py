@@ -5,11 +5,20 @@
 游戏配置文件
 """
 
-# 屏幕设置
+# 屏幕设置（逻辑分辨率，所有界面都按这个大小绘制）
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
 
+# 窗口设置：逻辑画面每帧整体缩放一次到窗口大小
+WINDOW_SIZE = None       # 窗口大小 (宽, 高)，None表示与逻辑分辨率相同（不缩放）
+FULLSCREEN = False       # 全屏（使用桌面分辨率）
+SCALE_MODE = "smooth"    # 缩放方式："smooth"平滑缩放，"integer"整数倍缩放（像素清晰，可能留黑边）
+
+# 场地边界（角色不能离开的范围，物理计算使用）
+STAGE_WIDTH = SCREEN_WIDTH
+STAGE_HEIGHT = SCREEN_HEIGHT
+
 # 角色设置
 CHARACTER_WIDTH = 100
 CHARACTER_HEIGHT = 200
@@ -53,4 +62,49 @@ AI_DECISION_INTERVAL = {
     1: 0.5,  # 简单难度：每0.5秒决策一次（原为1.0秒）
     2: 0.3,  # 中等难度：每0.3秒决策一次（原为0.5秒）
     3: 0.1   # 困难难度：每0.1秒决策一次（原为0.2秒）
-} 
\ No newline at end of file
+} 
+
+# 搜索AI（蒙特卡洛树搜索）设置
+AI_SEARCH_DIFFICULTY = 4       # 选择该难度时使用搜索AI
+AI_SEARCH_TIME_BUDGET = 0.002  # 每次决策的搜索时间预算（秒）
+
+# 调试输出（无界面批量对战时关闭，避免每帧打印拖慢模拟）
+DEBUG_OUTPUT = True
+
+# 对战数据记录目录（设置后交互式对战也会记录训练数据，None表示不记录）
+SELFPLAY_RECORD_DIR = None
+
+# 在独立线程中运行战斗模拟（AI决策变慢时画面不卡顿），False表示模拟和绘制在主线程中依次进行
+THREADED_SIMULATION = True
+
+# 画质档位（0-3，从低到高），None表示根据帧耗时自动调节
+QUALITY_LEVEL = None
+
+# 缺少默认中文字体时是否在后台下载（需要网络，默认关闭，启动时不访问网络）
+FONT_DOWNLOAD = False
+
+# 界面语言（"zh"或"en"），None表示有中文字体时用中文，否则用英文
+LANGUAGE = None
+
+# 对战统计数据库（每场双人战斗的招式、状态、距离统计，None表示不记录）
+MATCH_STATS_DB = "results/match_stats.db"
+
+# 回放录制目录（每场战斗的输入记录为回放文件，None表示不录制）
+REPLAY_RECORD_DIR = "replays"
+
+# 回放关键帧间隔（帧），跳转时最多需要模拟这么多帧
+REPLAY_KEYFRAME_INTERVAL = 300
+
+# 性能指标接口（Prometheus文本格式，http://<地址>:<端口>/metrics），端口为None表示不启动
+METRICS_PORT = None
+METRICS_HOST = "127.0.0.1"
+
+# 网络对战设置
+NETPLAY_PORT = 7000           # 默认UDP端口
+NETPLAY_INPUT_DELAY = 2       # 本地输入延迟（帧），延迟越大回滚越少
+NETPLAY_MAX_ROLLBACK = 8      # 最多预测（回滚）的帧数，超过时等待对方输入
+
+# 观战广播设置
+BROADCAST_PORT = None                  # 设置TCP端口后，AI对战AI时向观众广播战斗状态
+BROADCAST_KEYFRAME_INTERVAL = 60       # 完整状态关键帧的间隔（帧），其余帧只发送变化
+BROADCAST_MAX_BACKLOG = 32 * 1024      # 每个观众最多积压的字节数，超过时跳过增量，追上后补发关键帧
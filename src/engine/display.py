@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+窗口与逻辑画面
+
+游戏总是绘制到固定分辨率（SCREEN_WIDTH x SCREEN_HEIGHT）的逻辑画面上，每帧结束时整体缩放一次到窗口，
+窗口多出的部分留黑边。窗口大小与逻辑分辨率相同时直接绘制到窗口，没有缩放开销；
+在1080p等大屏幕上全屏运行时也只缩放一次，不需要逐个缩放精灵。
+
+缩放方式可选平滑缩放（smooth）和整数倍缩放（integer，像素清晰，窗口不够大时退回到非整数倍）。
+鼠标位置需要从窗口坐标换算到逻辑坐标。
+"""
+
+import pygame
+from src.engine.config import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# 缩放方式
+SCALE_SMOOTH = "smooth"
+SCALE_INTEGER = "integer"
+
+# 带有pos属性、需要换算坐标的鼠标事件
+MOUSE_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+
+
+def scaled_rect(window_size, logical_size, scale_mode):
+    """计算逻辑画面缩放后在窗口中的位置（保持宽高比，居中）
+    
+    Args:
+        window_size: 窗口大小 (宽, 高)
+        logical_size: 逻辑画面大小 (宽, 高)
+        scale_mode: 缩放方式（SCALE_SMOOTH或SCALE_INTEGER）
+    
+    Returns:
+        pygame.Rect
+    """
+    window_width, window_height = window_size
+    logical_width, logical_height = logical_size
+    scale = min(window_width / logical_width, window_height / logical_height)
+    if scale_mode == SCALE_INTEGER and scale >= 1:
+        scale = int(scale)
+    width, height = max(1, round(logical_width * scale)), max(1, round(logical_height * scale))
+    return pygame.Rect((window_width - width) // 2, (window_height - height) // 2, width, height)
+
+
+class Display:
+    """游戏窗口，持有逻辑画面并负责缩放到窗口"""
+    
+    def __init__(self, window_size=None, fullscreen=False, scale_mode=SCALE_SMOOTH):
+        """创建窗口
+        
+        Args:
+            window_size: 窗口大小 (宽, 高)，None表示与逻辑分辨率相同
+            fullscreen: 是否全屏（使用桌面分辨率）
+            scale_mode: 缩放方式（SCALE_SMOOTH或SCALE_INTEGER）
+        """
+        if scale_mode not in (SCALE_SMOOTH, SCALE_INTEGER):
+            raise ValueError(f"未知的缩放方式: {scale_mode}")
+        self.logical_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.scale_mode = scale_mode
+        if fullscreen:
+            pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            pygame.display.set_mode(window_size or self.logical_size, pygame.RESIZABLE)
+        self.window = None
+        self.surface = None  # 逻辑画面，所有界面都绘制到这里
+        self.target = None   # 窗口中显示逻辑画面的区域（子Surface），None表示不缩放
+        self.rect = None
+        self._layout()
+    
+    def _layout(self):
+        """按当前窗口大小计算缩放区域"""
+        self.window = pygame.display.get_surface()
+        window_size = self.window.get_size()
+        if window_size == self.logical_size:
+            # 不需要缩放，直接绘制到窗口
+            self.surface = self.window
+            self.target = None
+            self.rect = self.window.get_rect()
+            return
+        
+        # 逻辑画面与窗口使用相同的像素格式，缩放时不需要转换
+        if self.surface is None or self.surface is self.window or self.surface.get_size() != self.logical_size:
+            self.surface = pygame.Surface(self.logical_size).convert(self.window)
+        self.rect = scaled_rect(window_size, self.logical_size, self.scale_mode)
+        self.window.fill((0, 0, 0))
+        self.target = self.window.subsurface(self.rect)
+    
+    def handle_event(self, event):
+        """处理窗口事件，并把鼠标事件的坐标换算为逻辑坐标
+        
+        Args:
+            event: pygame事件
+        
+        Returns:
+            交给界面处理的事件
+        """
+        if event.type in (pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED):
+            self._layout()
+        elif event.type in MOUSE_EVENTS and self.target is not None:
+            return pygame.event.Event(event.type, dict(event.dict, pos=self.to_logical(event.pos)))
+        return event
+    
+    def present(self):
+        """把逻辑画面缩放到窗口（一次）并刷新显示"""
+        if self.target is not None:
+            if self.scale_mode == SCALE_INTEGER:
+                pygame.transform.scale(self.surface, self.rect.size, self.target)
+            else:
+                pygame.transform.smoothscale(self.surface, self.rect.size, self.target)
+        pygame.display.flip()
+    
+    def to_logical(self, pos):
+        """把窗口坐标换算为逻辑坐标
+        
+        Args:
+            pos: 窗口坐标 (x, y)
+        
+        Returns:
+            逻辑坐标 (x, y)
+        """
+        if self.target is None:
+            return pos
+        x = (pos[0] - self.rect.x) * self.logical_size[0] // self.rect.width
+        y = (pos[1] - self.rect.y) * self.logical_size[1] // self.rect.height
+        return x, y
+    
+    def mouse_pos(self):
+        """当前鼠标的逻辑坐标"""
+        return self.to_logical(pygame.mouse.get_pos())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+生成界面文字的子集字体
+
+中文字体文件通常有几MB到十几MB，而界面上只用到几十段中文（菜单、选人、战斗界面）。
+这个脚本从源代码中收集所有界面文字，生成只包含这些字（以及全部ASCII字符）的子集字体，
+之后各字号都用这个小文件创建Font，启动时加载字体的耗时和内存都大幅减少。
+子集中没有的字仍然可以显示：font_utils会按需打开完整字体。
+
+收集范围：界面文字表（i18n.MESSAGES）的中文，以及使用了字体的模块（导入font_utils或glyph_atlas）
+中含中文的字符串常量（不包括文档字符串和print、异常的参数）。修改界面文字后重新运行即可。
+
+需要fontTools（pip install fonttools），只在生成时需要，游戏运行时不需要。
+
+用法:
+    python -m src.engine.font_subset
+    python -m src.engine.font_subset --font assets/fonts/simhei.ttf --list
+"""
+
+import os
+import ast
+import json
+import argparse
+from src.engine.i18n import MESSAGES, LANGUAGES
+from src.engine.font_utils import SUBSET_FONT_PATH, SUBSET_INFO_PATH, resolve_font_path, font_file_stamp
+
+# 项目根目录
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# 收集界面文字的源代码（目录或文件，相对于项目根目录）
+SOURCE_PATHS = ("src", "main.py")
+
+# 使用字体的模块特征（导入了其中之一的模块才收集）
+FONT_MODULES = ("src.engine.font_utils", "src.ui.glyph_atlas")
+
+# 参数不是界面文字的函数（控制台输出、异常和由系统绘制的窗口标题）
+NON_UI_CALLS = {"print", "_print_stats", "Exception", "ValueError", "RuntimeError", "TypeError", "KeyError",
+                "OSError", "ArgumentParser", "add_argument", "add_parser", "error", "warn", "warning", "set_caption"}
+
+# 总是包含的字符：全部可打印ASCII字符（数字、角色名称等动态文字）
+ASCII_CHARACTERS = "".join(chr(code) for code in range(0x20, 0x7f))
+
+
+def has_cjk(text):
+    """是否包含中日韩文字或全角标点"""
+    return any(ord(char) >= 0x2e80 for char in text)
+
+
+def _call_name(node):
+    """函数调用的名称（如print、parser.add_argument取add_argument）"""
+    function = node.func
+    if isinstance(function, ast.Name):
+        return function.id
+    if isinstance(function, ast.Attribute):
+        return function.attr
+    return None
+
+
+def _docstring_nodes(tree):
+    """模块、类和函数的文档字符串节点"""
+    nodes = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+                nodes.add(id(body[0].value))
+    return nodes
+
+
+def _uses_font(tree):
+    """模块是否导入了字体模块"""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module:
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            if any(name in FONT_MODULES for name in names):
+                return True
+        elif isinstance(node, ast.Import) and any(alias.name in FONT_MODULES for alias in node.names):
+            return True
+    return False
+
+
+def collect_file_strings(path):
+    """收集一个源文件中的界面文字
+    
+    Args:
+        path: Python源文件
+    
+    Returns:
+        含中文的字符串列表（f-string只包含其中的常量部分）
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    if not _uses_font(tree):
+        return []
+    
+    # 控制台输出和异常参数中的字符串不需要字体
+    excluded = _docstring_nodes(tree)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and _call_name(node) in NON_UI_CALLS:
+            for argument in ast.walk(node):
+                excluded.add(id(argument))
+        elif isinstance(node, ast.Raise) and node.exc is not None:
+            for argument in ast.walk(node.exc):
+                excluded.add(id(argument))
+    
+    return [node.value for node in ast.walk(tree)
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in excluded
+            and has_cjk(node.value)]
+
+
+def collect_ui_strings(paths=SOURCE_PATHS, root=ROOT):
+    """收集所有界面文字
+    
+    Args:
+        paths: 源代码目录或文件（相对于root）
+        root: 项目根目录
+    
+    Returns:
+        {相对路径: [字符串]}
+    """
+    strings = {"src/engine/i18n.py": [texts[LANGUAGES.index("zh")] for texts in MESSAGES.values()]}
+    for path in paths:
+        path = os.path.join(root, path)
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = sorted(os.path.join(directory, name) for directory, _, names in os.walk(path)
+                           for name in names if name.endswith(".py"))
+        for file in files:
+            found = collect_file_strings(file)
+            if found:
+                strings[os.path.relpath(file, root)] = found
+    return strings
+
+
+def subset_text(strings):
+    """子集字体需要包含的字符（排序后的字符串）
+    
+    Args:
+        strings: 字符串的可迭代对象
+    
+    Returns:
+        字符串
+    """
+    characters = set(ASCII_CHARACTERS)
+    for text in strings:
+        characters.update(text)
+    characters.discard("\n")
+    return "".join(sorted(characters))
+
+
+def build_subset(font_path, text, out_path=SUBSET_FONT_PATH, info_path=SUBSET_INFO_PATH):
+    """生成子集字体和说明文件
+    
+    Args:
+        font_path: 完整字体文件（.ttf/.otf/.ttc）
+        text: 需要包含的字符
+        out_path: 子集字体路径（字形轮廓格式与完整字体相同）
+        info_path: 说明文件路径（来源字体和包含的字符，font_utils据此判断是否使用子集字体）
+    
+    Returns:
+        子集字体的字节数
+    """
+    try:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        raise RuntimeError("生成子集字体需要fontTools: pip install fonttools")
+    
+    options = subset.Options()
+    options.hinting = False  # 界面字号渲染不需要hinting指令，去掉后文件更小
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    # 字体集合（.ttc）与pygame一样使用第一个字体
+    font = TTFont(font_path, fontNumber=0)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+    
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    subset.save_font(font, out_path, options)
+    font.close()
+    
+    info = dict(font_file_stamp(font_path), characters=text)
+    with open(info_path, "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False, indent=1)
+    return os.path.getsize(out_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成界面文字的子集字体")
+    parser.add_argument("--font", help="完整字体文件（默认使用游戏查找到的中文字体）")
+    parser.add_argument("--list", action="store_true", help="列出收集到的界面文字")
+    args = parser.parse_args()
+    
+    strings = collect_ui_strings()
+    text = subset_text(string for found in strings.values() for string in found)
+    total = sum(len(found) for found in strings.values())
+    print(f"从{len(strings)}个文件收集到{total}段界面文字，共{len(text)}个字符"
+          f"（其中非ASCII字符{len(text) - len(ASCII_CHARACTERS)}个）")
+    if args.list:
+        for path, found in strings.items():
+            print(f"  {path}: {' | '.join(sorted(set(found)))}")
+    
+    font_path = args.font
+    if font_path is None:
+        import pygame
+        pygame.font.init()
+        font_path = resolve_font_path()
+        if font_path is None:
+            parser.error("未找到中文字体，请用--font指定")
+    
+    try:
+        size = build_subset(font_path, text)
+    except RuntimeError as e:
+        parser.error(str(e))
+    full_size = os.path.getsize(font_path)
+    print(f"{font_path}: {full_size / 1024:.0f}KB -> {SUBSET_FONT_PATH}: {size / 1024:.0f}KB ({size / full_size:.1%})")
+
+
+if __name__ == "__main__":
+    main()
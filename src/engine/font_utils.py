@@ -3,20 +3,38 @@
 
 """
 字体工具模块，处理中文字体加载
+
+中文字体只查找一次：依次检查自带字体、常见的系统字体文件和按名称匹配的系统字体，
+找到的字体文件路径（或没有找到的结果）保存到磁盘缓存，之后启动直接使用缓存，
+每种字号只需用这个文件创建一个Font。启动时不访问网络，下载字体需要显式开启（后台线程）。
+
+如果用 python -m src.engine.font_subset 生成过只包含界面文字的子集字体，各字号使用子集字体，
+子集中没有的文字（如之后新增的界面文字）才按需打开完整字体。
 """
 
 import os
+import json
 import pygame
-import sys
 import platform
+import threading
 
-# 确保assets/fonts目录存在
+# 自带字体目录
 fonts_dir = os.path.join("assets", "fonts")
-os.makedirs(fonts_dir, exist_ok=True)
 
 # 默认字体路径
 DEFAULT_FONT_PATH = os.path.join(fonts_dir, "simhei.ttf")
 
+# 查找结果的磁盘缓存（删除后重新查找）
+FONT_CACHE_PATH = os.path.join(fonts_dir, "font_cache.json")
+
+# 子集字体和它的说明（来源字体、包含的字符），由font_subset生成
+SUBSET_FONT_PATH = os.path.join(fonts_dir, "ui_subset.ttf")
+SUBSET_INFO_PATH = os.path.join(fonts_dir, "ui_subset.json")
+
+# 下载字体的地址（思源黑体）和超时时间（秒）
+FONT_DOWNLOAD_URL = "https://github.com/adobe-fonts/source-han-sans/releases/download/2.004R/SourceHanSansSC.zip"
+FONT_DOWNLOAD_TIMEOUT = 30
+
 # 备用内置字体路径
 BUILTIN_FONTS = []
 
@@ -46,91 +64,248 @@ elif system == 'Linux':
         '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc'
     ])
 
+# 常见支持中文的系统字体名称
+CHINESE_FONT_NAMES = [
+    'SimHei',           # 黑体
+    'Microsoft YaHei',  # 微软雅黑
+    'SimSun',           # 宋体
+    'NSimSun',          # 新宋体
+    'FangSong',         # 仿宋
+    'KaiTi',            # 楷体
+    'Arial Unicode MS', # Arial Unicode
+    'Heiti SC',         # 黑体-简 (macOS)
+    'PingFang SC',      # 苹方-简 (macOS)
+    'STHeiti',          # 华文黑体 (macOS)
+    'Noto Sans CJK SC', # Noto Sans CJK SC (Linux)
+    'WenQuanYi Micro Hei', # 文泉驿微米黑 (Linux)
+    'Hiragino Sans GB',    # macOS 中文字体
+]
+
 # 是否找到了支持中文的字体
 has_chinese_font = False
-font_cache = {}  # 字体缓存
+font_cache = {}  # 字体缓存 {字号: Font}（有子集字体时为子集字体）
+full_font_cache = {}  # 完整字体缓存 {字号: Font}（只在子集字体缺字时创建）
+
+# 查找到的字体文件路径：未查找时为_UNRESOLVED，没有中文字体时为None
+_UNRESOLVED = object()
+_font_path = _UNRESOLVED
+
+# 子集字体包含的字符：未检查时为_UNRESOLVED，没有可用的子集字体时为None
+_subset_characters = _UNRESOLVED
+
+# 后台下载完成后请求重新查找字体，由主线程在帧之间调用apply_pending_reset处理
+_reset_requested = threading.Event()
+
+
+def _find_font_path():
+    """查找支持中文的字体文件
+    
+    Returns:
+        字体文件路径，没有找到时返回None
+    """
+    # 首先使用自带的默认字体，然后是常见的系统字体文件
+    for font_path in [DEFAULT_FONT_PATH] + BUILTIN_FONTS:
+        if os.path.exists(font_path):
+            return font_path
+    
+    # 按名称匹配系统字体（不存在时返回None，不会退回到默认字体）
+    for font_name in CHINESE_FONT_NAMES:
+        try:
+            font_path = pygame.font.match_font(font_name)
+        except Exception:
+            font_path = None
+        if font_path:
+            return font_path
+    return None
+
+
+def _load_cached_path():
+    """读取磁盘缓存
+    
+    Returns:
+        (是否有效, 字体文件路径或None)
+    """
+    try:
+        with open(FONT_CACHE_PATH, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return False, None
+    path = cached.get("path")
+    if path is None:
+        # 上次没有找到中文字体；之后下载了自带字体时重新查找
+        return not os.path.exists(DEFAULT_FONT_PATH), None
+    return os.path.exists(path), path
+
+
+def _save_cached_path(path):
+    """写入磁盘缓存（失败时忽略，下次启动重新查找）"""
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+        with open(FONT_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"path": path}, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def resolve_font_path():
+    """获取支持中文的字体文件路径（每个进程只查找一次，结果缓存到磁盘）
+    
+    Returns:
+        字体文件路径，没有中文字体时返回None
+    """
+    global _font_path, has_chinese_font
+    if _font_path is not _UNRESOLVED:
+        return _font_path
+    
+    valid, path = _load_cached_path()
+    if not valid:
+        path = _find_font_path()
+        _save_cached_path(path)
+        if path:
+            print(f"成功找到中文字体: {path}")
+        else:
+            print("警告: 未找到支持中文的字体，使用备选方案")
+    
+    _font_path = path
+    has_chinese_font = path is not None
+    return path
+
+
+def font_file_stamp(path):
+    """字体文件的标识（路径、大小、修改时间），用于判断子集字体是否由它生成"""
+    stat = os.stat(path)
+    return {"source": os.path.abspath(path), "source_size": stat.st_size, "source_mtime": int(stat.st_mtime)}
+
+
+def subset_characters():
+    """获取子集字体包含的字符（每个进程只检查一次）
+    
+    Returns:
+        字符集合，没有与当前中文字体对应的子集字体时返回None
+    """
+    global _subset_characters
+    if _subset_characters is not _UNRESOLVED:
+        return _subset_characters
+    
+    _subset_characters = None
+    path = resolve_font_path()
+    if path is None or not os.path.exists(SUBSET_FONT_PATH):
+        return None
+    try:
+        with open(SUBSET_INFO_PATH, encoding="utf-8") as f:
+            info = json.load(f)
+        stamp = font_file_stamp(path)
+    except (OSError, ValueError):
+        return None
+    if all(info.get(key) == value for key, value in stamp.items()):
+        _subset_characters = frozenset(info.get("characters", ""))
+    return _subset_characters
+
+
+def reset_fonts():
+    """清除已查找的字体和已创建的Font（如下载字体之后），下次使用时重新查找"""
+    global _font_path, _subset_characters
+    try:
+        os.remove(FONT_CACHE_PATH)
+    except OSError:
+        pass
+    font_cache.clear()
+    full_font_cache.clear()
+    _font_path = _UNRESOLVED
+    _subset_characters = _UNRESOLVED
+    
+    # 已渲染的字形图集和文字使用的是旧字体
+    from src.ui.glyph_atlas import clear_text_caches
+    clear_text_caches()
+
+
+def apply_pending_reset():
+    """处理后台线程请求的字体重置（在主线程的两帧之间调用，不会在绘制中途替换字体）
+    
+    Returns:
+        是否重置了字体
+    """
+    if not _reset_requested.is_set():
+        return False
+    _reset_requested.clear()
+    reset_fonts()
+    return True
+
+
+def _open_font(path, size):
+    """用字体文件创建Font，失败时返回None"""
+    try:
+        return pygame.font.Font(path, size)
+    except Exception as e:
+        print(f"加载字体 {path} 失败: {e}")
+        return None
+
+
+def get_full_font(size=32):
+    """获取完整的中文字体（子集字体缺字时使用）
+    
+    Args:
+        size: 字体大小
+    
+    Returns:
+        pygame.font.Font对象
+    """
+    font = full_font_cache.get(size)
+    if font is None:
+        path = resolve_font_path()
+        font = _open_font(path, size) if path is not None else None
+        if font is None:
+            font = get_chinese_font(size)
+        full_font_cache[size] = font
+    return font
+
 
-# 尝试加载系统中支持中文的字体
 def get_chinese_font(size=32):
-    """获取支持中文的字体
+    """获取支持中文的字体（有子集字体时返回子集字体，只包含界面文字）
     
     Args:
         size: 字体大小
-        
+    
     Returns:
         pygame.font.Font对象
     """
-    global has_chinese_font, font_cache
+    font = font_cache.get(size)
+    if font is not None:
+        return font
     
-    # 检查缓存
-    cache_key = f"size_{size}"
-    if cache_key in font_cache:
-        return font_cache[cache_key]
+    path = resolve_font_path()
+    if path is not None:
+        if subset_characters() is not None:
+            font = _open_font(SUBSET_FONT_PATH, size)
+        if font is None:
+            font = _open_font(path, size)
+    if font is None:
+        # 使用pygame默认字体，但不渲染中文字符
+        global has_chinese_font
+        has_chinese_font = False
+        font = pygame.font.Font(None, size)
+    font_cache[size] = font
+    return font
+
+
+def get_font_for_text(text, size=32):
+    """获取能显示这段文字的字体：子集字体缺字时使用完整字体
     
-    # 首先尝试使用自带的默认字体
-    if os.path.exists(DEFAULT_FONT_PATH):
-        try:
-            font = pygame.font.Font(DEFAULT_FONT_PATH, size)
-            has_chinese_font = True
-            font_cache[cache_key] = font
-            return font
-        except Exception as e:
-            print(f"加载默认字体失败: {e}")
-    
-    # 尝试使用内置系统字体
-    for font_path in BUILTIN_FONTS:
-        if os.path.exists(font_path):
-            try:
-                font = pygame.font.Font(font_path, size)
-                has_chinese_font = True
-                font_cache[cache_key] = font
-                print(f"成功加载系统字体: {font_path}")
-                return font
-            except Exception as e:
-                print(f"加载系统字体 {font_path} 失败: {e}")
-    
-    # 如果内置字体不存在，尝试系统字体名称
-    # 常见支持中文的字体列表
-    chinese_fonts = [
-        'SimHei',           # 黑体
-        'Microsoft YaHei',  # 微软雅黑
-        'SimSun',           # 宋体
-        'NSimSun',          # 新宋体
-        'FangSong',         # 仿宋
-        'KaiTi',            # 楷体
-        'Arial Unicode MS', # Arial Unicode
-        'Heiti SC',         # 黑体-简 (macOS)
-        'PingFang SC',      # 苹方-简 (macOS)
-        'STHeiti',          # 华文黑体 (macOS)
-        'Noto Sans CJK SC', # Noto Sans CJK SC (Linux)
-        'WenQuanYi Micro Hei', # 文泉驿微米黑 (Linux)
-        'Hiragino Sans GB',    # macOS 中文字体
-    ]
-    
-    # 尝试每一个中文字体
-    for font_name in chinese_fonts:
-        try:
-            font = pygame.font.SysFont(font_name, size)
-            # 测试字体是否能渲染中文
-            test_surf = font.render("测试", True, (255, 255, 255))
-            has_chinese_font = True
-            font_cache[cache_key] = font
-            print(f"成功加载字体: {font_name}")
-            return font
-        except Exception as e:
-            continue
-    
-    # 如果所有系统字体都失败，返回备选方案
-    print("警告: 未找到支持中文的字体，使用备选方案")
-    has_chinese_font = False
-    
-    # 使用pygame默认字体，但不渲染中文字符
-    default_font = pygame.font.SysFont(None, size)
-    font_cache[cache_key] = default_font
-    return default_font
+    Args:
+        text: 文字
+        size: 字体大小
+    
+    Returns:
+        pygame.font.Font对象
+    """
+    font = get_chinese_font(size)
+    characters = _subset_characters
+    if characters is not None and characters is not _UNRESOLVED and not characters.issuperset(text):
+        font = get_full_font(size)
+    return font
 
 def render_text(text, size=32, color=(255, 255, 255)):
-    """渲染文本
+    """渲染文本（界面文字通过i18n.get_text取得，没有中文字体时已经是英文）
     
     Args:
         text: 要渲染的文本
@@ -140,74 +315,27 @@ def render_text(text, size=32, color=(255, 255, 255)):
     Returns:
         渲染好的文本Surface
     """
-    font = get_chinese_font(size)
-    
-    # 如果没有中文字体支持，替换中文为英文提示
-    if not has_chinese_font:
-        # 检测文本是否包含中文
-        has_chinese = any(u'\u4e00' <= char <= u'\u9fff' for char in text)
-        if has_chinese:
-            # 提取英文和数字
-            eng_text = ''.join(char if char.isascii() else '' for char in text)
-            # 如果没有英文，使用替代文本
-            if not eng_text:
-                if "玩家" in text:
-                    eng_text = "Player"
-                elif "对战" in text:
-                    eng_text = "VS"
-                elif "简单" in text:
-                    eng_text = "Easy"
-                elif "中等" in text:
-                    eng_text = "Medium"
-                elif "困难" in text:
-                    eng_text = "Hard"
-                elif "退出" in text:
-                    eng_text = "Exit"
-                elif "确认" in text:
-                    eng_text = "Confirm"
-                elif "返回" in text:
-                    eng_text = "Back"
-                elif "选择" in text:
-                    eng_text = "Select"
-                elif "胜利" in text:
-                    eng_text = "Win"
-                elif "平局" in text:
-                    eng_text = "Draw"
-                elif "主菜单" in text:
-                    eng_text = "Main Menu"
-                elif "格斗之王" in text:
-                    eng_text = "Fighting King"
-                elif "训练" in text:
-                    eng_text = "Training"
-                elif "冷却" in text:
-                    eng_text = "Cooldown"
-                elif "秒" in text:
-                    eng_text = "sec"
-                elif "攻击" in text:
-                    eng_text = "Attack"
-                else:
-                    eng_text = "Text"
-            text = eng_text
-    
-    return font.render(text, True, color)
+    return get_font_for_text(text, size).render(text, True, color)
 
 def download_default_font():
-    """尝试下载默认中文字体"""
+    """下载默认中文字体（阻塞，需要网络）
+    
+    Returns:
+        是否成功
+    """
     if os.path.exists(DEFAULT_FONT_PATH):
         return True
     
     try:
         import requests
         print("尝试下载默认中文字体...")
-        
-        # 这是一个更可靠的开源中文字体的URL (思源黑体)
-        font_url = "https://github.com/adobe-fonts/source-han-sans/releases/download/2.004R/SourceHanSansSC.zip"
+        os.makedirs(fonts_dir, exist_ok=True)
         
         # 临时文件路径
         zip_path = os.path.join(fonts_dir, "temp_font.zip")
         
         # 下载字体
-        response = requests.get(font_url, stream=True)
+        response = requests.get(FONT_DOWNLOAD_URL, stream=True, timeout=FONT_DOWNLOAD_TIMEOUT)
         response.raise_for_status()
         
         # 保存zip文件
@@ -236,11 +364,22 @@ def download_default_font():
         print(f"下载字体失败: {e}")
         return False
 
-# 游戏启动时尝试下载字体
-try:
-    # 立即尝试下载字体，不使用后台线程，确保字体在游戏开始前可用
-    if not os.path.exists(DEFAULT_FONT_PATH):
-        download_default_font()
-except Exception as e:
-    print(f"初始化字体失败: {e}")
-    pass 
\ No newline at end of file
+
+def start_font_download():
+    """在后台线程中下载默认中文字体，完成后请求清除字体缓存
+    
+    缓存由主线程在帧之间清除（apply_pending_reset），之后新绘制的文字使用下载的字体。
+    
+    Returns:
+        下载线程，已有默认字体时返回None
+    """
+    if os.path.exists(DEFAULT_FONT_PATH):
+        return None
+    
+    def download():
+        if download_default_font():
+            _reset_requested.set()
+    
+    thread = threading.Thread(target=download, name="font-download", daemon=True)
+    thread.start()
+    return thread
@@ -5,9 +5,17 @@ import os
 import pygame
 import time
 from src.engine.constants import GameState
-from src.engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+from src.engine import config
+from src.engine import metrics
+from src.engine.font_utils import apply_pending_reset
+from src.engine.config import FPS
+from src.engine.headless import create_character
 from src.ui.menu import MainMenu
 from src.ui.fight_screen import FightScreen
+from src.ui.melee_screen import MeleeScreen
+from src.engine.sim_thread import SimulationThread
+from src.engine.quality import QualityGovernor
+from src.engine.display import Display
 from src.ui.character_select import CharacterSelect
 
 class Game:
@@ -15,7 +23,8 @@ class Game:
     
     def __init__(self):
         """初始化游戏"""
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # 窗口：所有界面绘制到固定分辨率的逻辑画面，每帧缩放一次到窗口
+        self.display = Display(config.WINDOW_SIZE, config.FULLSCREEN, config.SCALE_MODE)
         self.clock = pygame.time.Clock()
         self.running = True
         self.state = GameState.MAIN_MENU
@@ -23,17 +32,30 @@ class Game:
         # 游戏设置 - 必须在创建UI组件前设置
         self.vsai_mode = False
         self.ai_vs_ai_mode = False  # 新增AI对战AI模式标志
-        self.ai_difficulty = 1  # 1-3
+        self.ai_difficulty = 1  # 1-3，AI_SEARCH_DIFFICULTY为搜索AI
         self.selected_characters = [None, None]  # 玩家1和玩家2/AI选择的角色
+        self.melee_teams = None  # 多人混战中每个角色的队伍编号，None表示普通对战
         
         # 加载游戏组件
         self.main_menu = MainMenu(self)
         self.character_select = CharacterSelect(self)
         self.fight_screen = None
+        self.broadcast_server = None  # 观战广播服务器（第一次需要时创建，观众连接在战斗之间保持）
+        self.sim_thread = None  # 战斗模拟线程（THREADED_SIMULATION开启时）
+        self.quality = QualityGovernor(config.QUALITY_LEVEL)  # 画质，按主循环每帧的耗时调节
+        self.match_stats = None  # 对战统计仓库（第一次需要时打开，退出时写入剩余统计）
+        self.metrics_server = None
+        if config.METRICS_PORT is not None:
+            self._start_metrics()
     
     def run(self):
         """运行游戏主循环"""
         while self.running:
+            frame_start = time.perf_counter()
+            
+            # 后台下载的字体在两帧之间换上
+            apply_pending_reset()
+            
             # 处理输入
             self._handle_events()
             
@@ -43,8 +65,47 @@ class Game:
             # 渲染
             self._render()
             
+            # 记录本帧耗时（不包括等待），按需调整画质
+            frame_time = time.perf_counter() - frame_start
+            if self.quality.record(frame_time) and config.DEBUG_OUTPUT:
+                print(f"画质调整为: {self.quality.settings.name}")
+            if metrics.ENABLED:
+                metrics.FRAMES.inc()
+                metrics.FRAME_SECONDS.observe(frame_time)
+            
             # 控制帧率
             self.clock.tick(FPS)
+        
+        # 退出前停止模拟线程并关闭战斗界面，写出记录的数据
+        self._stop_sim_thread()
+        if self.fight_screen:
+            self.fight_screen.close()
+        if self.match_stats:
+            self.match_stats.close()
+        if self.metrics_server:
+            self.metrics_server.close()
+    
+    def _start_metrics(self):
+        """启动性能指标接口，注册抓取时计算的指标"""
+        registry = metrics.REGISTRY
+        registry.register(metrics.Gauge("fighting_fps", "最近的平均帧率", self.clock.get_fps))
+        registry.register(metrics.Gauge("fighting_effects", "当前绘制的特效数量", self._effect_count))
+        registry.register(metrics.Gauge("fighting_quality_level", "当前画质档位", lambda: self.quality.level))
+        registry.register(metrics.Gauge("fighting_sim_dropped_ticks", "模拟线程因落后过多而放弃的帧数",
+                                        lambda: self.sim_thread.dropped_ticks if self.sim_thread else 0))
+        self.metrics_server = metrics.MetricsServer(config.METRICS_PORT, config.METRICS_HOST)
+        if config.DEBUG_OUTPUT:
+            print(f"性能指标: http://{config.METRICS_HOST}:{self.metrics_server.port}/metrics")
+    
+    def _effect_count(self):
+        """当前绘制的特效数量（使用模拟线程时为绘制用的战斗界面）"""
+        if self.state != GameState.FIGHTING:
+            return 0
+        sim_thread = self.sim_thread
+        if sim_thread:
+            return len(sim_thread.view.effects)
+        fight = self.fight_screen
+        return len(fight.effects) if fight and hasattr(fight, "effects") else 0
     
     def _handle_events(self):
         """处理游戏事件"""
@@ -52,11 +113,16 @@ class Game:
             if event.type == pygame.QUIT:
                 self.running = False
             
+            # 窗口大小变化，鼠标坐标换算为逻辑坐标
+            event = self.display.handle_event(event)
+            
             # 根据当前游戏状态处理事件
             if self.state == GameState.MAIN_MENU:
                 self.main_menu.handle_event(event)
             elif self.state == GameState.CHARACTER_SELECT:
                 self.character_select.handle_event(event)
+            elif self.state == GameState.FIGHTING and self.sim_thread:
+                self.sim_thread.handle_event(event)
             elif self.state == GameState.FIGHTING and self.fight_screen:
                 self.fight_screen.handle_event(event)
     
@@ -66,31 +132,49 @@ class Game:
             self.main_menu.update()
         elif self.state == GameState.CHARACTER_SELECT:
             self.character_select.update()
-        elif self.state == GameState.FIGHTING and self.fight_screen:
+        elif self.state == GameState.FIGHTING and self.fight_screen and not self.sim_thread:
+            # 使用模拟线程时由模拟线程更新
             self.fight_screen.update()
     
     def _render(self):
         """渲染游戏画面"""
+        # 所有界面绘制到逻辑画面上
+        screen = self.display.surface
+        
         # 清屏
-        self.screen.fill((0, 0, 0))
+        screen.fill((0, 0, 0))
         
         # 根据当前状态渲染相应画面
         if self.state == GameState.MAIN_MENU:
-            self.main_menu.render(self.screen)
+            self.main_menu.render(screen)
         elif self.state == GameState.CHARACTER_SELECT:
-            self.character_select.render(self.screen)
+            self.character_select.render(screen)
+        elif self.state == GameState.FIGHTING and self.sim_thread:
+            self.sim_thread.render(screen)
         elif self.state == GameState.FIGHTING and self.fight_screen:
-            self.fight_screen.render(self.screen)
+            self.fight_screen.render(screen)
         
-        # 更新显示
-        pygame.display.flip()
+        # 缩放到窗口并更新显示
+        self.display.present()
     
     def change_state(self, new_state):
         """改变游戏状态"""
         self.state = new_state
         
+        # 离开或重新进入战斗时停止模拟线程，关闭旧的战斗界面
+        self._stop_sim_thread()
+        if self.fight_screen:
+            self.fight_screen.close()
+            self.fight_screen = None
+        
         # 状态切换逻辑
-        if new_state == GameState.FIGHTING:
+        if new_state == GameState.FIGHTING and self.melee_teams is not None:
+            # 多人混战：角色按编号轮流使用
+            roster = ["Ryu", "Ken", "Chun-Li"]
+            fighters = [create_character(roster[i % len(roster)]) for i in range(len(self.melee_teams))]
+            self.fight_screen = MeleeScreen(self, fighters, self.melee_teams, self.ai_difficulty)
+        
+        elif new_state == GameState.FIGHTING:
             # 创建战斗场景
             self.fight_screen = FightScreen(
                 self,
@@ -99,9 +183,47 @@ class Game:
                 self.vsai_mode,
                 self.ai_difficulty
             )
+            
+            # 录制回放
+            if config.REPLAY_RECORD_DIR:
+                from src.engine.replay import ReplayRecorder
+                self.fight_screen.add_tick_listener(ReplayRecorder(config.REPLAY_RECORD_DIR))
+            
+            # 记录本场对战的统计
+            if config.MATCH_STATS_DB:
+                from src.engine.match_stats import MatchStatsCollector, StatsWarehouse
+                if self.match_stats is None:
+                    self.match_stats = StatsWarehouse(config.MATCH_STATS_DB)
+                controllers = (f"ai:{self.ai_difficulty}" if self.ai_vs_ai_mode else "human",
+                               f"ai:{self.ai_difficulty}" if self.vsai_mode else "human")
+                MatchStatsCollector(self.fight_screen, self.match_stats.add, "interactive", controllers)
+            
+            # 配置了记录目录时，记录本场对战数据用于训练
+            if config.SELFPLAY_RECORD_DIR:
+                from src.ai.data_recorder import SelfPlayRecorder
+                self.fight_screen.add_tick_listener(SelfPlayRecorder(config.SELFPLAY_RECORD_DIR))
+            
+            # 配置了广播端口时，向观众广播AI对战AI
+            if config.BROADCAST_PORT and self.ai_vs_ai_mode:
+                if self.broadcast_server is None:
+                    from src.engine.broadcast import BroadcastServer
+                    self.broadcast_server = BroadcastServer("0.0.0.0", config.BROADCAST_PORT)
+                self.fight_screen.add_tick_listener(self.broadcast_server)
+            
+            # 在独立线程中运行模拟，主线程只绘制模拟线程发布的状态
+            if config.THREADED_SIMULATION:
+                self.sim_thread = SimulationThread(self.fight_screen)
+                self.sim_thread.start()
+    
+    def _stop_sim_thread(self):
+        """停止模拟线程（之后战斗界面只在主线程中访问）"""
+        if self.sim_thread:
+            self.sim_thread.stop()
+            self.sim_thread = None
     
     def start_vs_ai(self, difficulty=1):
         """开始AI对战模式"""
+        self.melee_teams = None
         self.vsai_mode = True
         self.ai_vs_ai_mode = False
         self.ai_difficulty = difficulty
@@ -109,6 +231,7 @@ class Game:
     
     def start_ai_vs_ai(self, difficulty=2):
         """开始AI对战AI模式"""
+        self.melee_teams = None
         self.vsai_mode = True
         self.ai_vs_ai_mode = True
         self.ai_difficulty = difficulty
@@ -116,10 +239,24 @@ class Game:
     
     def start_vs_player(self):
         """开始双人对战模式"""
+        self.melee_teams = None
         self.vsai_mode = False
         self.ai_vs_ai_mode = False
         self.change_state(GameState.CHARACTER_SELECT)
     
+    def start_melee(self, teams, difficulty=2):
+        """开始多人混战模式（全部由AI控制，不经过角色选择）
+        
+        Args:
+            teams: 每个角色的队伍编号，如[0, 1, 2, 3]为4人混战，[0, 0, 1, 1]为2对2
+            difficulty: AI难度
+        """
+        self.vsai_mode = True
+        self.ai_vs_ai_mode = True
+        self.ai_difficulty = difficulty
+        self.melee_teams = list(teams)
+        self.change_state(GameState.FIGHTING)
+    
     def exit_game(self):
         """退出游戏"""
         self.running = False 
\ No newline at end of file
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+无界面对战工具
+
+在不打开窗口、不等待真实时间的情况下运行完整的战斗逻辑，
+用于批量生成训练数据、AI评估等离线任务。
+"""
+
+import os
+import pygame
+from src.engine import config
+from src.engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, ROUND_TIME
+from src.engine.combat_events import CombatStats
+
+
+def init_headless():
+    """初始化无界面运行环境
+    
+    使用SDL的dummy驱动创建显示Surface（角色精灵加载需要），
+    并关闭调试输出。可重复调用。
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if not pygame.get_init():
+        pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    config.DEBUG_OUTPUT = False
+
+
+class HeadlessGame:
+    """无界面对战使用的最小游戏对象，只提供FightScreen需要的属性"""
+    
+    def __init__(self, ai_vs_ai_mode=True):
+        """初始化
+        
+        Args:
+            ai_vs_ai_mode: 是否为AI对战AI模式（决定角色名称和AI行为）
+        """
+        self.ai_vs_ai_mode = ai_vs_ai_mode
+        self.vsai_mode = True
+    
+    def change_state(self, new_state):
+        """无界面模式下忽略状态切换"""
+        pass
+
+
+def _character_classes():
+    """角色名称到角色类的映射"""
+    # 延迟导入，避免引擎模块与角色模块循环依赖
+    from src.characters.ryu import Ryu
+    from src.characters.ken import Ken
+    from src.characters.chun_li import ChunLi
+    
+    return {
+        "Ryu": Ryu,
+        "Ken": Ken,
+        "Chun-Li": ChunLi
+    }
+
+
+def create_character(name, x=100, y=400):
+    """根据角色名称创建角色
+    
+    Args:
+        name: 角色名称 ("Ryu", "Ken", "Chun-Li")
+        x: 初始x坐标
+        y: 初始y坐标
+    
+    Returns:
+        角色实例
+    """
+    character_classes = _character_classes()
+    if name not in character_classes:
+        raise ValueError(f"未知角色: {name}")
+    return character_classes[name](x, y)
+
+
+def character_key(character):
+    """获取角色实例对应的角色名称（战斗界面会覆盖character.name，不能直接使用）
+    
+    Args:
+        character: 角色实例
+    
+    Returns:
+        角色名称，可传给create_character
+    """
+    for name, character_class in _character_classes().items():
+        if type(character) is character_class:
+            return name
+    raise ValueError(f"未知角色类型: {type(character).__name__}")
+
+
+def create_headless_fight(p1_name="Ryu", p2_name="Ken", controller_factories=None, difficulty=1,
+                          seed=None):
+    """创建一个无界面的战斗界面（不运行）
+    
+    Args:
+        p1_name: 玩家1角色名称
+        p2_name: 玩家2角色名称
+        controller_factories: (工厂1, 工厂2)，每个工厂以(character, clock)为参数
+            返回带update(dt, opponent)方法的控制器；为None时使用默认的AI对战AI配置
+        difficulty: 未指定控制器工厂时使用的AI难度
+        seed: 战斗的随机种子，None表示随机生成
+    
+    Returns:
+        FightScreen实例
+    """
+    # 延迟导入，FightScreen依赖AI模块
+    from src.ui.fight_screen import FightScreen
+    
+    init_headless()
+    
+    player1 = create_character(p1_name, 100, 400)
+    player2 = create_character(p2_name, 600, 400)
+    
+    # 指定了控制器时使用简单难度创建，避免加载不需要的模型
+    fight = FightScreen(HeadlessGame(), player1, player2, True,
+                        difficulty if controller_factories is None else 1, seed)
+    if controller_factories is not None:
+        factory1, factory2 = controller_factories
+        fight.set_controllers(factory1(player1, fight.get_sim_time),
+                              factory2(player2, fight.get_sim_time))
+    return fight
+
+
+def run_headless_match(p1_name="Ryu", p2_name="Ken", controller_factories=None,
+                       difficulty=1, listeners=(), max_time=ROUND_TIME, seed=None):
+    """运行一场无界面对战
+    
+    Args:
+        p1_name: 玩家1角色名称
+        p2_name: 玩家2角色名称
+        controller_factories: (工厂1, 工厂2)，参见create_headless_fight
+        difficulty: 未指定控制器工厂时使用的AI难度
+        listeners: 每帧监听器列表（如数据记录器），可以跨多场对战使用，结束时不关闭，由调用者关闭
+        max_time: 最长模拟时间（秒），超时按当前血量判定胜负
+        seed: 随机种子，None表示随机生成
+    
+    Returns:
+        对战结果字典
+    """
+    fight = create_headless_fight(p1_name, p2_name, controller_factories, difficulty, seed)
+    player1, player2 = fight.player1, fight.player2
+    
+    # 按战斗事件统计双方的出招、命中、格挡和落空
+    stats = CombatStats()
+    fight.combat_events.subscribe(stats)
+    
+    # 详细统计（按招式、状态、距离），调用者可以写入统计仓库
+    from src.engine.match_stats import MatchStatsCollector
+    collector = MatchStatsCollector(fight)
+    
+    for listener in listeners:
+        fight.add_tick_listener(listener)
+    
+    max_frames = int(max_time * FPS)
+    frames = 0
+    while not fight.round_over and frames < max_frames:
+        fight.update()
+        frames += 1
+    
+    # 达到最长模拟时间时强制结束回合（按血量判定）
+    if not fight.round_over:
+        fight.sim_time = max(fight.sim_time, ROUND_TIME)
+        fight.update()
+    
+    # 先移除调用者的监听器，fight.close()只关闭本场对战自己的监听器
+    caller_listeners = {id(listener) for listener in listeners}
+    fight.tick_listeners = [listener for listener in fight.tick_listeners if id(listener) not in caller_listeners]
+    fight.close()
+    
+    if fight.winner is player1:
+        winner = 0
+    elif fight.winner is player2:
+        winner = 1
+    else:
+        winner = None
+    
+    return {
+        "winner": winner,
+        "p1_health": player1.health,
+        "p2_health": player2.health,
+        "frames": frames,
+        "ko": player1.health <= 0 or player2.health <= 0,
+        "stats": stats.as_dict(),
+        "match_stats": collector.record
+    }
+
+
+def create_headless_melee(names, teams=None, difficulty=2, seed=None, controller_factory=None):
+    """创建一个无界面的多人混战（不运行）
+    
+    Args:
+        names: 角色名称列表
+        teams: 每个角色的队伍编号，None表示各自为战
+        difficulty: AI难度
+        seed: 随机种子，None表示随机生成
+        controller_factory: 参见MeleeScreen
+    
+    Returns:
+        MeleeScreen实例
+    """
+    # 延迟导入，MeleeScreen依赖AI模块
+    from src.ui.melee_screen import MeleeScreen
+    
+    init_headless()
+    
+    fighters = [create_character(name) for name in names]
+    return MeleeScreen(HeadlessGame(), fighters, teams, difficulty, seed, controller_factory)
+
+
+def run_headless_melee(names, teams=None, difficulty=2, max_time=ROUND_TIME, seed=None):
+    """运行一场无界面多人混战
+    
+    Args:
+        names: 角色名称列表
+        teams: 每个角色的队伍编号，None表示各自为战
+        difficulty: AI难度
+        max_time: 最长模拟时间（秒），超时按各队剩余生命值判定胜负
+        seed: 随机种子，None表示随机生成
+    
+    Returns:
+        对战结果字典
+    """
+    melee = create_headless_melee(names, teams, difficulty, seed)
+    stats = CombatStats(len(melee.fighters))
+    melee.combat_events.subscribe(stats)
+    
+    max_frames = int(max_time * FPS)
+    frames = 0
+    while not melee.round_over and frames < max_frames:
+        melee.update()
+        frames += 1
+    
+    if not melee.round_over:
+        melee.sim_time = max(melee.sim_time, ROUND_TIME)
+        melee.update()
+    
+    return {
+        "winner_team": melee.winner_team,
+        "health": [fighter.health for fighter in melee.fighters],
+        "frames": frames,
+        "stats": stats.as_dict()
+    }
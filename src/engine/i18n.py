@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+界面文字表
+
+所有界面文字按消息编号保存中文和英文两个版本。语言在启动时确定一次（config.LANGUAGE，
+默认中文字体能加载时用中文，否则用英文），之后界面代码用编号取出当前语言的文字，
+渲染时不需要再检查文字中是否有中文。
+
+新增界面文字时在MESSAGES中添加一条，带参数的文字使用str.format的占位符。
+"""
+
+from src.engine import config
+
+# 支持的语言（MESSAGES中每条文字的顺序）
+LANGUAGES = ("zh", "en")
+
+# {消息编号: (中文, 英文)}
+MESSAGES = {
+    # 主菜单
+    "menu.title": ("格斗之王", "Fighting King"),
+    "menu.vs_player": ("对战玩家", "VS Player"),
+    "menu.vs_ml_ai": ("对战机器学习AI", "VS ML AI"),
+    "menu.vs_search_ai": ("对战搜索AI", "VS Search AI"),
+    "menu.ai_vs_ai": ("AI对战AI", "AI VS AI"),
+    "menu.melee": ("4人混战", "4-Way Melee"),
+    "menu.team_battle": ("2对2团队战", "2v2 Team Battle"),
+    "menu.quit": ("退出游戏", "Quit"),
+    
+    # 选择角色
+    "select.title": ("选择角色", "Select Character"),
+    "select.ai1": ("选择AI 1角色", "Select AI 1 Character"),
+    "select.ai2": ("选择AI 2角色", "Select AI 2 Character"),
+    "select.yours": ("选择你的角色", "Select Your Character"),
+    "select.player1": ("玩家1选择", "Player 1 Select"),
+    "select.player2": ("玩家2选择", "Player 2 Select"),
+    "select.confirm": ("确认", "Confirm"),
+    "select.back": ("返回", "Back"),
+    "select.player1_choice": ("玩家1: {name}", "Player 1: {name}"),
+    "select.player2_choice": ("玩家2: {name}", "Player 2: {name}"),
+    "select.show_controls": ("按 H 键显示控制说明", "Press H to show controls"),
+    "select.toggle_controls": ("按 H 键隐藏/显示控制说明", "Press H to hide/show controls"),
+    
+    # 操作说明
+    "controls.title": ("游戏控制", "Controls"),
+    "controls.player1": ("玩家1控制:", "Player 1:"),
+    "controls.player2": ("玩家2控制:", "Player 2:"),
+    "controls.jump": ("{key} - 跳跃", "{key} - Jump"),
+    "controls.left": ("{key} - 左移", "{key} - Left"),
+    "controls.right": ("{key} - 右移", "{key} - Right"),
+    "controls.crouch": ("{key} - 蹲下", "{key} - Crouch"),
+    "controls.light_punch": ("{key} - 轻拳", "{key} - L.Punch"),
+    "controls.heavy_punch": ("{key} - 重拳", "{key} - H.Punch"),
+    "controls.light_kick": ("{key} - 轻腿", "{key} - L.Kick"),
+    "controls.heavy_kick": ("{key} - 重腿", "{key} - H.Kick"),
+    "controls.block": ("{key} - 格挡", "{key} - Block"),
+    "key.space": ("空格", "Space"),
+    "key.up": ("↑", "Up"),
+    "key.down": ("↓", "Down"),
+    "key.left": ("←", "Left"),
+    "key.right": ("→", "Right"),
+    "key.keypad": ("小键盘{key}", "Num{key}"),
+    
+    # 战斗界面
+    "fight.player1": ("玩家1", "Player 1"),
+    "fight.player2": ("玩家2", "Player 2"),
+    "fight.ai_vs_ai_mode": ("AI对战AI模式", "AI VS AI Mode"),
+    "fight.style_search": ("(搜索型)", "(Search)"),
+    "fight.style_aggressive": ("(进攻型)", "(Aggressive)"),
+    "fight.style_defensive": ("(防守型)", "(Defensive)"),
+    "fight.cooldown": ("攻击冷却: ", "Cooldown: "),
+    "fight.seconds": ("秒", "s"),
+    "fight.wins": ("{name}胜利！", "{name} Wins!"),
+    "fight.draw": ("平局！", "Draw!"),
+    "fight.team": ("队伍{number}", "Team {number}"),
+    "fight.back_hint": ("按ESC返回主菜单", "Press ESC for Main Menu"),
+    
+    # 回放、网络对战和观战
+    "replay.paused": ("暂停", "Paused"),
+    "netplay.status": ("帧 {frame}  回滚 {rollback}  预测 {predicted}", "Frame {frame}  Rollback {rollback}  "
+                       "Predicted {predicted}"),
+    "netplay.desync": ("不同步: 第{frame}帧", "Desync at frame {frame}"),
+    "broadcast.waiting": ("等待战斗开始...", "Waiting for the fight..."),
+    "broadcast.disconnected": ("连接已断开", "Disconnected"),
+}
+
+# 当前语言和它的文字表 {消息编号: 文字}
+language = None
+_table = {}
+
+
+def resolve_language():
+    """确定界面语言：config.LANGUAGE，未设置时中文字体能加载用中文，否则用英文"""
+    if config.LANGUAGE in LANGUAGES:
+        return config.LANGUAGE
+    from src.engine import font_utils
+    # 找到字体文件不代表能打开，加载失败时get_chinese_font会清除has_chinese_font
+    font_utils.get_chinese_font()
+    return "zh" if font_utils.has_chinese_font else "en"
+
+
+def set_language(name=None):
+    """设置界面语言并生成文字表（已渲染缓存的文字不会更新）
+    
+    Args:
+        name: "zh"或"en"，None表示按resolve_language确定
+    
+    Returns:
+        设置的语言
+    """
+    global language, _table
+    name = name or resolve_language()
+    if name not in LANGUAGES:
+        raise ValueError(f"不支持的语言: {name}")
+    index = LANGUAGES.index(name)
+    _table = {message_id: texts[index] for message_id, texts in MESSAGES.items()}
+    language = name
+    return name
+
+
+def get_text(message_id, **kwargs):
+    """获取当前语言的界面文字（第一次调用时确定语言）
+    
+    Args:
+        message_id: 消息编号
+        **kwargs: 文字中占位符的值
+    
+    Returns:
+        文字
+    """
+    if not _table:
+        set_language()
+    text = _table[message_id]
+    return text.format(**kwargs) if kwargs else text
@@ -0,0 +1,627 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+对战统计仓库
+
+每场双人战斗（交互式或无界面）结束时生成一份统计：每个招式的出招、命中、被格挡、落空次数和伤害，
+双方处于每种角色状态的帧数，双方距离的分布，以及KO还是超时结束。统计先缓存在内存中，
+每积累一批在一个事务中写入SQLite。
+
+分析时把数据库导出为按列存储的NumPy文件（每列一个.npy，字符串列保存为编号和词表），
+查询直接在内存映射的列上用bincount分组汇总，几百万场对战也只需要几秒。
+
+用法:
+    python -m src.engine.match_stats collect --matches 1000 --workers 8
+    python -m src.engine.match_stats export --out results/match_stats
+    python -m src.engine.match_stats query moves --data results/match_stats --character Ryu
+"""
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+import itertools
+import threading
+import multiprocessing
+import numpy as np
+from src.engine import config
+from src.engine.config import FPS, ROUND_TIME, STAGE_WIDTH
+from src.engine.combat_events import CombatEventType
+from src.characters.character import CharacterState
+
+# 距离分布的区间宽度（像素），最后一个区间包含所有更远的距离
+DISTANCE_BIN = 50
+DISTANCE_BINS = STAGE_WIDTH // DISTANCE_BIN
+
+# 每积累这么多场对战写入一次数据库（一个事务）
+FLUSH_BATCH = 256
+
+# 招式统计的字段（与数据库moves表的列对应）
+MOVE_FIELDS = ("attacks", "hits", "blocked", "whiffs", "damage")
+
+# 各表的列（导出和查询按这个顺序读取），字符串列在导出时编码为整数
+TABLE_COLUMNS = {
+    "matches": ("id", "source", "p1", "p2", "p1_controller", "p2_controller", "winner", "ko", "frames",
+                "p1_health", "p2_health"),
+    "moves": ("match_id", "player", "move") + MOVE_FIELDS,
+    "states": ("match_id", "player", "state", "frames"),
+    "distance": ("match_id", "bin", "frames")
+}
+STRING_COLUMNS = frozenset(("source", "p1", "p2", "p1_controller", "p2_controller", "move", "state"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    source TEXT NOT NULL,
+    p1 TEXT NOT NULL,
+    p2 TEXT NOT NULL,
+    p1_controller TEXT NOT NULL,
+    p2_controller TEXT NOT NULL,
+    seed TEXT,
+    winner INTEGER NOT NULL,  -- 0或1，-1表示平局
+    ko INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    p1_health INTEGER NOT NULL,
+    p2_health INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS moves (
+    match_id INTEGER NOT NULL,
+    player INTEGER NOT NULL,
+    move TEXT NOT NULL,
+    attacks INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    blocked INTEGER NOT NULL,
+    whiffs INTEGER NOT NULL,
+    damage INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS states (
+    match_id INTEGER NOT NULL,
+    player INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    frames INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS distance (
+    match_id INTEGER NOT NULL,
+    bin INTEGER NOT NULL,
+    frames INTEGER NOT NULL
+);
+"""
+
+# 招式事件对应的统计字段
+_EVENT_FIELDS = {
+    CombatEventType.ATTACK_STARTED: 0,
+    CombatEventType.HIT: 1,
+    CombatEventType.BLOCKED: 2,
+    CombatEventType.WHIFF: 3
+}
+
+_STATES = list(CharacterState)
+
+
+def check_move_counts(moves):
+    """检查每个招式的命中、被格挡、落空次数之和等于出招次数
+    
+    Args:
+        moves: {(玩家序号, 招式): [出招, 命中, 被格挡, 落空, 伤害]}
+    
+    Raises:
+        ValueError: 次数不一致
+    """
+    for key, (attacks, hits, blocked, whiffs, _) in moves.items():
+        if hits + blocked + whiffs != attacks:
+            raise ValueError(f"招式统计不一致 {key}: 出招{attacks}次，命中{hits}+格挡{blocked}+落空{whiffs}")
+
+
+class MatchStatsCollector:
+    """对战统计收集器：订阅战斗事件，并作为每帧监听器统计状态和距离"""
+    
+    def __init__(self, fight, sink=None, source="headless", controllers=("", "")):
+        """订阅战斗界面的事件并注册为监听器
+        
+        Args:
+            fight: 双人战斗界面
+            sink: 回合结束时以统计结果为参数调用的函数（如StatsWarehouse.add），None表示只保存在record属性中
+            source: 对战来源（如"interactive"、"ladder"）
+            controllers: 双方控制器的描述
+        """
+        self.sink = sink
+        self.source = source
+        self.controllers = tuple(controllers)
+        self.moves = {}  # {(玩家序号, 招式): [出招, 命中, 被格挡, 落空, 伤害]}
+        self._open = [None, None]  # 每个玩家正在进行、还没有结果的招式的统计行
+        self.state_frames = [[0] * len(_STATES) for _ in range(2)]
+        self.distance = [0] * DISTANCE_BINS
+        self.record = None
+        fight.combat_events.subscribe(self._on_event, _EVENT_FIELDS)
+        fight.add_tick_listener(self)
+    
+    def _counts(self, player, move):
+        """招式的统计行"""
+        key = (player, move)
+        counts = self.moves.get(key)
+        if counts is None:
+            counts = self.moves[key] = [0] * len(MOVE_FIELDS)
+        return counts
+    
+    def _close(self, player):
+        """没有结果就结束的招式（被打断、回合结束）记为落空"""
+        counts = self._open[player]
+        if counts is not None:
+            counts[3] += 1
+            self._open[player] = None
+    
+    def _on_event(self, event):
+        """统计一个招式事件：每次出招只归为命中、被格挡、落空中的一种（第一个结果事件）"""
+        player = event.attacker.player_index
+        kind = event.kind
+        if kind is CombatEventType.ATTACK_STARTED:
+            self._close(player)
+            counts = self._open[player] = self._counts(player, event.move)
+            counts[0] += 1
+            return
+        
+        counts = self._open[player]
+        if counts is not None:
+            counts[_EVENT_FIELDS[kind]] += 1
+            self._open[player] = None
+        if kind is CombatEventType.HIT:
+            (counts or self._counts(player, event.move))[4] += event.damage
+    
+    def on_tick(self, fight):
+        """每帧回调：统计双方状态和距离
+        
+        Args:
+            fight: 战斗界面
+        """
+        player1, player2 = fight.player1, fight.player2
+        self.state_frames[0][player1.state.value] += 1
+        self.state_frames[1][player2.state.value] += 1
+        self.distance[min(int(abs(player1.x - player2.x)) // DISTANCE_BIN, DISTANCE_BINS - 1)] += 1
+    
+    def on_round_end(self, fight):
+        """回合结束回调：生成统计结果
+        
+        Args:
+            fight: 战斗界面
+        """
+        # 延迟导入，避免引擎模块与角色模块循环依赖
+        from src.engine.headless import character_key
+        
+        for player in range(2):
+            self._close(player)
+        check_move_counts(self.moves)
+        
+        player1, player2 = fight.player1, fight.player2
+        if fight.winner is player1:
+            winner = 0
+        elif fight.winner is player2:
+            winner = 1
+        else:
+            winner = -1
+        self.record = {
+            "source": self.source,
+            "characters": (character_key(player1), character_key(player2)),
+            "controllers": self.controllers,
+            "seed": fight.seed,
+            "winner": winner,
+            "ko": player1.health <= 0 or player2.health <= 0,
+            "frames": sum(self.distance),
+            "health": (player1.health, player2.health),
+            "moves": {key: list(counts) for key, counts in self.moves.items()},
+            "states": [list(frames) for frames in self.state_frames],
+            "distance": list(self.distance)
+        }
+        if self.sink is not None:
+            self.sink(self.record)
+
+
+class StatsWarehouse:
+    """对战统计数据库：缓存统计结果，分批在一个事务中写入"""
+    
+    def __init__(self, path, batch_size=FLUSH_BATCH):
+        """打开（或创建）数据库
+        
+        Args:
+            path: 数据库文件路径
+            batch_size: 每批写入的对战数量
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # 交互式对战时由模拟线程添加记录，主线程退出时关闭
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.executescript(_SCHEMA)
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        self._lock = threading.Lock()
+    
+    def add(self, record, source=None, controllers=None):
+        """添加一场对战的统计（积累到batch_size场后写入）
+        
+        Args:
+            record: MatchStatsCollector生成的统计结果
+            source: 覆盖统计结果中的对战来源
+            controllers: 覆盖统计结果中的控制器描述
+        """
+        if source is not None or controllers is not None:
+            record = dict(record)
+            if source is not None:
+                record["source"] = source
+            if controllers is not None:
+                record["controllers"] = tuple(controllers)
+        with self._lock:
+            self.pending.append(record)
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+    
+    def flush(self):
+        """在一个事务中写入缓存的统计"""
+        with self._lock:
+            self._flush()
+    
+    def _flush(self):
+        """写入缓存的统计（调用者持有锁）"""
+        if not self.pending:
+            return
+        now = time.time()
+        moves, states, distance = [], [], []
+        with self.connection:
+            for record in self.pending:
+                # 对战编号由数据库分配，子表按编号关联
+                match_id = self.connection.execute(
+                    "INSERT INTO matches (created, source, p1, p2, p1_controller, p2_controller, seed, winner, ko, "
+                    "frames, p1_health, p2_health) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (now, record["source"], *record["characters"], *record["controllers"],
+                     None if record["seed"] is None else str(record["seed"]), record["winner"], int(record["ko"]),
+                     record["frames"], *record["health"])).lastrowid
+                for (player, move), counts in record["moves"].items():
+                    moves.append((match_id, player, move, *counts))
+                for player, frames in enumerate(record["states"]):
+                    states.extend((match_id, player, state.name, count)
+                                  for state, count in zip(_STATES, frames) if count)
+                distance.extend((match_id, index, count) for index, count in enumerate(record["distance"]) if count)
+            self.connection.executemany("INSERT INTO moves VALUES (?, ?, ?, ?, ?, ?, ?, ?)", moves)
+            self.connection.executemany("INSERT INTO states VALUES (?, ?, ?, ?)", states)
+            self.connection.executemany("INSERT INTO distance VALUES (?, ?, ?)", distance)
+        self.pending = []
+    
+    def close(self):
+        """写入剩余的统计并关闭"""
+        self.flush()
+        self.connection.close()
+
+
+def read_columns(db_path, chunk_size=100000):
+    """从数据库读取所有表，按列转换为NumPy数组
+    
+    Args:
+        db_path: 数据库文件路径
+        chunk_size: 每次读取的行数
+    
+    Returns:
+        (列字典{表: {列: 数组}}, 词表{列: [字符串]})，字符串列为词表中的编号
+    """
+    connection = sqlite3.connect(db_path)
+    vocab = {}
+    codes = {}  # {列: {字符串: 编号}}
+    tables = {}
+    try:
+        for table, columns in TABLE_COLUMNS.items():
+            cursor = connection.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid")
+            chunks = {column: [] for column in columns}
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for column, values in zip(columns, zip(*rows)):
+                    if column in STRING_COLUMNS:
+                        mapping = codes.setdefault(column, {})
+                        values = [mapping.setdefault(value, len(mapping)) for value in values]
+                        chunks[column].append(np.array(values, dtype=np.int32))
+                    else:
+                        chunks[column].append(np.array(values, dtype=np.int64))
+            tables[table] = {column: np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+                             for column, parts in chunks.items()}
+    finally:
+        connection.close()
+    for column, mapping in codes.items():
+        vocab[column] = list(mapping)
+    return tables, vocab
+
+
+def export_columns(db_path, out_dir):
+    """把数据库导出为按列存储的NumPy文件
+    
+    每列保存为 <表>.<列>.npy，字符串列的词表保存在vocab.json。
+    
+    Args:
+        db_path: 数据库文件路径
+        out_dir: 输出目录
+    
+    Returns:
+        {表: 行数}
+    """
+    tables, vocab = read_columns(db_path)
+    os.makedirs(out_dir, exist_ok=True)
+    for table, columns in tables.items():
+        for column, values in columns.items():
+            np.save(os.path.join(out_dir, f"{table}.{column}.npy"), values)
+    with open(os.path.join(out_dir, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(vocab, f, ensure_ascii=False)
+    return {table: len(columns[TABLE_COLUMNS[table][0]]) for table, columns in tables.items()}
+
+
+def load_columns(path):
+    """读取统计数据：导出目录按内存映射加载，数据库文件直接读取
+    
+    Args:
+        path: export_columns的输出目录，或数据库文件路径
+    
+    Returns:
+        (列字典, 词表)，参见read_columns
+    """
+    if not os.path.isdir(path):
+        return read_columns(path)
+    tables = {table: {column: np.load(os.path.join(path, f"{table}.{column}.npy"), mmap_mode="r")
+                      for column in columns}
+              for table, columns in TABLE_COLUMNS.items()}
+    with open(os.path.join(path, "vocab.json"), encoding="utf-8") as f:
+        vocab = json.load(f)
+    return tables, vocab
+
+
+class StatsQuery:
+    """在按列存储的统计数据上做分组汇总"""
+    
+    def __init__(self, tables, vocab):
+        """初始化
+        
+        Args:
+            tables: 列字典
+            vocab: 词表
+        """
+        self.tables = tables
+        self.vocab = vocab
+        matches = tables["matches"]
+        # 角色名称统一编码：p1和p2列各自有词表
+        self.characters = sorted(set(vocab.get("p1", [])) | set(vocab.get("p2", [])))
+        index = {name: i for i, name in enumerate(self.characters)}
+        self.p1 = self._recode(matches["p1"], vocab.get("p1", []), index)
+        self.p2 = self._recode(matches["p2"], vocab.get("p2", []), index)
+        self.winner = np.asarray(matches["winner"])
+        self.ko = np.asarray(matches["ko"]).astype(bool)
+        self.match_ids = np.asarray(matches["id"])
+    
+    @staticmethod
+    def _recode(codes, names, index):
+        """把列自己的编号换算为统一的角色编号"""
+        table = np.array([index[name] for name in names], dtype=np.int32)
+        return table[np.asarray(codes)] if len(table) else np.zeros(0, dtype=np.int32)
+    
+    def _player_character(self, table):
+        """子表每行对应的角色编号和对战行号"""
+        rows = np.searchsorted(self.match_ids, np.asarray(table["match_id"]))
+        player = np.asarray(table["player"])
+        return np.where(player == 0, self.p1[rows], self.p2[rows]), rows
+    
+    def _appearances(self):
+        """每个角色的出场次数"""
+        count = len(self.characters)
+        return np.bincount(self.p1, minlength=count) + np.bincount(self.p2, minlength=count)
+    
+    def summary(self):
+        """总体：对战数、KO和超时的比例、平均时长"""
+        total = len(self.match_ids)
+        if total == 0:
+            return ["没有对战记录"]
+        frames = np.asarray(self.tables["matches"]["frames"])
+        draws = int(np.count_nonzero(self.winner < 0))
+        return [f"对战: {total}",
+                f"KO结束: {np.count_nonzero(self.ko) / total:.1%}, 超时结束: {np.count_nonzero(~self.ko) / total:.1%}, "
+                f"平局: {draws / total:.1%}",
+                f"平均时长: {frames.mean() / FPS:.1f}秒 (KO {frames[self.ko].mean() / FPS if self.ko.any() else 0:.1f}秒)",
+                f"玩家1胜率: {np.count_nonzero(self.winner == 0) / total:.1%}"]
+    
+    def characters_report(self):
+        """每个角色的出场、胜率、KO胜利比例"""
+        count = len(self.characters)
+        appearances = self._appearances()
+        wins = (np.bincount(self.p1, weights=self.winner == 0, minlength=count) +
+                np.bincount(self.p2, weights=self.winner == 1, minlength=count))
+        ko_wins = (np.bincount(self.p1, weights=(self.winner == 0) & self.ko, minlength=count) +
+                   np.bincount(self.p2, weights=(self.winner == 1) & self.ko, minlength=count))
+        lines = [f"{'角色':<10}{'出场':>8}{'胜率':>8}{'KO胜':>8}"]
+        for index in np.argsort(-wins / np.maximum(appearances, 1)):
+            lines.append(f"{self.characters[index]:<10}{appearances[index]:>8}"
+                         f"{wins[index] / max(appearances[index], 1):>8.1%}{ko_wins[index] / max(wins[index], 1):>8.1%}")
+        return lines
+    
+    def matchups(self):
+        """对阵胜率矩阵（行对列的胜率，忽略平局）"""
+        count = len(self.characters)
+        decided = self.winner >= 0
+        # 每场对战从双方角度各计一次
+        first = np.concatenate([self.p1, self.p2])[np.concatenate([decided, decided])]
+        second = np.concatenate([self.p2, self.p1])[np.concatenate([decided, decided])]
+        won = np.concatenate([self.winner == 0, self.winner == 1])[np.concatenate([decided, decided])]
+        pair = first * count + second
+        games = np.bincount(pair, minlength=count * count).reshape(count, count)
+        wins = np.bincount(pair, weights=won, minlength=count * count).reshape(count, count)
+        lines = [" " * 10 + "".join(f"{name:>10}" for name in self.characters)]
+        for row, name in enumerate(self.characters):
+            cells = "".join(f"{wins[row, column] / games[row, column]:>10.1%}" if games[row, column] else f"{'-':>10}"
+                            for column in range(count))
+            lines.append(f"{name:<10}{cells}")
+        return lines
+    
+    def moves_report(self, character=None):
+        """每个角色每个招式的每场使用次数、命中/格挡/落空比例、伤害"""
+        moves = self.tables["moves"]
+        names = self.vocab.get("move", [])
+        if not names:
+            return ["没有招式记录"]
+        characters, _ = self._player_character(moves)
+        key = characters * len(names) + np.asarray(moves["move"])
+        size = len(self.characters) * len(names)
+        sums = {field: np.bincount(key, weights=np.asarray(moves[field]), minlength=size) for field in MOVE_FIELDS}
+        appearances = self._appearances()
+        lines = [f"{'角色':<10}{'招式':<14}{'每场':>8}{'命中':>8}{'格挡':>8}{'落空':>8}{'每次命中伤害':>12}{'伤害占比':>10}"]
+        for char_index, char_name in enumerate(self.characters):
+            if character is not None and char_name != character:
+                continue
+            block = slice(char_index * len(names), (char_index + 1) * len(names))
+            total_damage = sums["damage"][block].sum()
+            for move_index in np.argsort(-sums["damage"][block]):
+                index = char_index * len(names) + move_index
+                attacks = sums["attacks"][index]
+                if attacks == 0:
+                    continue
+                lines.append(f"{char_name:<10}{names[move_index]:<14}{attacks / max(appearances[char_index], 1):>8.1f}"
+                             f"{sums['hits'][index] / attacks:>8.1%}{sums['blocked'][index] / attacks:>8.1%}"
+                             f"{sums['whiffs'][index] / attacks:>8.1%}"
+                             f"{sums['damage'][index] / max(sums['hits'][index], 1):>12.1f}"
+                             f"{sums['damage'][index] / max(total_damage, 1):>10.1%}")
+        return lines
+    
+    def states_report(self, character=None):
+        """每个角色处于各状态的时间比例"""
+        states = self.tables["states"]
+        names = self.vocab.get("state", [])
+        if not names:
+            return ["没有状态记录"]
+        characters, _ = self._player_character(states)
+        key = characters * len(names) + np.asarray(states["state"])
+        frames = np.bincount(key, weights=np.asarray(states["frames"]),
+                             minlength=len(self.characters) * len(names)).reshape(len(self.characters), len(names))
+        lines = [f"{'角色':<10}" + "".join(f"{name:>12}" for name in names)]
+        for index, name in enumerate(self.characters):
+            if character is not None and name != character:
+                continue
+            total = max(frames[index].sum(), 1)
+            lines.append(f"{name:<10}" + "".join(f"{value / total:>12.1%}" for value in frames[index]))
+        return lines
+    
+    def distance_report(self):
+        """双方距离的分布（KO结束和超时结束分开）"""
+        distance = self.tables["distance"]
+        rows = np.searchsorted(self.match_ids, np.asarray(distance["match_id"]))
+        bins = np.asarray(distance["bin"])
+        frames = np.asarray(distance["frames"])
+        ko = self.ko[rows] if len(rows) else np.zeros(0, dtype=bool)
+        ko_hist = np.bincount(bins[ko], weights=frames[ko], minlength=DISTANCE_BINS)
+        timeout_hist = np.bincount(bins[~ko], weights=frames[~ko], minlength=DISTANCE_BINS)
+        lines = [f"{'距离':<12}{'KO结束':>10}{'超时结束':>10}"]
+        for index in range(DISTANCE_BINS):
+            low = index * DISTANCE_BIN
+            label = f"{low}-{low + DISTANCE_BIN}" if index < DISTANCE_BINS - 1 else f"{low}+"
+            lines.append(f"{label:<12}{ko_hist[index] / max(ko_hist.sum(), 1):>10.1%}"
+                         f"{timeout_hist[index] / max(timeout_hist.sum(), 1):>10.1%}")
+        return lines
+
+
+# 查询名称与StatsQuery方法的对应
+REPORTS = {
+    "summary": "summary",
+    "characters": "characters_report",
+    "matchups": "matchups",
+    "moves": "moves_report",
+    "states": "states_report",
+    "distance": "distance_report"
+}
+
+
+def _collect_match(job):
+    """在工作进程中运行一场对战并返回统计结果
+    
+    Args:
+        job: (描述1, 描述2, 角色1, 角色2, 最长时间, 随机种子)
+    
+    Returns:
+        MatchStatsCollector生成的统计结果
+    """
+    from src.engine.headless import run_headless_match
+    from src.ai.ladder import build_controller
+    
+    spec1, spec2, character1, character2, max_time, seed = job
+    factories = (
+        lambda character, clock: build_controller(spec1, character, clock),
+        lambda character, clock: build_controller(spec2, character, clock)
+    )
+    return run_headless_match(character1, character2, factories, max_time=max_time, seed=seed)["match_stats"]
+
+
+def collect(warehouse, matches, specs, workers=None, max_time=ROUND_TIME, seed=0):
+    """在多个进程中运行无界面对战，把统计写入数据库
+    
+    使用(控制器1, 控制器2, 角色1, 角色2)的所有组合（每轮随机排列），场数多于组合数时重复。
+    
+    Args:
+        warehouse: StatsWarehouse
+        matches: 对战场数
+        specs: 控制器描述列表（参见ladder.build_controller）
+        workers: 进程数，None表示CPU核数
+        max_time: 每场最长时间（秒）
+        seed: 总随机种子
+    """
+    from src.engine.rng import derive_seed, make_rng
+    from src.ai.ladder import LADDER_CHARACTERS, _init_worker
+    
+    # 控制器和角色独立组合，每个角色由每种控制器使用，报告比较的是角色而不是控制器；
+    # 每轮打乱组合的顺序，场数少于组合数时各控制器和角色也大致均匀出现
+    rng = make_rng(seed, "stats", "order")
+    combinations = list(itertools.product(specs, specs, LADDER_CHARACTERS, LADDER_CHARACTERS))
+    jobs = []
+    while len(jobs) < matches:
+        rng.shuffle(combinations)
+        jobs.extend(combinations[:matches - len(jobs)])
+    jobs = [(*job, max_time, derive_seed(seed, "stats", index)) for index, job in enumerate(jobs)]
+    
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        for job, record in zip(jobs, pool.imap(_collect_match, jobs, chunksize=4)):
+            warehouse.add(record, source="collect", controllers=job[:2])
+    warehouse.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="对战统计仓库")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    default_db = config.MATCH_STATS_DB or os.path.join("results", "match_stats.db")
+    
+    collect_parser = subparsers.add_parser("collect", help="运行无界面对战并记录统计")
+    collect_parser.add_argument("--matches", type=int, default=100, help="对战场数")
+    collect_parser.add_argument("--spec", nargs="*", default=["ai:aggressive:2", "ai:defensive:2", "ai:balanced:2"],
+                                help="参与对战的控制器描述")
+    collect_parser.add_argument("--workers", type=int, default=None, help="进程数（默认CPU核数）")
+    collect_parser.add_argument("--max-time", type=float, default=ROUND_TIME, help="每场最长模拟时间（秒）")
+    collect_parser.add_argument("--seed", type=int, default=0, help="总随机种子")
+    collect_parser.add_argument("--db", default=default_db, help="数据库文件路径")
+    
+    export_parser = subparsers.add_parser("export", help="导出为按列存储的NumPy文件")
+    export_parser.add_argument("--db", default=default_db, help="数据库文件路径")
+    export_parser.add_argument("--out", required=True, help="输出目录")
+    
+    query_parser = subparsers.add_parser("query", help="查询统计")
+    query_parser.add_argument("report", choices=sorted(REPORTS), help="查询内容")
+    query_parser.add_argument("--data", default=default_db, help="导出目录或数据库文件路径")
+    query_parser.add_argument("--character", default=None, help="只显示指定角色（moves、states）")
+    
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if args.command == "collect":
+        warehouse = StatsWarehouse(args.db)
+        try:
+            collect(warehouse, args.matches, args.spec, args.workers, args.max_time, args.seed)
+        finally:
+            warehouse.close()
+        print(f"记录{args.matches}场对战到 {args.db}")
+    elif args.command == "export":
+        counts = export_columns(args.db, args.out)
+        print(f"导出到 {args.out}: " + ", ".join(f"{table} {rows}行" for table, rows in counts.items()))
+    else:
+        query = StatsQuery(*load_columns(args.data))
+        method = getattr(query, REPORTS[args.report])
+        lines = method(args.character) if args.report in ("moves", "states") else method()
+        print("\n".join(lines))
+    print(f"用时{time.perf_counter() - start:.2f}秒")
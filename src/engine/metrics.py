@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+性能指标
+
+在后台线程中提供一个HTTP接口（/metrics，Prometheus文本格式），可以像其他服务一样定期抓取
+帧率、帧耗时分布、AI决策耗时、特效数量和内存占用。
+
+计数器和直方图只是普通的整数和列表：每个指标只由一个线程写入（主循环或模拟线程），
+写入时不加锁，只是几次整数加法；抓取线程读取时可能差一次刚发生的更新，对监控没有影响。
+帧率、特效数量、内存等由回调函数在抓取时计算，没人抓取时没有任何开销。
+未启动接口时（默认），AI决策计时只检查一个标志。
+
+用法:
+    在config.py中设置METRICS_PORT = 9100，然后
+    curl http://127.0.0.1:9100/metrics
+"""
+
+import os
+import time
+import bisect
+import threading
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 是否已启动指标接口（未启动时计时装饰器直接调用原函数）
+ENABLED = False
+
+# 帧耗时直方图的区间上限（秒）
+FRAME_TIME_BUCKETS = (0.001, 0.002, 0.004, 0.008, 0.0167, 0.025, 0.033, 0.05, 0.1, 0.25)
+
+# AI决策耗时直方图的区间上限（秒）
+DECISION_TIME_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.05, 0.1)
+
+
+def _format_labels(labels):
+    """把标签字典格式化为 {a="1",b="2"}"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class Counter:
+    """只增不减的计数器"""
+    
+    __slots__ = ("name", "help", "labels", "value")
+    
+    kind = "counter"
+    
+    def __init__(self, name, help_text, labels=None):
+        """初始化
+        
+        Args:
+            name: 指标名称
+            help_text: 说明
+            labels: 标签字典
+        """
+        self.name = name
+        self.help = help_text
+        self.labels = labels or {}
+        self.value = 0
+    
+    def inc(self, amount=1):
+        """增加计数"""
+        self.value += amount
+    
+    def samples(self):
+        """[(名称, 标签, 值)]"""
+        return [(self.name, self.labels, self.value)]
+
+
+class Gauge:
+    """当前值：直接设置，或者在抓取时调用回调函数计算"""
+    
+    __slots__ = ("name", "help", "labels", "value", "function")
+    
+    kind = "gauge"
+    
+    def __init__(self, name, help_text, function=None, labels=None):
+        """初始化
+        
+        Args:
+            name: 指标名称
+            help_text: 说明
+            function: 抓取时调用的无参数函数，None表示使用set设置的值
+            labels: 标签字典
+        """
+        self.name = name
+        self.help = help_text
+        self.labels = labels or {}
+        self.value = 0
+        self.function = function
+    
+    def set(self, value):
+        """设置当前值"""
+        self.value = value
+    
+    def samples(self):
+        """[(名称, 标签, 值)]"""
+        value = self.value if self.function is None else self.function()
+        return [(self.name, self.labels, value)]
+
+
+class Histogram:
+    """分布直方图（固定区间）"""
+    
+    __slots__ = ("name", "help", "labels", "bounds", "counts", "sum")
+    
+    kind = "histogram"
+    
+    def __init__(self, name, help_text, buckets, labels=None):
+        """初始化
+        
+        Args:
+            name: 指标名称
+            help_text: 说明
+            buckets: 递增的区间上限
+            labels: 标签字典
+        """
+        self.name = name
+        self.help = help_text
+        self.labels = labels or {}
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # 最后一个区间为+Inf
+        self.sum = 0.0
+    
+    def observe(self, value):
+        """记录一个值"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+    
+    def samples(self):
+        """[(名称, 标签, 值)]，区间计数为累计值"""
+        counts = list(self.counts)
+        samples = []
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            total += count
+            labels = dict(self.labels, le="+Inf" if bound == float("inf") else repr(bound))
+            samples.append((self.name + "_bucket", labels, total))
+        # 总数按区间计数求和，与+Inf区间保持一致
+        samples.append((self.name + "_sum", self.labels, self.sum))
+        samples.append((self.name + "_count", self.labels, total))
+        return samples
+
+
+class Registry:
+    """指标集合"""
+    
+    def __init__(self):
+        """初始化"""
+        self.metrics = {}  # {(名称, 标签): 指标}
+    
+    def register(self, metric):
+        """注册指标（名称和标签相同时替换）
+        
+        Args:
+            metric: Counter、Gauge或Histogram
+        
+        Returns:
+            metric
+        """
+        self.metrics[(metric.name, tuple(sorted(metric.labels.items())))] = metric
+        return metric
+    
+    def render(self):
+        """生成Prometheus文本格式
+        
+        Returns:
+            文本
+        """
+        lines = []
+        described = set()
+        for metric in sorted(self.metrics.values(), key=lambda metric: metric.name):
+            if metric.name not in described:
+                described.add(metric.name)
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# 主循环写入的指标
+FRAMES = REGISTRY.register(Counter("fighting_frames_total", "主循环帧数"))
+FRAME_SECONDS = REGISTRY.register(Histogram("fighting_frame_seconds", "主循环每帧耗时（不含等待）",
+                                            FRAME_TIME_BUCKETS))
+
+
+def decision_histogram(controller):
+    """某种AI控制器的决策耗时直方图
+    
+    Args:
+        controller: 控制器类名（标签值）
+    
+    Returns:
+        Histogram
+    """
+    return REGISTRY.register(Histogram("fighting_ai_decision_seconds", "AI每次决策的耗时", DECISION_TIME_BUCKETS,
+                                       {"controller": controller}))
+
+
+def timed(histogram):
+    """计时装饰器：指标接口启动后把每次调用的耗时记录到直方图
+    
+    Args:
+        histogram: Histogram
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def memory_rss():
+    """当前进程的常驻内存（字节）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        # 非Linux系统退回到峰值内存
+        try:
+            import resource
+        except ImportError:
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+REGISTRY.register(Gauge("fighting_memory_rss_bytes", "进程常驻内存", memory_rss))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """只提供/metrics的请求处理器"""
+    
+    registry = REGISTRY
+    
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """不打印访问日志"""
+        pass
+
+
+class MetricsServer:
+    """在后台线程中运行的指标HTTP接口"""
+    
+    def __init__(self, port, host="127.0.0.1", registry=REGISTRY):
+        """监听端口并启动后台线程
+        
+        Args:
+            port: TCP端口（0表示自动分配）
+            host: 监听地址
+            registry: 提供的指标集合
+        """
+        global ENABLED
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        ENABLED = True
+    
+    def close(self):
+        """停止接口"""
+        global ENABLED
+        ENABLED = False
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
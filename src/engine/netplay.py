@@ -0,0 +1,592 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+回滚网络对战
+
+双方每帧只通过UDP交换按钮位掩码。本地输入立即生效（可加几帧输入延迟），
+对方尚未到达的输入按其最后一次确认的输入预测；收到的真实输入与预测不一致时，
+恢复该帧的快照，用正确的输入重新模拟到当前帧。预测超过一定帧数时暂停等待对方输入。
+
+每个数据包都携带所有对方尚未确认的本地输入，丢包后由后续数据包补齐；
+双方定期交换已确认帧的状态校验值，用于发现不同步。
+
+用法:
+    # 本机回环测试（模拟延迟和丢包，两个会话由脚本输入驱动）
+    python -m src.engine.netplay --selftest --latency 80 --jitter 20 --loss 0.1
+    
+    # 两个窗口联机（各自用玩家1的按键操作）
+    python -m src.engine.netplay --player 1 --port 7000 --peer 127.0.0.1:7001
+    python -m src.engine.netplay --player 2 --port 7001 --peer 127.0.0.1:7000
+"""
+
+import time
+import zlib
+import heapq
+import random
+import socket
+import struct
+import argparse
+from collections import Counter
+import pygame
+from src.engine.config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, WHITE,
+    NETPLAY_PORT, NETPLAY_INPUT_DELAY, NETPLAY_MAX_ROLLBACK
+)
+from src.engine.snapshot import snapshot_fight, restore_fight, encode_snapshot
+from src.engine.player_input import PLAYER1_KEYS, read_buttons, apply_buttons
+
+# 数据包头：魔数, 输入起始帧, 确认帧（已收到对方此帧之前的全部输入）, 校验帧, 校验值, 输入数量
+_PACKET_MAGIC = b"FKNP"
+_PACKET_HEADER = struct.Struct("<4sIIIIB")
+
+# 每个数据包最多携带的输入帧数
+MAX_INPUTS_PER_PACKET = 64
+
+# 每隔多少帧交换一次状态校验值
+CHECKSUM_INTERVAL = 60
+
+# 没有校验值时使用的帧号
+_NO_CHECKSUM = 0xFFFFFFFF
+
+
+class UdpTransport:
+    """UDP传输，可以模拟延迟、抖动和丢包"""
+    
+    def __init__(self, local_addr, peer_addr=None, latency=0.0, jitter=0.0, loss=0.0,
+                 clock=time.monotonic, seed=None):
+        """初始化
+        
+        Args:
+            local_addr: 本地绑定地址 (host, port)，端口为0时自动分配
+            peer_addr: 对方地址 (host, port)
+            latency: 模拟的单向延迟（秒）
+            jitter: 模拟的延迟抖动（秒），每个数据包额外延迟0到jitter秒，可能乱序
+            loss: 模拟的丢包率（0-1）
+            clock: 时钟函数，返回秒
+            seed: 丢包和抖动的随机种子
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(local_addr)
+        self.sock.setblocking(False)
+        self.peer_addr = peer_addr
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.clock = clock
+        self.rng = random.Random(seed)
+        
+        # 等待发出的数据包 (发出时间, 序号, 数据)
+        self._outgoing = []
+        self._sequence = 0
+        
+        # 统计
+        self.packets_sent = 0
+        self.packets_dropped = 0
+        self.packets_received = 0
+    
+    @property
+    def address(self):
+        """本地绑定的地址"""
+        return self.sock.getsockname()
+    
+    def send(self, data):
+        """发送数据包（经过模拟的延迟和丢包）
+        
+        Args:
+            data: 数据包
+        """
+        self.packets_sent += 1
+        if self.loss > 0 and self.rng.random() < self.loss:
+            self.packets_dropped += 1
+            return
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter > 0 else 0)
+        heapq.heappush(self._outgoing, (self.clock() + delay, self._sequence, data))
+        self._sequence += 1
+        self._flush()
+    
+    def _flush(self):
+        """发出已到发送时间的数据包"""
+        now = self.clock()
+        while self._outgoing and self._outgoing[0][0] <= now:
+            _, _, data = heapq.heappop(self._outgoing)
+            try:
+                self.sock.sendto(data, self.peer_addr)
+            except OSError:
+                # 对方尚未启动等情况，按丢包处理
+                self.packets_dropped += 1
+    
+    def receive(self):
+        """接收所有已到达的数据包
+        
+        Returns:
+            数据包列表
+        """
+        self._flush()
+        packets = []
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionError):
+                break
+            packets.append(data)
+        self.packets_received += len(packets)
+        return packets
+    
+    def close(self):
+        """关闭套接字"""
+        self.sock.close()
+
+
+class RollbackSession:
+    """回滚同步会话（作为战斗界面的输入来源）"""
+    
+    def __init__(self, fight, local_player, transport, input_delay=NETPLAY_INPUT_DELAY,
+                 max_rollback=NETPLAY_MAX_ROLLBACK):
+        """初始化
+        
+        Args:
+            fight: 战斗界面（双方都由玩家控制）
+            local_player: 本地玩家编号（0: 玩家1, 1: 玩家2）
+            transport: 传输对象，提供send(data)和receive()
+            input_delay: 本地输入延迟（帧）
+            max_rollback: 最多预测的帧数
+        """
+        self.fight = fight
+        self.local_player = local_player
+        self.transport = transport
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+        
+        # 已模拟的帧数（下一帧的帧号）
+        self.frame = 0
+        
+        # 双方每帧的输入，输入延迟内的帧双方都视为无输入
+        self.local_inputs = {frame: 0 for frame in range(input_delay)}
+        self.remote_inputs = dict(self.local_inputs)
+        # 已确认对方在此帧之前的全部输入
+        self.remote_confirmed = input_delay
+        # 对方已确认收到本地在此帧之前的全部输入
+        self.peer_confirmed = input_delay
+        
+        # 模拟时使用的对方输入（可能是预测值）和每帧开始时的快照
+        self.used_remote = {}
+        self.snapshots = {}
+        self._pending_rollback = None
+        self._frame_inputs = (0, 0)
+        
+        # 状态校验值 {帧号: 校验值}
+        self.checksums = {}
+        self.peer_checksums = {}
+        self.desync_frames = []
+        
+        # 统计
+        self.ticks = 0
+        self.stalled_ticks = 0
+        self.last_rollback_frames = 0
+        self.rollback_histogram = Counter()
+        self.max_tick_time = 0.0
+        self.total_tick_time = 0.0
+        
+        fight.set_input_source(self)
+    
+    @property
+    def finished(self):
+        """回合已结束且不会再回滚"""
+        return self.fight.round_over and self.remote_confirmed >= self.frame
+    
+    def advance(self, local_buttons):
+        """推进一个逻辑帧（每个渲染帧调用一次）
+        
+        Args:
+            local_buttons: 本地玩家本帧的按钮位掩码
+        
+        Returns:
+            是否推进了一帧（预测超过上限或回合已结束时不推进）
+        """
+        start = time.perf_counter()
+        self.ticks += 1
+        
+        self._receive()
+        self.last_rollback_frames = self._rollback()
+        self.rollback_histogram[self.last_rollback_frames] += 1
+        
+        advanced = False
+        if self.fight.round_over:
+            pass
+        elif self.frame - self.remote_confirmed >= self.max_rollback:
+            # 预测太多帧，等待对方输入
+            self.stalled_ticks += 1
+        else:
+            self.local_inputs[self.frame + self.input_delay] = local_buttons
+            self._simulate_frame()
+            advanced = True
+        
+        self._update_checksums()
+        self._send()
+        
+        elapsed = time.perf_counter() - start
+        self.total_tick_time += elapsed
+        self.max_tick_time = max(self.max_tick_time, elapsed)
+        return advanced
+    
+    def poll(self):
+        """只收发数据不推进（回合结束后等待对方时调用）"""
+        self._receive()
+        self.last_rollback_frames = self._rollback()
+        self._update_checksums()
+        self._send()
+    
+    def apply_inputs(self, fight):
+        """对双方执行当前模拟帧的输入（由战斗界面每帧调用）
+        
+        Args:
+            fight: 战斗界面
+        """
+        apply_buttons(fight.player1, self._frame_inputs[0])
+        apply_buttons(fight.player2, self._frame_inputs[1])
+    
+    def _predict_remote(self):
+        """预测对方输入：重复最后一次确认的输入"""
+        return self.remote_inputs.get(self.remote_confirmed - 1, 0)
+    
+    def _simulate_frame(self):
+        """保存快照并用双方输入模拟一帧"""
+        frame = self.frame
+        self.snapshots[frame] = snapshot_fight(self.fight, include_random=False)
+        
+        local = self.local_inputs[frame]
+        remote = self.remote_inputs.get(frame)
+        if remote is None:
+            remote = self._predict_remote()
+        self.used_remote[frame] = remote
+        
+        if self.local_player == 0:
+            self._frame_inputs = (local, remote)
+        else:
+            self._frame_inputs = (remote, local)
+        self.fight.update()
+        self.frame += 1
+    
+    def _rollback(self):
+        """预测错误时恢复快照并重新模拟到当前帧
+        
+        Returns:
+            重新模拟的帧数
+        """
+        start_frame = self._pending_rollback
+        if start_frame is None:
+            return 0
+        self._pending_rollback = None
+        
+        target = self.frame
+        restore_fight(self.fight, self.snapshots[start_frame])
+        self.frame = start_frame
+        
+        # 重新模拟的帧不通知监听器、不分发战斗事件，避免重复记录和重复播放特效音效
+        listeners = self.fight.tick_listeners
+        self.fight.tick_listeners = []
+        self.fight.combat_events.muted = True
+        try:
+            # 回合在重新模拟中结束时停在结束的那一帧，与正常推进一致
+            while self.frame < target and not self.fight.round_over:
+                self._simulate_frame()
+        finally:
+            self.fight.tick_listeners = listeners
+            self.fight.combat_events.muted = False
+        return target - start_frame
+    
+    def _receive(self):
+        """处理收到的数据包"""
+        for data in self.transport.receive():
+            if len(data) < _PACKET_HEADER.size:
+                continue
+            magic, start, ack, checksum_frame, checksum, count = _PACKET_HEADER.unpack_from(data)
+            if magic != _PACKET_MAGIC or len(data) < _PACKET_HEADER.size + count * 2:
+                continue
+            
+            buttons = struct.unpack_from(f"<{count}H", data, _PACKET_HEADER.size)
+            for frame, value in enumerate(buttons, start):
+                if frame in self.remote_inputs or frame < self.remote_confirmed:
+                    continue
+                self.remote_inputs[frame] = value
+                # 已经按预测模拟过的帧，预测错误时需要回滚
+                if frame < self.frame and self.used_remote[frame] != value:
+                    if self._pending_rollback is None or frame < self._pending_rollback:
+                        self._pending_rollback = frame
+            
+            while self.remote_confirmed in self.remote_inputs:
+                self.remote_confirmed += 1
+            self.peer_confirmed = max(self.peer_confirmed, ack)
+            if checksum_frame != _NO_CHECKSUM:
+                self.peer_checksums[checksum_frame] = checksum
+                self._compare_checksum(checksum_frame)
+    
+    def _send(self):
+        """发送对方尚未确认的本地输入"""
+        start = self.peer_confirmed
+        end = min(self.frame + self.input_delay, start + MAX_INPUTS_PER_PACKET)
+        buttons = [self.local_inputs[frame] for frame in range(start, end)]
+        
+        if self.checksums:
+            checksum_frame = max(self.checksums)
+            checksum = self.checksums[checksum_frame]
+        else:
+            checksum_frame, checksum = _NO_CHECKSUM, 0
+        
+        header = _PACKET_HEADER.pack(_PACKET_MAGIC, start, self.remote_confirmed,
+                                     checksum_frame, checksum, len(buttons))
+        self.transport.send(header + struct.pack(f"<{len(buttons)}H", *buttons))
+    
+    def _update_checksums(self):
+        """计算已确认帧的校验值，并清理不会再回滚到的数据"""
+        # 此帧之前的输入双方都已确认，之前的帧不会再回滚
+        confirmed = min(self.remote_confirmed, self.frame)
+        for frame in list(self.snapshots):
+            if frame > confirmed:
+                continue
+            if frame % CHECKSUM_INTERVAL == 0 and frame not in self.checksums:
+                self.checksums[frame] = zlib.crc32(encode_snapshot(self.snapshots[frame]))
+                self._compare_checksum(frame)
+            if frame < confirmed:
+                del self.snapshots[frame]
+                del self.used_remote[frame]
+        
+        for frame in [f for f in self.local_inputs if f < min(confirmed, self.peer_confirmed)]:
+            del self.local_inputs[frame]
+        for frame in [f for f in self.remote_inputs if f < confirmed - 1]:
+            del self.remote_inputs[frame]
+    
+    def _compare_checksum(self, frame):
+        """比较双方同一帧的校验值"""
+        if frame in self.checksums and frame in self.peer_checksums:
+            if self.checksums[frame] != self.peer_checksums.pop(frame):
+                self.desync_frames.append(frame)
+    
+    def stats(self):
+        """统计信息
+        
+        Returns:
+            统计字典
+        """
+        rollback_ticks = sum(n for frames, n in self.rollback_histogram.items() if frames > 0)
+        rollback_frames = sum(frames * n for frames, n in self.rollback_histogram.items())
+        return {
+            "frames": self.frame,
+            "ticks": self.ticks,
+            "stalled_ticks": self.stalled_ticks,
+            "rollback_ticks": rollback_ticks,
+            "rollback_frames": rollback_frames,
+            "avg_rollback_frames": rollback_frames / self.ticks if self.ticks else 0.0,
+            "max_rollback_frames": max(self.rollback_histogram, default=0),
+            "rollback_histogram": dict(sorted(self.rollback_histogram.items())),
+            "avg_tick_ms": self.total_tick_time / self.ticks * 1000 if self.ticks else 0.0,
+            "max_tick_ms": self.max_tick_time * 1000,
+            "checksums_compared": len(self.checksums),
+            "desync_frames": list(self.desync_frames)
+        }
+
+
+def create_netplay_fight(p1_name="Ryu", p2_name="Ken", seed=0):
+    """创建双方都由玩家控制的战斗界面（需要先初始化pygame显示）
+    
+    Args:
+        p1_name: 玩家1角色名称
+        p2_name: 玩家2角色名称
+        seed: 随机种子（双方必须一致）
+    
+    Returns:
+        FightScreen实例
+    """
+    # 延迟导入，FightScreen依赖AI模块
+    from src.ui.fight_screen import FightScreen
+    from src.engine.headless import HeadlessGame, create_character
+    
+    player1 = create_character(p1_name, 100, 400)
+    player2 = create_character(p2_name, 600, 400)
+    return FightScreen(HeadlessGame(ai_vs_ai_mode=False), player1, player2, False, 1, seed)
+
+
+class ScriptedInput:
+    """回环测试使用的脚本输入：随机按住一组按钮若干帧"""
+    
+    def __init__(self, seed):
+        """初始化
+        
+        Args:
+            seed: 随机种子
+        """
+        self.rng = random.Random(seed)
+        self.buttons = 0
+        self.hold = 0
+    
+    def next(self):
+        """获取下一帧的按钮位掩码"""
+        if self.hold <= 0:
+            # 移动方向和一个动作键的组合
+            self.buttons = self.rng.choice((0, 1, 2)) | (self.rng.choice((0, 0, 4, 8, 16, 32, 64, 128, 256)))
+            self.hold = self.rng.randint(3, 20)
+        self.hold -= 1
+        return self.buttons
+
+
+class _VirtualClock:
+    """回环测试使用的虚拟时钟，每帧推进1/FPS秒"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def run_loopback_test(latency=0.05, jitter=0.0, loss=0.0, input_delay=NETPLAY_INPUT_DELAY,
+                      max_rollback=NETPLAY_MAX_ROLLBACK, max_frames=FPS * 30, seed=0):
+    """在本机回环UDP上运行两个会话，检查双方结果一致
+    
+    两个会话使用同一个虚拟时钟，不需要等待真实时间。
+    
+    Args:
+        latency: 模拟的单向延迟（秒）
+        jitter: 模拟的延迟抖动（秒）
+        loss: 模拟的丢包率
+        input_delay: 本地输入延迟（帧）
+        max_rollback: 最多预测的帧数
+        max_frames: 最多模拟的帧数
+        seed: 随机种子
+    
+    Returns:
+        (双方最终状态是否一致, [玩家1会话统计, 玩家2会话统计])
+    """
+    from src.engine.headless import init_headless
+    
+    init_headless()
+    clock = _VirtualClock()
+    transports = [UdpTransport(("127.0.0.1", 0), latency=latency, jitter=jitter, loss=loss,
+                               clock=clock, seed=seed + i) for i in range(2)]
+    transports[0].peer_addr = transports[1].address
+    transports[1].peer_addr = transports[0].address
+    
+    sessions = [RollbackSession(create_netplay_fight(seed=seed), i, transports[i],
+                                input_delay, max_rollback) for i in range(2)]
+    inputs = [ScriptedInput(seed * 2 + i) for i in range(2)]
+    
+    # 最多等待的总帧数（包括暂停等待的帧）
+    for _ in range(max_frames * 4):
+        clock.now += 1.0 / FPS
+        for session, scripted in zip(sessions, inputs):
+            if session.frame < max_frames:
+                session.advance(scripted.next())
+            else:
+                session.poll()
+        if all((s.finished or s.frame >= max_frames) and s.remote_confirmed >= s.frame
+               for s in sessions):
+            break
+    
+    for transport in transports:
+        transport.close()
+    
+    frames = [s.frame for s in sessions]
+    same = (frames[0] == frames[1] and
+            snapshot_fight(sessions[0].fight, False).same_simulation_state(
+                snapshot_fight(sessions[1].fight, False)))
+    return same, [s.stats() for s in sessions]
+
+
+def play_netplay(local_player, port, peer_addr, p1_name="Ryu", p2_name="Ken", seed=0,
+                 latency=0.0, jitter=0.0, loss=0.0):
+    """打开窗口进行网络对战（本地玩家使用玩家1的按键）
+    
+    Args:
+        local_player: 本地玩家编号（0或1）
+        port: 本地UDP端口
+        peer_addr: 对方地址 (host, port)
+        p1_name: 玩家1角色名称
+        p2_name: 玩家2角色名称
+        seed: 随机种子（双方必须一致）
+        latency: 模拟的单向延迟（秒）
+        jitter: 模拟的延迟抖动（秒）
+        loss: 模拟的丢包率
+    
+    Returns:
+        会话统计
+    """
+    # 延迟导入，字体模块需要先初始化pygame
+    from src.engine.font_utils import render_text
+    from src.engine.i18n import get_text
+    
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(f"网络对战 - 玩家{local_player + 1}")
+    
+    transport = UdpTransport(("0.0.0.0", port), peer_addr, latency, jitter, loss)
+    fight = create_netplay_fight(p1_name, p2_name, seed)
+    session = RollbackSession(fight, local_player, transport)
+    clock = pygame.time.Clock()
+    
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            else:
+                fight.handle_event(event)
+        
+        if session.finished:
+            # 继续收发，直到对方也收到全部输入
+            session.poll()
+        else:
+            session.advance(read_buttons(fight.key_state, PLAYER1_KEYS))
+        
+        fight.render(screen)
+        status = get_text("netplay.status", frame=session.frame, rollback=session.last_rollback_frames,
+                          predicted=session.frame - session.remote_confirmed)
+        if session.desync_frames:
+            status += "  " + get_text("netplay.desync", frame=session.desync_frames[0])
+        screen.blit(render_text(status, 18, WHITE), (10, SCREEN_HEIGHT - 26))
+        pygame.display.flip()
+        clock.tick(FPS)
+    
+    transport.close()
+    fight.close()
+    return session.stats()
+
+
+def _print_stats(label, stats):
+    """打印会话统计"""
+    print(f"{label}: 帧数 {stats['frames']}, 暂停等待 {stats['stalled_ticks']}次, "
+          f"回滚 {stats['rollback_ticks']}次共{stats['rollback_frames']}帧 "
+          f"(平均每次更新{stats['avg_rollback_frames']:.2f}帧, 最多{stats['max_rollback_frames']}帧)")
+    print(f"    每次更新耗时: 平均 {stats['avg_tick_ms']:.2f}ms, 最长 {stats['max_tick_ms']:.2f}ms "
+          f"(帧预算 {1000 / FPS:.1f}ms)")
+    print(f"    每次更新的回滚帧数分布: {stats['rollback_histogram']}")
+    print(f"    校验帧数: {stats['checksums_compared']}, 不同步: {stats['desync_frames'] or '无'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="回滚网络对战")
+    parser.add_argument("--selftest", action="store_true", help="本机回环测试，不打开窗口")
+    parser.add_argument("--player", type=int, choices=(1, 2), default=1, help="本地玩家编号")
+    parser.add_argument("--port", type=int, default=NETPLAY_PORT, help="本地UDP端口")
+    parser.add_argument("--peer", default=f"127.0.0.1:{NETPLAY_PORT + 1}", help="对方地址 host:port")
+    parser.add_argument("--p1", default="Ryu", help="玩家1角色")
+    parser.add_argument("--p2", default="Ken", help="玩家2角色")
+    parser.add_argument("--latency", type=float, default=0, help="模拟的单向延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="模拟的延迟抖动（毫秒）")
+    parser.add_argument("--loss", type=float, default=0, help="模拟的丢包率（0-1）")
+    parser.add_argument("--seconds", type=float, default=30, help="回环测试模拟的秒数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+    
+    if args.selftest:
+        same, all_stats = run_loopback_test(args.latency / 1000, args.jitter / 1000, args.loss,
+                                            max_frames=int(args.seconds * FPS), seed=args.seed)
+        for index, session_stats in enumerate(all_stats):
+            _print_stats(f"玩家{index + 1}", session_stats)
+        print(f"双方最终状态一致: {same}")
+    else:
+        host, peer_port = args.peer.rsplit(":", 1)
+        final_stats = play_netplay(args.player - 1, args.port, (host, int(peer_port)),
+                                   args.p1, args.p2, args.seed,
+                                   args.latency / 1000, args.jitter / 1000, args.loss)
+        _print_stats(f"玩家{args.player}", final_stats)
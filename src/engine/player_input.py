@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+玩家输入
+
+把一帧的按键状态压缩为按钮位掩码，再由位掩码驱动角色。
+本地双人对战和网络对战使用同一套规则，网络对战只需要传输每帧的位掩码。
+"""
+
+import pygame
+
+# 按钮位
+BUTTON_LEFT = 1 << 0
+BUTTON_RIGHT = 1 << 1
+BUTTON_UP = 1 << 2
+BUTTON_DOWN = 1 << 3
+BUTTON_BLOCK = 1 << 4
+BUTTON_LIGHT_PUNCH = 1 << 5
+BUTTON_HEAVY_PUNCH = 1 << 6
+BUTTON_LIGHT_KICK = 1 << 7
+BUTTON_HEAVY_KICK = 1 << 8
+
+# 玩家1按键
+PLAYER1_KEYS = (
+    (pygame.K_a, BUTTON_LEFT),
+    (pygame.K_d, BUTTON_RIGHT),
+    (pygame.K_w, BUTTON_UP),
+    (pygame.K_s, BUTTON_DOWN),
+    (pygame.K_SPACE, BUTTON_BLOCK),
+    (pygame.K_j, BUTTON_LIGHT_PUNCH),
+    (pygame.K_k, BUTTON_HEAVY_PUNCH),
+    (pygame.K_l, BUTTON_LIGHT_KICK),
+    (pygame.K_SEMICOLON, BUTTON_HEAVY_KICK)
+)
+
+# 玩家2按键
+PLAYER2_KEYS = (
+    (pygame.K_LEFT, BUTTON_LEFT),
+    (pygame.K_RIGHT, BUTTON_RIGHT),
+    (pygame.K_UP, BUTTON_UP),
+    (pygame.K_DOWN, BUTTON_DOWN),
+    (pygame.K_KP0, BUTTON_BLOCK),
+    (pygame.K_KP1, BUTTON_LIGHT_PUNCH),
+    (pygame.K_KP2, BUTTON_HEAVY_PUNCH),
+    (pygame.K_KP3, BUTTON_LIGHT_KICK),
+    (pygame.K_KP4, BUTTON_HEAVY_KICK)
+)
+
+
+def read_buttons(key_state, key_map):
+    """把按键状态转换为按钮位掩码
+    
+    Args:
+        key_state: 按键状态字典 {按键: 是否按下}
+        key_map: 按键到按钮位的映射（PLAYER1_KEYS或PLAYER2_KEYS）
+    
+    Returns:
+        按钮位掩码
+    """
+    buttons = 0
+    for key, button in key_map:
+        if key_state.get(key):
+            buttons |= button
+    return buttons
+
+
+def apply_buttons(player, buttons):
+    """按按钮位掩码控制角色
+    
+    Args:
+        player: 玩家角色
+        buttons: 按钮位掩码
+    """
+    if buttons & BUTTON_LEFT:
+        player.move_left()
+    elif buttons & BUTTON_RIGHT:
+        player.move_right()
+    else:
+        player.stop_moving()
+    
+    if buttons & BUTTON_UP:
+        player.jump()
+    
+    if buttons & BUTTON_DOWN:
+        player.crouch()
+    elif player.is_crouching:
+        player.stand_up()
+    
+    if buttons & BUTTON_BLOCK:
+        player.block()
+    elif player.is_blocking:
+        player.stop_blocking()
+    
+    if buttons & BUTTON_LIGHT_PUNCH:
+        player.light_punch()
+    elif buttons & BUTTON_HEAVY_PUNCH:
+        player.heavy_punch()
+    elif buttons & BUTTON_LIGHT_KICK:
+        player.light_kick()
+    elif buttons & BUTTON_HEAVY_KICK:
+        player.heavy_kick()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+画质调节
+
+根据最近一段时间的帧耗时自动调整特效画质：帧耗时接近帧预算时降低一档（减少同时存在的特效和粒子、
+去掉文字阴影、不再做半透明混合），持续有富余时再提高一档。性能好的机器保持完整特效，
+性能差的机器自动降到能保持60 FPS的档位。
+
+降档只需要一个统计窗口超出阈值，升档需要连续几个窗口都有较多富余，并且升降阈值之间留有间隔，
+避免在两档之间反复切换。特效只影响画面，不影响战斗模拟的结果。
+"""
+
+from src.engine.config import FPS
+
+# 统计窗口的帧数，每个窗口结束时评估一次
+QUALITY_WINDOW = 60
+
+# 窗口内帧耗时的90分位超过帧预算的这个比例时降一档
+DOWNGRADE_LOAD = 0.9
+
+# 连续UPGRADE_WINDOWS个窗口的帧耗时90分位都低于帧预算的这个比例时升一档
+UPGRADE_LOAD = 0.5
+UPGRADE_WINDOWS = 3
+
+# 刚升档就又降档时，下次升档需要的窗口数加倍，最多这么多个窗口
+MAX_UPGRADE_WINDOWS = 48
+
+
+class QualityLevel:
+    """一档画质设置"""
+    
+    __slots__ = ("name", "max_effects", "particle_scale", "text_shadows", "alpha_blending", "cleanup_interval")
+    
+    def __init__(self, name, max_effects, particle_scale, text_shadows, alpha_blending, cleanup_interval):
+        """初始化
+        
+        Args:
+            name: 名称
+            max_effects: 同时存在的特效数量上限
+            particle_scale: 粒子和冲击线数量的比例（0-1）
+            text_shadows: 是否绘制文字特效的阴影
+            alpha_blending: 是否半透明混合（特效层和战斗平台），否则直接不透明地绘制到屏幕
+            cleanup_interval: 强制清理特效的间隔（秒），None表示不强制清理
+        """
+        self.name = name
+        self.max_effects = max_effects
+        self.particle_scale = particle_scale
+        self.text_shadows = text_shadows
+        self.alpha_blending = alpha_blending
+        self.cleanup_interval = cleanup_interval
+
+
+# 从低到高排列，最低一档与原来固定的特效上限相同
+QUALITY_LEVELS = (
+    QualityLevel("最低", 5, 0.0, False, False, 0.25),
+    QualityLevel("低", 10, 0.5, False, False, 0.5),
+    QualityLevel("中", 20, 0.75, True, True, None),
+    QualityLevel("高", 40, 1.0, True, True, None),
+)
+
+
+class QualityGovernor:
+    """根据帧耗时自动选择画质档位"""
+    
+    def __init__(self, level=None, budget=1.0 / FPS, window=QUALITY_WINDOW):
+        """初始化
+        
+        Args:
+            level: 固定的画质档位（QUALITY_LEVELS的下标），None表示自动调节（从最高档开始）
+            budget: 每帧的时间预算（秒）
+            window: 统计窗口的帧数
+        """
+        self.auto = level is None
+        self.level = len(QUALITY_LEVELS) - 1 if level is None else level
+        self.budget = budget
+        self.window = window
+        self.samples = []
+        self.quiet_windows = 0  # 连续有富余的窗口数
+        self.upgrade_windows = UPGRADE_WINDOWS  # 升档需要的连续富余窗口数
+        self.just_upgraded = False  # 上一个窗口是否刚升档
+        self.changes = 0  # 调整档位的次数
+    
+    @property
+    def settings(self):
+        """当前档位的画质设置"""
+        return QUALITY_LEVELS[self.level]
+    
+    def record(self, frame_time):
+        """记录一帧的耗时，统计窗口结束时按需调整档位
+        
+        Args:
+            frame_time: 这一帧处理输入、更新和绘制的耗时（秒），不包括等待下一帧的时间
+        
+        Returns:
+            档位是否改变
+        """
+        if not self.auto:
+            return False
+        
+        samples = self.samples
+        samples.append(frame_time)
+        if len(samples) < self.window:
+            return False
+        
+        samples.sort()
+        load = samples[int(len(samples) * 0.9)] / self.budget
+        self.samples = []
+        just_upgraded, self.just_upgraded = self.just_upgraded, False
+        
+        if load > DOWNGRADE_LOAD:
+            self.quiet_windows = 0
+            if self.level > 0:
+                # 升档后马上撑不住，说明这台机器在两档之间，推迟下次尝试
+                if just_upgraded:
+                    self.upgrade_windows = min(MAX_UPGRADE_WINDOWS, self.upgrade_windows * 2)
+                self.level -= 1
+                self.changes += 1
+                return True
+        elif load < UPGRADE_LOAD:
+            self.quiet_windows += 1
+            if self.quiet_windows >= self.upgrade_windows and self.level < len(QUALITY_LEVELS) - 1:
+                self.level += 1
+                self.quiet_windows = 0
+                self.just_upgraded = True
+                self.changes += 1
+                return True
+        else:
+            self.quiet_windows = 0
+        return False
@@ -0,0 +1,579 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+战斗回放
+
+录制时每帧只记录双方角色收到的指令（玩家按键和AI决策最终都转换为角色指令）以及战斗的随机种子，
+文件经过压缩，一场完整的战斗只有几KB。播放时用记录的指令代替按键和AI控制器重新模拟，
+得到与原始战斗完全一致的过程，可以按1倍、16倍或不限速播放，也可以不渲染直接计算结果。
+
+录制时每隔固定帧数保存一个完整状态的关键帧，文件头后的索引记录每个关键帧的位置。
+跳转到任意帧时恢复最近的关键帧，再最多模拟一个关键帧间隔的帧数。
+
+用法:
+    python -m src.engine.replay replays/replay_20240101_120000_1234.fkr
+    python -m src.engine.replay replays --speed 16
+    python -m src.engine.replay replays --no-render
+    python -m src.engine.replay replays --start 90
+"""
+
+import os
+import glob
+import time
+import zlib
+import struct
+import bisect
+import itertools
+import argparse
+import pygame
+from src.engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, REPLAY_KEYFRAME_INTERVAL
+from src.engine.snapshot import snapshot_fight, restore_fight, encode_snapshot, decode_snapshot
+from src.characters.character import CharacterCommand
+
+# 文件头：魔数, 版本, 随机种子, 帧数, 标志位, 胜者, 玩家1血量, 玩家2血量, 关键帧间隔, 关键帧数
+REPLAY_MAGIC = b"FKRP"
+REPLAY_VERSION = 4
+_PREFIX = struct.Struct("<4sH")
+_HEADER = struct.Struct("<4sHQIBBhhHI")
+# 版本1没有关键帧
+_HEADER_V1 = struct.Struct("<4sHQIBBhh")
+# 版本2、3的布局与当前相同，但关键帧中的角色快照字段不同
+# （版本3把攻击计时改为招式帧数，版本4增加了格挡标记）
+
+# 关键帧索引项：帧号, 在关键帧数据区中的偏移, 长度
+_KEYFRAME_ENTRY = struct.Struct("<III")
+# 指令数据长度
+_BODY_LENGTH = struct.Struct("<I")
+
+# 标志位
+FLAG_AI_VS_AI = 1     # AI对战AI模式
+FLAG_VS_AI = 2        # 玩家2由AI控制
+FLAG_FINISHED = 4     # 回合正常结束（记录了结果）
+
+# 胜者编号：0玩家1, 1玩家2, 2平局, 255未结束
+WINNER_DRAW = 2
+WINNER_UNKNOWN = 255
+
+# 不限速播放时每渲染一帧模拟的帧数
+UNCAPPED_FRAMES_PER_RENDER = 64
+
+# 同一进程内的回放文件编号（同一秒内结束多场战斗时文件名不重复）
+_replay_counter = itertools.count()
+
+# 指令编号到指令的查找表
+_COMMANDS = {command.value: command for command in CharacterCommand}
+
+
+class Replay:
+    """回放数据"""
+    
+    def __init__(self, characters, player_names, seed, ai_vs_ai_mode, vsai_mode,
+                 keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        """初始化
+        
+        Args:
+            characters: (玩家1角色名称, 玩家2角色名称)，如("Ryu", "Ken")
+            player_names: 战斗中双方的显示名称（影响AI相关的判定规则）
+            seed: 战斗的随机种子
+            ai_vs_ai_mode: 是否为AI对战AI模式
+            vsai_mode: 玩家2是否由AI控制
+            keyframe_interval: 关键帧间隔（帧），0表示不保存关键帧
+        """
+        self.characters = tuple(characters)
+        self.player_names = tuple(player_names)
+        self.seed = seed
+        self.ai_vs_ai_mode = ai_vs_ai_mode
+        self.vsai_mode = vsai_mode
+        
+        # 每帧的指令 [(玩家1指令编号元组, 玩家2指令编号元组)]
+        self.frames = []
+        
+        # 关键帧：帧号列表（递增）和对应的压缩状态数据
+        self.keyframe_interval = keyframe_interval
+        self.keyframe_frames = []
+        self.keyframe_data = []
+        
+        # 结果（回合结束时记录，用于校验回放）
+        self.finished = False
+        self.winner = None
+        self.health = (0, 0)
+    
+    def add_frame(self, p1_commands, p2_commands):
+        """追加一帧的指令
+        
+        Args:
+            p1_commands: 玩家1本帧的CharacterCommand列表
+            p2_commands: 玩家2本帧的CharacterCommand列表
+        """
+        self.frames.append((tuple(c.value for c in p1_commands),
+                            tuple(c.value for c in p2_commands)))
+    
+    def add_keyframe(self, frame, snapshot):
+        """追加一个关键帧
+        
+        Args:
+            frame: 帧号（已执行的帧数）
+            snapshot: 该帧的战斗快照
+        """
+        self.keyframe_frames.append(frame)
+        self.keyframe_data.append(zlib.compress(encode_snapshot(snapshot)))
+    
+    def keyframe_before(self, frame):
+        """查找不晚于指定帧的最近关键帧
+        
+        Args:
+            frame: 帧号
+        
+        Returns:
+            (关键帧帧号, FightSnapshot)，没有时返回None
+        """
+        index = bisect.bisect_right(self.keyframe_frames, frame) - 1
+        if index < 0:
+            return None
+        return self.keyframe_frames[index], decode_snapshot(zlib.decompress(self.keyframe_data[index]))
+    
+    def commands_at(self, frame):
+        """获取某一帧双方的指令
+        
+        Args:
+            frame: 帧号
+        
+        Returns:
+            (玩家1指令列表, 玩家2指令列表)
+        """
+        p1_codes, p2_codes = self.frames[frame]
+        return [_COMMANDS[c] for c in p1_codes], [_COMMANDS[c] for c in p2_codes]
+    
+    def save(self, path):
+        """保存为二进制回放文件
+        
+        Args:
+            path: 文件路径
+        """
+        body = bytearray()
+        for p1_codes, p2_codes in self.frames:
+            body.append(len(p1_codes))
+            body.extend(p1_codes)
+            body.append(len(p2_codes))
+            body.extend(p2_codes)
+        
+        flags = ((FLAG_AI_VS_AI if self.ai_vs_ai_mode else 0) |
+                 (FLAG_VS_AI if self.vsai_mode else 0) |
+                 (FLAG_FINISHED if self.finished else 0))
+        if not self.finished:
+            winner = WINNER_UNKNOWN
+        else:
+            winner = WINNER_DRAW if self.winner is None else self.winner
+        
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, len(self.frames),
+                                 flags, winner, self.health[0], self.health[1],
+                                 self.keyframe_interval, len(self.keyframe_frames)))
+            for text in self.characters + self.player_names:
+                encoded = text.encode("utf-8")
+                f.write(bytes([len(encoded)]))
+                f.write(encoded)
+            
+            # 关键帧索引（偏移相对于关键帧数据区的起点）
+            offset = 0
+            for frame, data in zip(self.keyframe_frames, self.keyframe_data):
+                f.write(_KEYFRAME_ENTRY.pack(frame, offset, len(data)))
+                offset += len(data)
+            
+            compressed = zlib.compress(bytes(body), 9)
+            f.write(_BODY_LENGTH.pack(len(compressed)))
+            f.write(compressed)
+            for data in self.keyframe_data:
+                f.write(data)
+    
+    @classmethod
+    def load(cls, path):
+        """读取回放文件
+        
+        Args:
+            path: 文件路径
+        
+        Returns:
+            Replay实例
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        
+        if len(data) < _PREFIX.size:
+            raise ValueError(f"不是有效的回放文件: {path}")
+        magic, version = _PREFIX.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError(f"不是有效的回放文件: {path}")
+        
+        if version in (2, 3, REPLAY_VERSION):
+            (_, _, seed, frame_count, flags, winner, p1_health, p2_health,
+             keyframe_interval, keyframe_count) = _HEADER.unpack_from(data)
+            offset = _HEADER.size
+        elif version == 1:
+            _, _, seed, frame_count, flags, winner, p1_health, p2_health = \
+                _HEADER_V1.unpack_from(data)
+            keyframe_interval, keyframe_count = 0, 0
+            offset = _HEADER_V1.size
+        else:
+            raise ValueError(f"不支持的回放版本 {version}: {path}")
+        
+        texts = []
+        for _ in range(4):
+            length = data[offset]
+            texts.append(data[offset + 1:offset + 1 + length].decode("utf-8"))
+            offset += 1 + length
+        
+        replay = cls(texts[:2], texts[2:], seed,
+                     bool(flags & FLAG_AI_VS_AI), bool(flags & FLAG_VS_AI), keyframe_interval)
+        replay.finished = bool(flags & FLAG_FINISHED)
+        replay.winner = None if winner in (WINNER_DRAW, WINNER_UNKNOWN) else winner
+        replay.health = (p1_health, p2_health)
+        
+        if version == 1:
+            body = zlib.decompress(data[offset:])
+        else:
+            entries = [_KEYFRAME_ENTRY.unpack_from(data, offset + i * _KEYFRAME_ENTRY.size)
+                       for i in range(keyframe_count)]
+            offset += keyframe_count * _KEYFRAME_ENTRY.size
+            (body_length,) = _BODY_LENGTH.unpack_from(data, offset)
+            offset += _BODY_LENGTH.size
+            body = zlib.decompress(data[offset:offset + body_length])
+            
+            # 关键帧保持压缩状态，跳转时才解压
+            keyframe_start = offset + body_length
+            if version != REPLAY_VERSION:
+                entries = []  # 旧版本的关键帧无法恢复，跳转时从头模拟
+            for frame, keyframe_offset, length in entries:
+                start = keyframe_start + keyframe_offset
+                replay.keyframe_frames.append(frame)
+                replay.keyframe_data.append(data[start:start + length])
+        
+        pos = 0
+        for _ in range(frame_count):
+            count = body[pos]
+            p1_codes = tuple(body[pos + 1:pos + 1 + count])
+            pos += 1 + count
+            count = body[pos]
+            p2_codes = tuple(body[pos + 1:pos + 1 + count])
+            pos += 1 + count
+            replay.frames.append((p1_codes, p2_codes))
+        return replay
+
+
+class ReplayRecorder:
+    """回放录制器（战斗界面的每帧监听器）"""
+    
+    def __init__(self, output_dir, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        """初始化
+        
+        Args:
+            output_dir: 回放文件目录
+            keyframe_interval: 关键帧间隔（帧），0表示不保存关键帧
+        """
+        self.output_dir = output_dir
+        self.keyframe_interval = keyframe_interval
+        self.replay = None
+        self.saved_path = None
+    
+    def _start(self, fight):
+        """记录战斗的基本信息"""
+        # 延迟导入，避免引擎模块与角色模块循环依赖
+        from src.engine.headless import character_key
+        
+        self.replay = Replay(
+            (character_key(fight.player1), character_key(fight.player2)),
+            (fight.player1.name, fight.player2.name),
+            fight.seed, fight.ai_vs_ai_mode, fight.vsai_mode, self.keyframe_interval
+        )
+    
+    def on_tick(self, fight):
+        """每帧回调：记录双方本帧的指令
+        
+        Args:
+            fight: 战斗界面
+        """
+        if self.replay is None:
+            self._start(fight)
+        self.replay.add_frame(fight.player1.command_log, fight.player2.command_log)
+        
+        frame = len(self.replay.frames)
+        if self.keyframe_interval and frame % self.keyframe_interval == 0:
+            # 回放不运行AI控制器，关键帧不需要控制器和随机数状态
+            self.replay.add_keyframe(frame, snapshot_fight(fight, include_random=False))
+    
+    def on_round_end(self, fight):
+        """回合结束回调：记录结果并保存
+        
+        Args:
+            fight: 战斗界面
+        """
+        if self.replay is None:
+            self._start(fight)
+        self.replay.finished = True
+        if fight.winner is fight.player1:
+            self.replay.winner = 0
+        elif fight.winner is fight.player2:
+            self.replay.winner = 1
+        self.replay.health = (fight.player1.health, fight.player2.health)
+        self._save()
+    
+    def close(self):
+        """保存未结束的回放（中途退出的战斗）"""
+        if self.replay is not None and self.replay.frames and self.saved_path is None:
+            self._save()
+    
+    def _save(self):
+        """写出回放文件"""
+        filename = f"replay_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{next(_replay_counter):04d}.fkr"
+        self.saved_path = os.path.join(self.output_dir, filename)
+        self.replay.save(self.saved_path)
+
+
+class ReplayInput:
+    """回放输入来源：每帧按记录调用双方的指令"""
+    
+    def __init__(self, replay, initial_snapshot=None):
+        """初始化
+        
+        Args:
+            replay: Replay实例
+            initial_snapshot: 第0帧的战斗快照，向开头跳转时使用
+        """
+        self.replay = replay
+        self.initial_snapshot = initial_snapshot
+        self.frame = 0
+    
+    @property
+    def finished(self):
+        """是否已播放完所有帧"""
+        return self.frame >= len(self.replay.frames)
+    
+    def apply_inputs(self, fight):
+        """对双方执行当前帧的指令（由战斗界面每帧调用）
+        
+        Args:
+            fight: 战斗界面
+        """
+        if self.finished:
+            return
+        p1_commands, p2_commands = self.replay.commands_at(self.frame)
+        for command in p1_commands:
+            fight.player1.execute_command(command)
+        for command in p2_commands:
+            fight.player2.execute_command(command)
+        self.frame += 1
+    
+    def seek(self, fight, frame):
+        """跳转到指定帧（该帧的指令尚未执行）
+        
+        从当前位置和最近的关键帧中选离目标较近的一个开始模拟，
+        因此最多模拟一个关键帧间隔的帧数。
+        
+        Args:
+            fight: 使用该输入来源的战斗界面
+            frame: 目标帧号，超出范围时截断
+        
+        Returns:
+            实际模拟的帧数
+        """
+        frame = max(0, min(frame, len(self.replay.frames)))
+        
+        start = self.replay.keyframe_before(frame)
+        if start is None and self.initial_snapshot is not None:
+            start = (0, self.initial_snapshot)
+        
+        # 目标在当前位置之后且当前位置更近时直接向前模拟
+        if self.frame <= frame and (start is None or start[0] <= self.frame):
+            start = None
+        elif start is None:
+            raise ValueError(f"没有可用的关键帧，无法跳转到第{frame}帧")
+        
+        if start is not None:
+            start_frame, snapshot = start
+            restore_fight(fight, snapshot)
+            fight.clear_effects()
+            self.frame = start_frame
+        
+        # 快进的帧不分发战斗事件，避免一次播放一连串音效
+        simulated = 0
+        fight.combat_events.muted = True
+        try:
+            while self.frame < frame and not fight.round_over:
+                fight.update()
+                simulated += 1
+        finally:
+            fight.combat_events.muted = False
+        return simulated
+
+
+def create_replay_fight(replay):
+    """创建用于播放回放的战斗界面（需要先初始化pygame显示）
+    
+    Args:
+        replay: Replay实例
+    
+    Returns:
+        (战斗界面, 回放输入来源)
+    """
+    # 延迟导入，FightScreen依赖AI模块
+    from src.ui.fight_screen import FightScreen
+    from src.engine.headless import HeadlessGame, create_character
+    
+    player1 = create_character(replay.characters[0], 100, 400)
+    player2 = create_character(replay.characters[1], 600, 400)
+    fight = FightScreen(HeadlessGame(replay.ai_vs_ai_mode), player1, player2,
+                        replay.vsai_mode, 1, replay.seed)
+    
+    # 显示名称影响AI相关的判定规则，使用录制时的名称
+    player1.name, player2.name = replay.player_names
+    
+    replay_input = ReplayInput(replay, snapshot_fight(fight, include_random=False))
+    fight.set_input_source(replay_input)
+    return fight, replay_input
+
+
+def _replay_result(fight, replay, elapsed):
+    """汇总回放结果并与录制结果比较"""
+    health = (fight.player1.health, fight.player2.health)
+    if fight.winner is fight.player1:
+        winner = 0
+    elif fight.winner is fight.player2:
+        winner = 1
+    else:
+        winner = None
+    return {
+        "frames": len(replay.frames),
+        "elapsed": elapsed,
+        "winner": winner,
+        "health": health,
+        "matches_recording": health == replay.health and (not replay.finished or winner == replay.winner)
+    }
+
+
+def _finish_round(fight, replay, replay_input):
+    """播放完所有帧后，录制时回合正常结束的，再推进一帧得到结果"""
+    if replay_input.finished and replay.finished and not fight.round_over:
+        fight.update()
+
+
+def play_replay(path, speed=1, render=True, start_frame=0):
+    """播放回放
+    
+    渲染时可以用底部进度条或方向键（前后5秒）跳转，空格键暂停。
+    
+    Args:
+        path: 回放文件路径
+        speed: 播放倍速（1表示实时，16表示16倍速，0表示不限速）；不渲染时总是不限速
+        render: 是否打开窗口渲染
+        start_frame: 开始播放的帧号
+    
+    Returns:
+        结果字典，包含是否与录制结果一致；未播放到结尾就关闭窗口时返回None
+    """
+    from src.engine.headless import init_headless
+    
+    replay = Replay.load(path)
+    
+    if render:
+        pygame.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption(f"回放: {os.path.basename(path)}")
+    else:
+        init_headless()
+        screen = None
+    
+    fight, replay_input = create_replay_fight(replay)
+    start = time.time()
+    replay_input.seek(fight, start_frame)
+    
+    if screen is None:
+        while not replay_input.finished:
+            fight.update()
+        _finish_round(fight, replay, replay_input)
+        fight.close()
+        return _replay_result(fight, replay, time.time() - start)
+    
+    # 延迟导入，界面模块依赖字体初始化
+    from src.ui.scrub_bar import ScrubBar
+    
+    scrub_bar = ScrubBar(40, SCREEN_HEIGHT - 30, SCREEN_WIDTH - 80, 12,
+                         len(replay.frames), replay.keyframe_frames)
+    clock = pygame.time.Clock()
+    frames_per_render = speed if speed > 0 else UNCAPPED_FRAMES_PER_RENDER
+    skip_frames = 5 * FPS
+    paused = False
+    result = None
+    running = True
+    
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_LEFT:
+                    replay_input.seek(fight, replay_input.frame - skip_frames)
+                elif event.key == pygame.K_RIGHT:
+                    replay_input.seek(fight, replay_input.frame + skip_frames)
+            
+            target = scrub_bar.handle_event(event)
+            if target is not None:
+                replay_input.seek(fight, target)
+        
+        if not paused and not scrub_bar.dragging:
+            for _ in range(frames_per_render):
+                if replay_input.finished:
+                    break
+                fight.update()
+        _finish_round(fight, replay, replay_input)
+        
+        # 第一次播放到结尾时记录结果
+        if result is None and replay_input.finished:
+            result = _replay_result(fight, replay, time.time() - start)
+        
+        fight.render(screen)
+        scrub_bar.draw(screen, replay_input.frame, paused)
+        pygame.display.flip()
+        
+        playing = not paused and not replay_input.finished
+        clock.tick(FPS if speed > 0 or not playing else 0)
+    
+    fight.close()
+    return result
+
+
+def latest_replay(directory):
+    """获取目录中最新的回放文件
+    
+    Args:
+        directory: 回放目录
+    
+    Returns:
+        文件路径
+    """
+    paths = glob.glob(os.path.join(directory, "*.fkr"))
+    if not paths:
+        raise FileNotFoundError(f"目录中没有回放文件: {directory}")
+    return max(paths, key=os.path.getmtime)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="播放战斗回放")
+    parser.add_argument("path", help="回放文件，或回放目录（播放最新的回放）")
+    parser.add_argument("--speed", type=int, default=1, help="播放倍速：1、16等，0表示不限速")
+    parser.add_argument("--no-render", action="store_true", help="不打开窗口，直接计算结果")
+    parser.add_argument("--start", type=float, default=0, help="从第几秒开始播放")
+    args = parser.parse_args()
+    
+    replay_path = latest_replay(args.path) if os.path.isdir(args.path) else args.path
+    result = play_replay(replay_path, args.speed, not args.no_render, int(args.start * FPS))
+    if result is not None:
+        speedup = result["frames"] / FPS / result["elapsed"] if result["elapsed"] > 0 else float("inf")
+        print(f"回放: {replay_path}")
+        print(f"帧数: {result['frames']}, 用时: {result['elapsed']:.2f}秒 ({speedup:.0f}倍实时)")
+        print(f"血量: {result['health']}, 与录制结果一致: {result['matches_recording']}")
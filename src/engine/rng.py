@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+随机数流
+
+每个子系统（每个AI控制器、训练数据生成、数据集划分等）从一个总种子按名称派生
+自己的随机数生成器，互不干扰：一个子系统多取或少取随机数，不会改变其他子系统的结果。
+同一个种子和名称总是得到同一个流，与进程、Python版本和PYTHONHASHSEED无关。
+"""
+
+import random
+import hashlib
+
+
+def derive_seed(seed, *names):
+    """从总种子和子系统名称派生子种子
+    
+    Args:
+        seed: 总种子（整数）
+        *names: 子系统名称，如("ai", "p1")
+    
+    Returns:
+        64位整数种子
+    """
+    key = "/".join([str(seed)] + [str(name) for name in names]).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def make_rng(seed, *names):
+    """创建子系统的random.Random
+    
+    Args:
+        seed: 总种子，None表示不可复现（使用系统熵）
+        *names: 子系统名称
+    
+    Returns:
+        random.Random实例
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(derive_seed(seed, *names))
+
+
+def make_numpy_rng(seed, *names):
+    """创建子系统的numpy随机数生成器
+    
+    Args:
+        seed: 总种子，None表示不可复现（使用系统熵）
+        *names: 子系统名称
+    
+    Returns:
+        numpy.random.Generator实例
+    """
+    import numpy as np
+    
+    if seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng(derive_seed(seed, *names))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+模拟线程
+
+战斗模拟（包括AI决策）在独立线程中以固定的60Hz运行，每帧结束后把不可变的渲染状态
+发布到双缓冲中；主线程（pygame的窗口和事件必须在主线程）只处理输入并绘制最新发布的状态。
+AI推理偶尔变慢时画面仍按帧率刷新，特效较多导致绘制变慢时也不会拖慢模拟。
+
+渲染状态与观战广播使用同一套字段（capture_state/apply_state），
+主线程持有一个只用于显示的战斗界面，不接触模拟线程中的角色对象。
+"""
+
+import time
+import threading
+from src.engine.config import FPS
+from src.engine.broadcast import capture_state, apply_state
+
+# 模拟落后超过这么多帧时不再追赶（例如窗口被拖动时），从当前时间重新计时
+MAX_CATCH_UP_FRAMES = 5
+
+
+class RenderFrame:
+    """一帧的渲染状态（发布后不再修改）"""
+    
+    __slots__ = ("tick", "state", "effects", "cooldowns")
+    
+    def __init__(self, tick, state, effects, cooldowns):
+        """初始化
+        
+        Args:
+            tick: 帧号
+            state: capture_state返回的元组
+            effects: 本帧的攻击特效触发 ((攻击类型, x, y), ...)
+            cooldowns: 双方的攻击冷却时间 (玩家1, 玩家2)
+        """
+        self.tick = tick
+        self.state = state
+        self.effects = effects
+        self.cooldowns = cooldowns
+
+
+def capture_frame(fight, tick):
+    """从战斗界面生成渲染状态
+    
+    Args:
+        fight: 战斗界面
+        tick: 帧号
+    
+    Returns:
+        RenderFrame
+    """
+    return RenderFrame(tick, capture_state(fight), tuple(fight.effect_triggers),
+                       (fight.player1.attack_cooldown, fight.player2.attack_cooldown))
+
+
+class FrameBuffer:
+    """渲染状态的双缓冲
+    
+    模拟线程写入后台槽后交换前后台，渲染线程只读前台槽，双方不会读写同一个槽。
+    渲染比模拟慢时会跳过中间帧，但跳过的帧中的特效触发会累积到下一次读取。
+    """
+    
+    def __init__(self):
+        """初始化"""
+        self._slots = [None, None]
+        self._front = 0
+        self._pending_effects = []
+        self._lock = threading.Lock()
+        self.published = 0  # 已发布的帧数
+        self.taken = 0      # 渲染线程读取到的不同帧数
+    
+    def publish(self, frame):
+        """发布一帧（模拟线程调用）
+        
+        Args:
+            frame: RenderFrame
+        """
+        back = 1 - self._front
+        self._slots[back] = frame
+        with self._lock:
+            self._front = back
+            self._pending_effects.extend(frame.effects)
+            self.published += 1
+    
+    def take(self):
+        """读取最新的一帧和上次读取以来的全部特效触发（渲染线程调用）
+        
+        Returns:
+            (RenderFrame或None, [(攻击类型, x, y)])
+        """
+        with self._lock:
+            frame = self._slots[self._front]
+            effects = self._pending_effects
+            self._pending_effects = []
+        return frame, effects
+
+
+class SimulationThread:
+    """在独立线程中以固定帧率运行战斗界面"""
+    
+    def __init__(self, fight, fps=FPS):
+        """初始化（不启动）
+        
+        Args:
+            fight: 战斗界面，启动后只能由模拟线程调用update
+            fps: 模拟帧率
+        """
+        self.fight = fight
+        self.fps = fps
+        self.buffer = FrameBuffer()
+        self.view = create_view_fight(fight)
+        self.ticks = 0
+        self.dropped_ticks = 0  # 因落后过多而放弃追赶的帧数
+        self._last_tick = -1
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+    
+    def start(self):
+        """启动模拟线程"""
+        self.buffer.publish(capture_frame(self.fight, 0))
+        self._thread.start()
+    
+    def stop(self):
+        """停止模拟线程并等待它结束（之后可以在主线程中访问战斗界面）"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+    
+    def _run(self):
+        """模拟线程主循环"""
+        interval = 1.0 / self.fps
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            if now < next_tick:
+                self._stop.wait(next_tick - now)
+                continue
+            
+            # 落后过多时放弃追赶，避免长时间停顿后连续快进
+            behind = int((now - next_tick) / interval)
+            if behind > MAX_CATCH_UP_FRAMES:
+                self.dropped_ticks += behind
+                next_tick = now
+            
+            self.fight.update()
+            self.ticks += 1
+            self.buffer.publish(capture_frame(self.fight, self.ticks))
+            next_tick += interval
+    
+    def handle_event(self, event):
+        """转发输入事件（主线程调用；按键状态是单个布尔值，模拟线程在下一帧读取）
+        
+        Args:
+            event: pygame事件
+        """
+        self.fight.handle_event(event)
+    
+    def render(self, screen):
+        """绘制最新发布的状态（主线程调用）
+        
+        Args:
+            screen: 屏幕对象
+        """
+        frame, effects = self.buffer.take()
+        view = self.view
+        if frame.tick != self._last_tick:
+            self._last_tick = frame.tick
+            self.buffer.taken += 1
+            apply_state(view, frame.tick, frame.state, effects)
+            view.player1.attack_cooldown, view.player2.attack_cooldown = frame.cooldowns
+        view.update_effects(1.0 / self.fps)
+        view.render(screen)
+
+
+def create_view_fight(fight):
+    """创建只用于显示的战斗界面（角色、名称和模式与模拟中的战斗界面相同）
+    
+    Args:
+        fight: 模拟中的战斗界面
+    
+    Returns:
+        FightScreen实例
+    """
+    # 延迟导入，FightScreen依赖AI模块
+    from src.ui.fight_screen import FightScreen
+    from src.engine.headless import HeadlessGame, create_character, character_key
+    
+    player1 = create_character(character_key(fight.player1), 100, 400)
+    player2 = create_character(character_key(fight.player2), 600, 400)
+    view = FightScreen(HeadlessGame(fight.ai_vs_ai_mode), player1, player2, True, 1, 0)
+    view.vsai_mode = fight.vsai_mode
+    player1.name, player2.name = fight.player1.name, fight.player2.name
+    
+    # 只用于显示AI类型
+    view.ai1_controller, view.ai_controller = fight.ai1_controller, fight.ai_controller
+    
+    # 与主循环共用画质调节
+    view.quality = fight.quality
+    return view
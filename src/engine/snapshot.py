@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+战斗状态快照
+
+把角色、战斗界面和AI控制器中影响模拟结果的状态保存为紧凑的不可变元组，
+不包含Surface、精灵图等资源，可以随时恢复并从该帧开始逐位一致地继续模拟。
+回放、搜索型AI和回滚网络同步都基于这里的快照。
+
+特效、伤害数字等纯表现层状态不影响模拟结果，不在快照范围内。
+"""
+
+import json
+from operator import attrgetter
+from src.characters.character import CharacterState, Direction, observe_fighters
+
+# 角色需要保存的属性（顺序即快照元组中的顺序）
+CHARACTER_FIELDS = (
+    "x", "y", "vel_x", "vel_y",
+    "is_jumping", "is_crouching", "is_blocking",
+    "health", "state", "direction",
+    "animation_frame", "animation_timer", "hit_recovery_timer",
+    "is_attacking", "attack_frame", "attack_move", "attack_cooldown",
+    "has_hit_opponent", "attack_blocked"
+)
+
+# 战斗界面需要保存的属性
+FIGHT_FIELDS = (
+    "sim_time", "round_time", "round_over",
+    "last_effect_cleanup"
+)
+
+# 一次C层调用取出全部属性，比逐个getattr快得多
+_get_character_fields = attrgetter(*CHARACTER_FIELDS)
+_get_fight_fields = attrgetter(*FIGHT_FIELDS)
+
+# 编码快照时按名称记录的枚举类型
+_ENUM_TYPES = {cls.__name__: cls for cls in (CharacterState, Direction)}
+
+
+class CharacterSnapshot:
+    """角色状态快照"""
+    
+    __slots__ = ("values", "hitbox")
+    
+    def __init__(self, values, hitbox):
+        """初始化
+        
+        Args:
+            values: 按CHARACTER_FIELDS顺序排列的属性值元组
+            hitbox: 攻击判定框 (x, y, w, h)
+        """
+        self.values = values
+        self.hitbox = hitbox
+    
+    def __eq__(self, other):
+        return (isinstance(other, CharacterSnapshot) and
+                self.values == other.values and self.hitbox == other.hitbox)
+    
+    def __hash__(self):
+        return hash((self.values, self.hitbox))
+
+
+class FightSnapshot:
+    """战斗状态快照"""
+    
+    __slots__ = ("values", "winner", "fighters", "controllers", "random_state")
+    
+    def __init__(self, values, winner, fighters, controllers, random_state):
+        """初始化
+        
+        Args:
+            values: 按FIGHT_FIELDS顺序排列的属性值元组
+            winner: 胜者编号（0: 玩家1, 1: 玩家2, None: 无）
+            fighters: (玩家1快照, 玩家2快照)
+            controllers: (玩家1控制器快照, 玩家2控制器快照)
+            random_state: (玩家1控制器, 玩家2控制器)的随机数状态，None表示不保存
+        """
+        self.values = values
+        self.winner = winner
+        self.fighters = fighters
+        self.controllers = controllers
+        self.random_state = random_state
+    
+    def same_simulation_state(self, other):
+        """比较两个快照的模拟状态（角色和回合状态）是否一致
+        
+        Args:
+            other: 另一个快照
+        
+        Returns:
+            是否一致
+        """
+        return (self.values == other.values and self.winner == other.winner and
+                self.fighters == other.fighters)
+
+
+def snapshot_character(character):
+    """保存角色状态
+    
+    Args:
+        character: 角色
+    
+    Returns:
+        CharacterSnapshot
+    """
+    hitbox = character.attack_hitbox
+    return CharacterSnapshot(_get_character_fields(character),
+                             (hitbox.x, hitbox.y, hitbox.w, hitbox.h))
+
+
+def restore_character(character, snapshot):
+    """恢复角色状态
+    
+    Args:
+        character: 角色
+        snapshot: snapshot_character返回的快照
+    """
+    character.__dict__.update(zip(CHARACTER_FIELDS, snapshot.values))
+    character.attack_hitbox.update(snapshot.hitbox)
+    sync_character_image(character)
+
+
+def sync_character_image(character):
+    """按角色的位置和动画状态更新rect和当前图像
+    
+    图像由状态推导，快照和广播都不传输Surface。
+    
+    Args:
+        character: 角色
+    """
+    character.rect.x = character.x
+    character.rect.y = character.y
+    
+    frames = character.sprites.get(character.state, {}).get(character.direction)
+    if frames:
+        character.image = frames[min(character.animation_frame, len(frames) - 1)]
+
+
+def _copy_value(value):
+    """递归复制列表和字典容器，其他对象（如动作队列中的角色方法）保持引用"""
+    if isinstance(value, list):
+        return [_copy_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    return value
+
+
+def snapshot_controller(controller):
+    """保存控制器状态
+    
+    控制器通过类属性SNAPSHOT_FIELDS声明需要保存的属性，未声明的控制器视为无状态。
+    
+    Args:
+        controller: AI控制器（可以为None）
+    
+    Returns:
+        属性值元组，或None
+    """
+    fields = getattr(controller, "SNAPSHOT_FIELDS", None)
+    if not fields:
+        return None
+    return tuple(_copy_value(getattr(controller, name)) for name in fields)
+
+
+def restore_controller(controller, snapshot):
+    """恢复控制器状态
+    
+    Args:
+        controller: AI控制器（可以为None）
+        snapshot: snapshot_controller返回的快照
+    """
+    if snapshot is None:
+        return
+    for name, value in zip(controller.SNAPSHOT_FIELDS, snapshot):
+        # 可变容器复制一份，同一快照可以多次恢复
+        setattr(controller, name, _copy_value(value))
+
+
+def _random_state(controller):
+    """获取控制器随机数流的状态，没有随机数流时返回None"""
+    rng = getattr(controller, "rng", None)
+    return rng.getstate() if rng is not None else None
+
+
+def _active_controllers(fight):
+    """获取战斗界面双方当前使用的控制器"""
+    return (fight.ml_ai1_controller or fight.ai1_controller,
+            fight.ml_ai_controller or fight.ai_controller)
+
+
+def snapshot_fight(fight, include_random=True):
+    """保存战斗状态
+    
+    Args:
+        fight: 战斗界面
+        include_random: 是否保存AI控制器的随机数状态（AI决策依赖它）
+    
+    Returns:
+        FightSnapshot
+    """
+    if fight.winner is fight.player1:
+        winner = 0
+    elif fight.winner is fight.player2:
+        winner = 1
+    else:
+        winner = None
+    
+    controllers = _active_controllers(fight)
+    return FightSnapshot(
+        _get_fight_fields(fight),
+        winner,
+        (snapshot_character(fight.player1), snapshot_character(fight.player2)),
+        tuple(snapshot_controller(c) for c in controllers),
+        tuple(_random_state(c) for c in controllers) if include_random else None
+    )
+
+
+def restore_fight(fight, snapshot):
+    """恢复战斗状态
+    
+    Args:
+        fight: 战斗界面
+        snapshot: snapshot_fight返回的快照
+    """
+    fight.__dict__.update(zip(FIGHT_FIELDS, snapshot.values))
+    fight.winner = (fight.player1, fight.player2)[snapshot.winner] if snapshot.winner is not None else None
+    
+    restore_character(fight.player1, snapshot.fighters[0])
+    restore_character(fight.player2, snapshot.fighters[1])
+    observe_fighters(fight.player1, fight.player2)
+    for controller, controller_snapshot in zip(_active_controllers(fight), snapshot.controllers):
+        restore_controller(controller, controller_snapshot)
+    
+    if snapshot.random_state is not None:
+        for controller, state in zip(_active_controllers(fight), snapshot.random_state):
+            if state is not None:
+                controller.rng.setstate(state)
+
+
+def _encode_enum(value):
+    """JSON编码枚举值（状态、朝向）"""
+    if type(value).__name__ in _ENUM_TYPES:
+        return {"enum": type(value).__name__, "value": value.value}
+    raise TypeError(f"无法编码的快照数据: {value!r}")
+
+
+def _decode_enum(data):
+    """JSON解码枚举值"""
+    if "enum" in data:
+        return _ENUM_TYPES[data["enum"]](data["value"])
+    return data
+
+
+def encode_snapshot(snapshot):
+    """把战斗快照编码为字节串（用于写入文件或网络传输）
+    
+    只编码角色和回合状态，控制器状态和随机数状态不编码：
+    由记录的指令驱动的模拟（回放、观战）不运行AI控制器。
+    
+    Args:
+        snapshot: FightSnapshot
+    
+    Returns:
+        UTF-8编码的JSON字节串
+    """
+    p1, p2 = snapshot.fighters
+    data = [snapshot.values, snapshot.winner, p1.values, p1.hitbox, p2.values, p2.hitbox]
+    return json.dumps(data, separators=(",", ":"), default=_encode_enum).encode("utf-8")
+
+
+def decode_snapshot(data):
+    """从字节串解码战斗快照
+    
+    Args:
+        data: encode_snapshot返回的字节串
+    
+    Returns:
+        FightSnapshot（不含控制器和随机数状态）
+    """
+    values, winner, p1_values, p1_hitbox, p2_values, p2_hitbox = json.loads(data, object_hook=_decode_enum)
+    fighters = (CharacterSnapshot(tuple(p1_values), tuple(p1_hitbox)),
+                CharacterSnapshot(tuple(p2_values), tuple(p2_hitbox)))
+    return FightSnapshot(tuple(values), winner, fighters, (None, None), None)
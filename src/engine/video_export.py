@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+视频导出
+
+不打开窗口（SDL dummy驱动），以CPU允许的最快速度模拟并绘制一场AI对战或一个回放，
+把每帧的原始像素通过管道交给编码器进程（ffmpeg），或者写成编号的PNG图片。
+编码在独立的线程中进行，主线程绘制下一帧的同时上一帧正在编码：
+写管道和zlib压缩都会释放GIL，两者可以真正重叠；PNG各帧互相独立，按CPU核心数并行压缩。
+
+用法:
+    python -m src.engine.video_export match --p1 Ryu --p2 Ken --seed 1 --out fight.mp4
+    python -m src.engine.video_export replay replays/ --out replay.mp4
+    python -m src.engine.video_export replay replays/ --png frames/
+"""
+
+import os
+import time
+import zlib
+import queue
+import struct
+import argparse
+import threading
+import subprocess
+import pygame
+from src.engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, ROUND_TIME
+
+# 等待编码的最大帧数，编码跟不上时绘制线程等待（限制内存占用）
+MAX_PENDING_FRAMES = 8
+
+# 回合结束后继续导出的时长（秒），显示结果画面
+TAIL_SECONDS = 2.0
+
+# 交给编码器的像素格式：每像素4字节（第4字节无意义）。与显示Surface的内存布局一致，
+# 取出像素几乎只是内存复制，比转换为RGB快一个数量级
+FRAME_FORMAT = "RGBX"
+
+
+class FFmpegEncoder:
+    """通过标准输入把原始帧交给ffmpeg编码"""
+    
+    def __init__(self, path, size=(SCREEN_WIDTH, SCREEN_HEIGHT), fps=FPS, ffmpeg="ffmpeg", crf=20):
+        """启动ffmpeg进程
+        
+        Args:
+            path: 输出视频文件路径（格式由扩展名决定）
+            size: 帧大小 (宽, 高)
+            fps: 帧率
+            ffmpeg: ffmpeg可执行文件
+            crf: H.264画质（越小越清晰，文件越大）
+        """
+        width, height = size
+        command = [ffmpeg, "-loglevel", "error", "-y",
+                   "-f", "rawvideo", "-pix_fmt", "rgb0", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                   "-c:v", "libx264", "-preset", "veryfast", "-crf", str(crf), "-pix_fmt", "yuv420p", path]
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        except FileNotFoundError:
+            raise RuntimeError(f"未找到ffmpeg: {ffmpeg}（可以用--ffmpeg指定路径，或用--png导出图片）")
+        self.path = path
+        self.threads = 1  # 帧必须按顺序写入管道
+    
+    def write(self, index, data):
+        """写入一帧
+        
+        Args:
+            index: 帧号
+            data: FRAME_FORMAT格式的原始像素
+        """
+        self.process.stdin.write(data)
+    
+    def close(self):
+        """结束输入并等待编码完成"""
+        self.process.stdin.close()
+        code = self.process.wait()
+        if code != 0:
+            raise RuntimeError(f"ffmpeg退出码: {code}")
+
+
+class PNGWriter:
+    """把每帧写成编号的PNG图片（frame_000000.png, ...）"""
+    
+    def __init__(self, directory, size=(SCREEN_WIDTH, SCREEN_HEIGHT), level=1, threads=None):
+        """初始化
+        
+        Args:
+            directory: 输出目录（不存在时创建）
+            size: 帧大小 (宽, 高)
+            level: zlib压缩级别（1最快）
+            threads: 编码线程数，None表示CPU核心数（各帧互相独立，可以并行压缩）
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.size = size
+        self.level = level
+        self.threads = threads or os.cpu_count() or 1
+    
+    def write(self, index, data):
+        """写入一帧（可以在多个线程中同时调用）
+        
+        Args:
+            index: 帧号
+            data: FRAME_FORMAT格式的原始像素
+        """
+        rgb = pygame.image.tobytes(pygame.image.frombuffer(data, self.size, FRAME_FORMAT), "RGB")
+        path = os.path.join(self.directory, f"frame_{index:06d}.png")
+        with open(path, "wb") as f:
+            f.write(encode_png(rgb, self.size[0], self.size[1], self.level))
+    
+    def close(self):
+        """无需额外处理"""
+        pass
+
+
+def encode_png(data, width, height, level=1):
+    """把RGB原始像素编码为PNG
+    
+    不使用pygame.image.save：这里只需要zlib压缩，压缩时会释放GIL，编码线程不会阻塞绘制。
+    
+    Args:
+        data: RGB原始像素（每行width*3字节）
+        width: 宽度
+        height: 高度
+        level: zlib压缩级别
+    
+    Returns:
+        PNG文件内容
+    """
+    def chunk(tag, body):
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body))
+    
+    # 每行前加一个字节的过滤类型（0表示不过滤）
+    stride = width * 3
+    view = memoryview(data)
+    raw = b"".join(b"\x00" + view[row * stride:(row + 1) * stride] for row in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8位RGB
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) +
+            chunk(b"IDAT", zlib.compress(raw, level)) + chunk(b"IEND", b""))
+
+
+class EncodeWorker:
+    """在独立线程中把帧交给编码器"""
+    
+    def __init__(self, encoder, max_pending=MAX_PENDING_FRAMES):
+        """启动编码线程（线程数由编码器的threads属性决定）
+        
+        Args:
+            encoder: 带write(index, data)和close()方法的编码器
+            max_pending: 等待编码的最大帧数
+        """
+        self.encoder = encoder
+        self.queue = queue.Queue(max_pending)
+        self.error = None
+        self.submitted = 0
+        self._threads = [threading.Thread(target=self._run, name=f"video-encode-{i}", daemon=True)
+                         for i in range(max(1, encoder.threads))]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, data):
+        """提交一帧（队列满时等待）
+        
+        Args:
+            data: FRAME_FORMAT格式的原始像素
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put((self.submitted, data))
+        self.submitted += 1
+    
+    def _run(self):
+        """编码线程主循环"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            # 出错后继续取出剩余的帧，避免绘制线程一直等待
+            if self.error is None:
+                try:
+                    self.encoder.write(*item)
+                except Exception as e:
+                    self.error = e
+    
+    def close(self):
+        """等待所有帧编码完成并关闭编码器"""
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.encoder.close()
+        if self.error is not None:
+            raise self.error
+
+
+def render_video(fight, encoder, step, tail_seconds=TAIL_SECONDS):
+    """逐帧推进并绘制战斗界面，把画面交给编码器
+    
+    Args:
+        fight: 战斗界面
+        encoder: 编码器（FFmpegEncoder或PNGWriter）
+        step: 推进一帧的函数，没有更多帧时返回False
+        tail_seconds: 结束后继续导出的时长（秒）
+    
+    Returns:
+        导出的帧数
+    """
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    worker = EncodeWorker(encoder)
+    tail_frames = int(tail_seconds * FPS)
+    frames = 0
+    try:
+        while True:
+            if not step():
+                if tail_frames <= 0:
+                    break
+                tail_frames -= 1
+                fight.update_effects(1.0 / FPS)
+            fight.render(surface)
+            worker.submit(pygame.image.tobytes(surface, FRAME_FORMAT))
+            frames += 1
+    finally:
+        worker.close()
+    return frames
+
+
+def export_match(encoder, p1_name="Ryu", p2_name="Ken", difficulty=2, seed=None, max_time=ROUND_TIME):
+    """导出一场AI对战AI
+    
+    Args:
+        encoder: 编码器
+        p1_name: 玩家1角色名称
+        p2_name: 玩家2角色名称
+        difficulty: AI难度
+        seed: 随机种子，None表示随机生成
+        max_time: 最长时长（秒），超时按当前血量判定胜负
+    
+    Returns:
+        结果字典
+    """
+    from src.engine.headless import create_headless_fight
+    
+    fight = create_headless_fight(p1_name, p2_name, difficulty=difficulty, seed=seed)
+    max_frames = int(max_time * FPS)
+    frames = 0
+    
+    def step():
+        nonlocal frames
+        if fight.round_over:
+            return False
+        if frames >= max_frames:
+            # 达到最长时长时强制结束回合（按血量判定）
+            fight.sim_time = max(fight.sim_time, ROUND_TIME)
+        fight.update()
+        frames += 1
+        return True
+    
+    return _export(fight, encoder, step)
+
+
+def export_replay(encoder, path):
+    """导出一个回放
+    
+    Args:
+        encoder: 编码器
+        path: 回放文件路径
+    
+    Returns:
+        结果字典
+    """
+    from src.engine.headless import init_headless
+    from src.engine.replay import Replay, create_replay_fight, _finish_round
+    
+    init_headless()
+    replay = Replay.load(path)
+    fight, replay_input = create_replay_fight(replay)
+    
+    def step():
+        if replay_input.finished:
+            _finish_round(fight, replay, replay_input)
+            return False
+        fight.update()
+        return True
+    
+    return _export(fight, encoder, step)
+
+
+def _export(fight, encoder, step):
+    """导出并汇总耗时"""
+    start = time.perf_counter()
+    try:
+        frames = render_video(fight, encoder, step)
+    finally:
+        fight.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": frames,
+        "elapsed": elapsed,
+        "speedup": frames / FPS / elapsed if elapsed > 0 else float("inf"),
+        "health": (fight.player1.health, fight.player2.health)
+    }
+
+
+def open_encoder(out=None, png_dir=None, ffmpeg="ffmpeg", crf=20):
+    """根据命令行参数创建编码器
+    
+    Args:
+        out: 视频文件路径
+        png_dir: PNG图片目录（指定时不使用ffmpeg）
+        ffmpeg: ffmpeg可执行文件
+        crf: H.264画质
+    
+    Returns:
+        编码器
+    """
+    if png_dir:
+        return PNGWriter(png_dir)
+    return FFmpegEncoder(out, ffmpeg=ffmpeg, crf=crf)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="导出战斗视频")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    match_parser = subparsers.add_parser("match", help="导出一场AI对战AI")
+    match_parser.add_argument("--p1", default="Ryu", help="玩家1角色")
+    match_parser.add_argument("--p2", default="Ken", help="玩家2角色")
+    match_parser.add_argument("--difficulty", type=int, default=2, help="AI难度")
+    match_parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    match_parser.add_argument("--max-time", type=float, default=ROUND_TIME, help="最长时长（秒）")
+    
+    replay_parser = subparsers.add_parser("replay", help="导出回放")
+    replay_parser.add_argument("path", help="回放文件，或回放目录（导出最新的回放）")
+    
+    for sub in (match_parser, replay_parser):
+        output = sub.add_mutually_exclusive_group(required=True)
+        output.add_argument("--out", help="输出视频文件（如fight.mp4，需要ffmpeg）")
+        output.add_argument("--png", help="输出PNG图片的目录")
+        sub.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg可执行文件")
+        sub.add_argument("--crf", type=int, default=20, help="H.264画质，越小越清晰")
+    
+    args = parser.parse_args()
+    encoder = open_encoder(args.out, args.png, args.ffmpeg, args.crf)
+    if args.command == "match":
+        result = export_match(encoder, args.p1, args.p2, args.difficulty, args.seed, args.max_time)
+    else:
+        from src.engine.replay import latest_replay
+        replay_path = latest_replay(args.path) if os.path.isdir(args.path) else args.path
+        result = export_replay(encoder, replay_path)
+    
+    print(f"导出: {args.out or args.png}")
+    print(f"帧数: {result['frames']}, 用时: {result['elapsed']:.2f}秒 ({result['speedup']:.1f}倍实时)")
+    print(f"血量: {result['health']}")
@@ -0,0 +1,409 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+攻击特效
+
+出招时在攻击者身前创建的拳脚特效（圆形冲击、冲击线、弧线和粒子），以及特效的更新、清理和绘制。
+1对1战斗界面和多人混战界面共用，使用的界面需要提供effects、effect_triggers、quality和sim_time属性。
+"""
+
+import math
+import pygame
+from src.engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK
+from src.ui.glyph_atlas import get_atlas
+from src.characters.character import Direction
+
+
+class AttackEffects:
+    """攻击特效的创建、更新和绘制"""
+    
+    def _spawn_attacker_effect(self, attacker, attack_type):
+        """在攻击者身前创建攻击特效
+        
+        Args:
+            attacker: 攻击者
+            attack_type: 攻击类型（如"light_punch"）
+        """
+        # 确定特效位置（根据攻击者朝向和位置）
+        if attacker.direction == Direction.RIGHT:
+            effect_x = attacker.x + attacker.width + 5  # 调整位置
+        else:
+            effect_x = attacker.x - 35  # 调整位置
+        
+        effect_y = attacker.y + 50  # 大约在角色的胸部位置
+        self.spawn_attack_effect(effect_x, effect_y, attack_type)
+    
+    def spawn_attack_effect(self, x, y, attack_type):
+        """创建攻击特效并记录到本帧的特效触发列表
+        
+        特效触发总是记录（观众按自己的画质创建特效），特效数量已达到当前画质的上限时不再创建。
+        
+        Args:
+            x: 特效x坐标
+            y: 特效y坐标
+            attack_type: 攻击类型（如"light_punch"）
+        """
+        if "punch" not in attack_type and "kick" not in attack_type:
+            return
+        self.effect_triggers.append((attack_type, x, y))
+        
+        if len(self.effects) > self.quality.settings.max_effects:
+            return
+        if "punch" in attack_type:
+            self._create_punch_effect(x, y, attack_type)
+        else:
+            self._create_kick_effect(x, y, attack_type)
+    
+    def update_effects(self, dt):
+        """只更新特效，不推进模拟（观战画面等由外部提供状态的场合）
+        
+        Args:
+            dt: 时间增量（秒）
+        """
+        self._update_effects(dt)
+    
+    def _create_punch_effect(self, x, y, attack_type):
+        """创建拳击特效 - 优化视觉效果
+        
+        Args:
+            x: 特效x坐标
+            y: 特效y坐标
+            attack_type: 攻击类型
+        """
+        # 拳击特效是一个快速扩大然后消失的圆形加上冲击波
+        is_heavy = "heavy" in attack_type
+        
+        # 增强颜色对比度和亮度
+        if is_heavy:
+            color = (255, 140, 0, 230)  # 亮橙色，更高不透明度
+        else:
+            color = (255, 255, 0, 210)  # 亮黄色，更高不透明度
+        
+        size = 18 if is_heavy else 12  # 增大初始尺寸
+        duration = 0.35 if is_heavy else 0.25  # 增加持续时间提高可见性
+        
+        # 主要冲击圆 - 使用填充圆增强视觉效果
+        self.effects.append({
+            "type": "circle",
+            "x": x,
+            "y": y,
+            "color": color,
+            "size": size,
+            "max_size": size * (5 if is_heavy else 3.5),  # 扩大最大尺寸
+            "current_size": size,
+            "duration": duration,
+            "time_left": duration,
+            "filled": True  # 设置为填充圆增强视觉效果
+        })
+        
+        # 添加外轮廓圆增强视觉效果
+        self.effects.append({
+            "type": "circle",
+            "x": x,
+            "y": y,
+            "color": (255, 255, 255, 150),  # 白色轮廓
+            "size": size + 2,
+            "max_size": (size + 2) * (5 if is_heavy else 3.5),
+            "current_size": size + 2,
+            "duration": duration * 0.9,
+            "time_left": duration * 0.9
+        })
+        
+        # 添加冲击线效果 - 重拳和轻拳都添加但样式不同
+        lines_count = round((8 if is_heavy else 4) * self.quality.settings.particle_scale)
+        for i in range(lines_count):
+            angle = i * (360 / lines_count)
+            self.effects.append({
+                "type": "impact_line",
+                "x": x,
+                "y": y,
+                "color": (255, 255, 255, 200) if is_heavy else (255, 255, 150, 180),
+                "angle": angle,
+                "length": 10,
+                "max_length": 50 if is_heavy else 30,  # 增大冲击线长度
+                "current_length": 10,
+                "width": 3 if is_heavy else 2,
+                "duration": duration * 0.7,
+                "time_left": duration * 0.7
+            })
+    
+    def _create_kick_effect(self, x, y, attack_type):
+        """创建踢腿特效 - 优化视觉效果
+        
+        Args:
+            x: 特效x坐标
+            y: 特效y坐标
+            attack_type: 攻击类型
+        """
+        # 踢腿特效是一个弧形扫过的效果加上冲击粒子
+        is_heavy = "heavy" in attack_type
+        
+        # 增强颜色对比度
+        if is_heavy:
+            color = (255, 0, 0, 220)  # 更鲜艳的红色
+        else:
+            color = (0, 200, 255, 200)  # 更亮的青色
+        
+        size = 28 if is_heavy else 22  # 增大尺寸
+        duration = 0.4 if is_heavy else 0.3  # 增加持续时间
+        
+        # 弧形轨迹 - 更明显的弧线效果
+        self.effects.append({
+            "type": "arc",
+            "x": x,
+            "y": y,
+            "color": color,
+            "radius": size * 2,
+            "start_angle": 0,
+            "end_angle": 0,
+            "max_angle": 180 if is_heavy else 150,  # 增大弧度
+            "width": 8 if is_heavy else 5,  # 增加线条宽度
+            "duration": duration,
+            "time_left": duration
+        })
+        
+        # 添加粒子效果 - 散开的小圆点，增加数量和尺寸
+        particle_count = round((8 if is_heavy else 5) * self.quality.settings.particle_scale)
+        for i in range(particle_count):
+            angle = i * (360 / particle_count)
+            distance = size * 1.5
+            particle_x = x + distance * math.cos(angle * (math.pi / 180))
+            particle_y = y + distance * math.sin(angle * (math.pi / 180))
+            self.effects.append({
+                "type": "particle",
+                "x": particle_x,
+                "y": particle_y,
+                "velocity_x": math.cos(angle * (math.pi / 180)) * (4 if is_heavy else 3),  # 增加速度
+                "velocity_y": math.sin(angle * (math.pi / 180)) * (4 if is_heavy else 3),
+                "color": (*color[:3], 240),  # 提高不透明度
+                "size": 7 if is_heavy else 5,  # 增大粒子尺寸
+                "duration": duration * 0.9,
+                "time_left": duration * 0.9
+            })
+        
+        # 为重踢添加扇形区域效果
+        if is_heavy:
+            # 添加扇形区域指示攻击范围
+            sweep_angle = 120  # 扇形覆盖角度
+            start_angle = -60  # 起始角度（相对于水平线）
+            
+            self.effects.append({
+                "type": "arc",
+                "x": x,
+                "y": y,
+                "color": (255, 0, 0, 80),  # 半透明红色
+                "radius": size * 4,
+                "start_angle": start_angle,
+                "end_angle": start_angle,
+                "max_angle": sweep_angle,
+                "width": size * 4,  # 使用较大宽度模拟扇形
+                "duration": duration * 0.6,
+                "time_left": duration * 0.6
+            })
+    
+    def _update_effects(self, dt):
+        """更新所有特效
+        
+        Args:
+            dt: 时间增量（秒）
+        """
+        # 如果特效过多，只保留最新的
+        max_effects = self.quality.settings.max_effects
+        if len(self.effects) > max_effects:
+            self.effects = self.effects[-max_effects:]
+        
+        # 更新所有特效，移除已过期或过旧的特效
+        current_time = self.sim_time
+        
+        # 清理任何超过0.8秒的特效（减少存活时间）
+        for effect in self.effects[:]:
+            if 'creation_time' in effect and current_time - effect.get('creation_time', current_time) > 0.8:
+                self.effects.remove(effect)
+        
+        # 更新所有特效，移除已过期的特效
+        for effect in self.effects[:]:  # 创建副本以便在迭代时修改
+            effect["time_left"] -= dt
+            
+            if effect["time_left"] <= 0:
+                self.effects.remove(effect)
+                continue
+            
+            # 处理延迟效果
+            if "delay" in effect and effect["time_left"] > effect["duration"]:
+                continue
+            
+            # 根据特效类型更新参数
+            progress = 1 - (effect["time_left"] / effect["duration"])  # 0到1的进度
+            
+            # 简化特效更新逻辑，根据特效类型进行更新
+            if effect["type"] == "circle":
+                # 圆形特效逐渐扩大
+                effect["current_size"] = effect["size"] + (effect["max_size"] - effect["size"]) * progress
+                # 随着时间推移透明度降低
+                effect["color"] = (*effect["color"][:3], int(effect["color"][3] * (1 - progress * 0.8)))
+            
+            elif effect["type"] == "arc":
+                # 弧形特效角度逐渐增加
+                effect["end_angle"] = effect["max_angle"] * progress
+                # 透明度变化
+                effect["color"] = (*effect["color"][:3], int(effect["color"][3] * (1 - progress * 0.7)))
+            
+            elif effect["type"] == "impact_line":
+                # 冲击线逐渐延长
+                effect["current_length"] = effect["length"] + (effect["max_length"] - effect["length"]) * progress
+                # 透明度变化
+                effect["color"] = (*effect["color"][:3], int(effect["color"][3] * (1 - progress * 0.9)))
+            
+            elif effect["type"] in ["particle", "blood_particle"]:
+                # 更新粒子位置
+                effect["x"] += effect["velocity_x"]
+                effect["y"] += effect["velocity_y"]
+                if effect["type"] == "blood_particle":
+                    effect["velocity_y"] += effect["gravity"]
+                # 透明度变化 - 加快衰减
+                effect["color"] = (*effect["color"][:3], int(effect["color"][3] * (1 - progress * 1.1)))
+            
+            elif effect["type"] == "text":
+                # 文字特效上升
+                effect["offset_y"] = effect["max_offset"] * progress
+                # 透明度变化 - 加快衰减
+                if progress < 0.1:
+                    alpha = 255  # 前10%时间保持完全不透明
+                else:
+                    alpha = 255 * (1 - ((progress - 0.1) / 0.9))  # 后90%时间逐渐淡出
+                effect["color"] = (*effect["color"][:3], int(alpha))
+    
+    def _render_effects(self, screen):
+        """渲染所有特效
+        
+        Args:
+            screen: 屏幕对象
+        """
+        # 如果没有特效，直接返回
+        if not self.effects:
+            return
+        
+        # 创建一个透明的Surface用于绘制特效；低画质下直接不透明地绘制到屏幕上
+        quality = self.quality.settings
+        if quality.alpha_blending:
+            effect_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        else:
+            effect_surface = screen
+        
+        # 先按类型分组，确保正确的渲染顺序
+        circle_effects = []
+        arc_effects = []
+        line_effects = []
+        particle_effects = []
+        text_effects = []
+        
+        for effect in self.effects:
+            if effect["type"] == "circle":
+                circle_effects.append(effect)
+            elif effect["type"] == "arc":
+                arc_effects.append(effect)
+            elif effect["type"] == "impact_line":
+                line_effects.append(effect)
+            elif effect["type"] in ["particle", "blood_particle"]:
+                particle_effects.append(effect)
+            elif effect["type"] == "text":
+                text_effects.append(effect)
+        
+        # 渲染圆形特效
+        for effect in circle_effects:
+            if effect.get("delay", 0) > 0 and effect["time_left"] > effect["duration"]:
+                continue  # 跳过延迟效果
+            
+            pygame.draw.circle(
+                effect_surface,
+                effect["color"],
+                (int(effect["x"]), int(effect["y"])),
+                int(effect["current_size"]),
+                0 if effect.get("filled", False) else 2
+            )
+        
+        # 渲染弧形特效
+        for effect in arc_effects:
+            if effect.get("delay", 0) > 0 and effect["time_left"] > effect["duration"]:
+                continue
+            
+            start_angle = math.radians(effect.get("start_angle", 0))
+            end_angle = math.radians(effect.get("end_angle", 90))
+            pygame.draw.arc(
+                effect_surface,
+                effect["color"],
+                (int(effect["x"] - effect["radius"]), int(effect["y"] - effect["radius"]),
+                 int(effect["radius"] * 2), int(effect["radius"] * 2)),
+                start_angle,
+                end_angle,
+                effect.get("width", 2)
+            )
+        
+        # 渲染冲击线特效
+        for effect in line_effects:
+            if effect.get("delay", 0) > 0 and effect["time_left"] > effect["duration"]:
+                continue
+            
+            angle_rad = math.radians(effect["angle"])
+            end_x = effect["x"] + effect["current_length"] * math.cos(angle_rad)
+            end_y = effect["y"] + effect["current_length"] * math.sin(angle_rad)
+            pygame.draw.line(
+                effect_surface,
+                effect["color"],
+                (int(effect["x"]), int(effect["y"])),
+                (int(end_x), int(end_y)),
+                effect.get("width", 2)
+            )
+        
+        # 渲染粒子特效
+        for effect in particle_effects:
+            if effect.get("delay", 0) > 0 and effect["time_left"] > effect["duration"]:
+                continue
+            
+            # 简单粒子就是小圆
+            pygame.draw.circle(
+                effect_surface,
+                effect["color"],
+                (int(effect["x"]), int(effect["y"])),
+                effect["size"]
+            )
+        
+        # 最后绘制所有文本特效
+        for effect in text_effects:
+            if effect["type"] == "text":
+                # 普通文本特效（伤害数字等，从字形图集拼出）
+                color = effect["color"]
+                alpha = color[3] if len(color) > 3 else 255
+                center = (int(effect["x"]), int(effect["y"] + effect["offset_y"]))
+                
+                # 添加简单的文本阴影增强可读性
+                if quality.text_shadows:
+                    get_atlas(effect["size"], BLACK, chinese=False).draw(
+                        effect_surface, effect["text"], (center[0] + 2, center[1] + 2), "center", alpha // 2)
+                
+                get_atlas(effect["size"], color, chinese=False).draw(effect_surface, effect["text"], center, "center",
+                                                                     None if alpha == 255 else alpha)
+        
+        # 将特效Surface绘制到屏幕上
+        if effect_surface is not screen:
+            screen.blit(effect_surface, (0, 0))
+    
+    def _clean_effects(self):
+        """清理过期的特效，只保留当前画质允许的最新特效"""
+        # 记录当前时间，用于删除过时的特效
+        current_time = self.sim_time
+        
+        # 为每个特效添加创建时间（如果没有）
+        for effect in self.effects:
+            if 'creation_time' not in effect:
+                effect['creation_time'] = current_time
+        
+        max_effects = self.quality.settings.max_effects
+        if len(self.effects) <= max_effects:
+            return
+        
+        # 按创建时间排序（最新的在前面），按对象身份保留，特效字典内容相同时也不会误删
+        newest = sorted(self.effects, key=lambda effect: effect['creation_time'], reverse=True)[:max_effects]
+        keep = {id(effect) for effect in newest}
+        self.effects = [effect for effect in self.effects if id(effect) in keep]
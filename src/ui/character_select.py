@@ -11,6 +11,7 @@ from src.characters.ken import Ken
 from src.characters.chun_li import ChunLi
 from src.ui.menu import Button
 from src.engine.font_utils import get_chinese_font, render_text
+from src.engine.i18n import get_text
 
 class CharacterCard:
     """角色卡片类"""
@@ -125,7 +126,7 @@ class CharacterSelect:
         self.game = game
         
         # 标题
-        self.title_text = render_text("选择角色", 48, WHITE)
+        self.title_text = render_text(get_text("select.title"), 48, WHITE)
         self.title_rect = self.title_text.get_rect(center=(SCREEN_WIDTH // 2, 50))
         
         # 角色卡片
@@ -143,18 +144,18 @@ class CharacterSelect:
         
         # 玩家选择提示
         if game.ai_vs_ai_mode:
-            self.player_text = "选择AI 1角色"
+            self.player_text = get_text("select.ai1")
         elif game.vsai_mode:
-            self.player_text = "选择你的角色"
+            self.player_text = get_text("select.yours")
         else:
-            self.player_text = "玩家1选择"
+            self.player_text = get_text("select.player1")
         
         self.player_text_surf = render_text(self.player_text, 36, WHITE)
         self.player_text_rect = self.player_text_surf.get_rect(center=(SCREEN_WIDTH // 2, 350))
         
         # 确认和返回按钮
-        self.confirm_button = Button(SCREEN_WIDTH // 2 - 100, 400, 200, 50, "确认", WHITE, GREEN)
-        self.back_button = Button(SCREEN_WIDTH // 2 - 100, 470, 200, 50, "返回", WHITE, RED)
+        self.confirm_button = Button(SCREEN_WIDTH // 2 - 100, 400, 200, 50, get_text("select.confirm"), WHITE, GREEN)
+        self.back_button = Button(SCREEN_WIDTH // 2 - 100, 470, 200, 50, get_text("select.back"), WHITE, RED)
         
         # 选择状态
         self.selection_state = 0  # 0: 玩家1选择, 1: 玩家2选择, 2: 已完成
@@ -177,39 +178,39 @@ class CharacterSelect:
         pygame.draw.rect(panel, WHITE, (0, 0, panel_width, panel_height), 2)
         
         # 标题
-        title = render_text("游戏控制", 24, YELLOW)
+        title = render_text(get_text("controls.title"), 24, YELLOW)
         panel.blit(title, (panel_width // 2 - title.get_width() // 2, 10))
         
         # 绘制玩家1控制键
-        p1_title = render_text("玩家1控制:", 20, BLUE)
+        p1_title = render_text(get_text("controls.player1"), 20, BLUE)
         panel.blit(p1_title, (20, 40))
         
         p1_controls = [
-            "W - 跳跃",
-            "A - 左移",
-            "S - 蹲下",
-            "D - 右移",
-            "J - 轻拳",
-            "K - 重拳",
-            "L - 轻腿",
-            "; - 重腿",
-            "空格 - 格挡"
+            get_text("controls.jump", key="W"),
+            get_text("controls.left", key="A"),
+            get_text("controls.crouch", key="S"),
+            get_text("controls.right", key="D"),
+            get_text("controls.light_punch", key="J"),
+            get_text("controls.heavy_punch", key="K"),
+            get_text("controls.light_kick", key="L"),
+            get_text("controls.heavy_kick", key=";"),
+            get_text("controls.block", key=get_text("key.space"))
         ]
         
         # 绘制玩家2控制键
-        p2_title = render_text("玩家2控制:", 20, RED)
+        p2_title = render_text(get_text("controls.player2"), 20, RED)
         panel.blit(p2_title, (panel_width // 2 + 20, 40))
         
         p2_controls = [
-            "↑ - 跳跃",
-            "← - 左移",
-            "↓ - 蹲下",
-            "→ - 右移",
-            "小键盘1 - 轻拳",
-            "小键盘2 - 重拳",
-            "小键盘3 - 轻腿",
-            "小键盘4 - 重腿",
-            "小键盘0 - 格挡"
+            get_text("controls.jump", key=get_text("key.up")),
+            get_text("controls.left", key=get_text("key.left")),
+            get_text("controls.crouch", key=get_text("key.down")),
+            get_text("controls.right", key=get_text("key.right")),
+            get_text("controls.light_punch", key=get_text("key.keypad", key=1)),
+            get_text("controls.heavy_punch", key=get_text("key.keypad", key=2)),
+            get_text("controls.light_kick", key=get_text("key.keypad", key=3)),
+            get_text("controls.heavy_kick", key=get_text("key.keypad", key=4)),
+            get_text("controls.block", key=get_text("key.keypad", key=0))
         ]
         
         # 绘制控制说明
@@ -275,7 +276,7 @@ class CharacterSelect:
             # 如果是AI对战AI模式，切换到AI2选择
             if self.game.ai_vs_ai_mode:
                 self.selection_state = 1
-                self.player_text = "选择AI 2角色"
+                self.player_text = get_text("select.ai2")
                 self.player_text_surf = render_text(self.player_text, 36, WHITE)
             # 如果是AI模式，直接完成选择
             elif self.game.vsai_mode:
@@ -286,7 +287,7 @@ class CharacterSelect:
             else:
                 # 切换到玩家2选择
                 self.selection_state = 1
-                self.player_text = "玩家2选择"
+                self.player_text = get_text("select.player2")
                 self.player_text_surf = render_text(self.player_text, 36, WHITE)
         
         elif self.selection_state == 1:  # 玩家2/AI2选择
@@ -338,7 +339,7 @@ class CharacterSelect:
     
     def update(self):
         """更新界面状态"""
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.game.display.mouse_pos()  # 逻辑画面中的坐标
         
         # 更新角色卡片
         for card in self.character_cards:
@@ -376,12 +377,12 @@ class CharacterSelect:
         
         # 绘制选择提示
         if self.player1_selection is not None and not self.game.vsai_mode:
-            text = "玩家1: " + self.character_cards[self.player1_selection].character_name
+            text = get_text("select.player1_choice", name=self.character_cards[self.player1_selection].character_name)
             text_surf = render_text(text, 36, BLUE)
             screen.blit(text_surf, (50, 350))
         
         if self.player2_selection is not None and not self.game.vsai_mode:
-            text = "玩家2: " + self.character_cards[self.player2_selection].character_name
+            text = get_text("select.player2_choice", name=self.character_cards[self.player2_selection].character_name)
             text_surf = render_text(text, 36, RED)
             screen.blit(text_surf, (SCREEN_WIDTH - 250, 350))
         
@@ -392,11 +393,11 @@ class CharacterSelect:
             screen.blit(self.controls_panel, (panel_x, panel_y))
             
             # 绘制切换提示
-            toggle_text = render_text("按 H 键隐藏/显示控制说明", 16, YELLOW)
+            toggle_text = render_text(get_text("select.toggle_controls"), 16, YELLOW)
             toggle_rect = toggle_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 10))
             screen.blit(toggle_text, toggle_rect)
         else:
             # 如果控制面板隐藏，只显示简短提示
-            hint_text = render_text("按 H 键显示控制说明", 16, YELLOW)
+            hint_text = render_text(get_text("select.show_controls"), 16, YELLOW)
             hint_rect = hint_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 20))
             screen.blit(hint_text, hint_rect) 
\ No newline at end of file
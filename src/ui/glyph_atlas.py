@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+字形图集
+
+数字、标点和常用的界面文字（当前语言的"攻击冷却: "、"秒"）按字号和颜色预先渲染到一张Surface上，
+每个字形是这张Surface的子Surface。绘制倒计时、冷却时间、伤害数字时只是把几个子Surface
+依次blit到屏幕上，不需要每帧查找字体、打开字体文件和重新渲染文字。
+
+内容固定的文字（角色名称、模式标题等）整段渲染一次后缓存。
+"""
+
+import pygame
+from src.engine.font_utils import get_chinese_font, render_text
+from src.engine.i18n import get_text
+
+# 预先渲染的字符：数字和常用标点
+DIGITS = "0123456789.:-+%/ "
+
+# 常用的界面文字的消息编号（作为一个字形整体渲染）
+HUD_MESSAGES = ("fight.cooldown", "fight.seconds")
+
+# 整段文字和排版缓存的最大条数，超过时清空
+MAX_CACHED_TEXTS = 256
+
+
+class GlyphAtlas:
+    """一种字体、字号和颜色的字形图集"""
+    
+    def __init__(self, font, color, tokens=DIGITS):
+        """渲染所有字形到一张Surface
+        
+        Args:
+            font: pygame.font.Font
+            color: 文字颜色 (R, G, B)
+            tokens: 预先渲染的字形（字符串中的每个字符，或字符串的序列）
+        """
+        self.font = font
+        self.color = tuple(color[:3])
+        self.glyphs = {}
+        self.layouts = {}  # {字形序列: (总宽度, [(字形, x偏移)])}
+        tokens = list(dict.fromkeys(tokens))
+        surfaces = [font.render(token, True, self.color) for token in tokens]
+        self.height = max((surface.get_height() for surface in surfaces), default=font.get_linesize())
+        
+        width = sum(surface.get_width() for surface in surfaces)
+        self.sheet = pygame.Surface((max(1, width), self.height), pygame.SRCALPHA)
+        x = 0
+        for token, surface in zip(tokens, surfaces):
+            self.sheet.blit(surface, (x, 0))
+            self.glyphs[token] = self.sheet.subsurface((x, 0, surface.get_width(), surface.get_height()))
+            x += surface.get_width()
+    
+    def glyph(self, token):
+        """获取字形（不在图集中的字形单独渲染一次后保存）
+        
+        Args:
+            token: 字符或常用文字
+        
+        Returns:
+            Surface
+        """
+        surface = self.glyphs.get(token)
+        if surface is None:
+            surface = self.glyphs[token] = self.font.render(token, True, self.color)
+        return surface
+    
+    def size(self, tokens):
+        """文字的大小
+        
+        Args:
+            tokens: 字符串（逐字符）或字形序列
+        
+        Returns:
+            (宽, 高)
+        """
+        layout = self.layouts.get(tokens) or self._layout(tokens)
+        return layout[0], self.height
+    
+    def _layout(self, tokens):
+        """计算文字的排版并缓存
+        
+        Returns:
+            (总宽度, [(字形, x偏移)])
+        """
+        glyphs = []
+        width = 0
+        for token in tokens:
+            glyph = self.glyph(token)
+            glyphs.append((glyph, width))
+            width += glyph.get_width()
+        if len(self.layouts) >= MAX_CACHED_TEXTS:
+            self.layouts.clear()
+        layout = self.layouts[tokens] = (width, glyphs)
+        return layout
+    
+    def draw(self, surface, tokens, position, anchor="topleft", alpha=None):
+        """绘制文字
+        
+        Args:
+            surface: 目标Surface
+            tokens: 字符串（逐字符）或字形元组，如("攻击冷却: ", "0", ".", "5", "秒")
+            position: 锚点坐标
+            anchor: 锚点（pygame.Rect的属性名，如"center"）
+            alpha: 整体透明度（0-255），None表示不透明
+        
+        Returns:
+            绘制区域的pygame.Rect
+        """
+        layout = self.layouts.get(tokens)
+        if layout is None:
+            layout = self._layout(tokens)
+        width, glyphs = layout
+        rect = pygame.Rect(0, 0, width, self.height)
+        setattr(rect, anchor, position)
+        x, y = rect.topleft
+        if alpha is None:
+            surface.blits([(glyph, (x + offset, y)) for glyph, offset in glyphs], False)
+        else:
+            # 子Surface的透明度只影响自己，图集本身不变
+            for glyph, offset in glyphs:
+                glyph.set_alpha(alpha)
+                surface.blit(glyph, (x + offset, y))
+                glyph.set_alpha(None)
+        return rect
+
+
+_atlases = {}  # {(字号, 颜色, 是否中文字体): GlyphAtlas}
+_texts = {}    # {(文字, 字号, 颜色): Surface}
+
+
+def get_atlas(size, color, chinese=True):
+    """获取（第一次使用时创建）字形图集
+    
+    Args:
+        size: 字号
+        color: 文字颜色（只使用RGB）
+        chinese: 是否使用中文字体（与render_text一致），False表示pygame默认字体
+    
+    Returns:
+        GlyphAtlas
+    """
+    key = (size, tuple(color[:3]), chinese)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        if chinese:
+            tokens = tuple(DIGITS) + tuple(get_text(message_id) for message_id in HUD_MESSAGES)
+            atlas = GlyphAtlas(get_chinese_font(size), color, tokens)
+        else:
+            atlas = GlyphAtlas(pygame.font.Font(None, size), color)
+        _atlases[key] = atlas
+    return atlas
+
+
+def cached_text(text, size=32, color=(255, 255, 255)):
+    """渲染内容固定的文字并缓存（参见render_text）
+    
+    Args:
+        text: 文字
+        size: 字号
+        color: 文字颜色
+    
+    Returns:
+        Surface（不要修改）
+    """
+    key = (text, size, tuple(color))
+    surface = _texts.get(key)
+    if surface is None:
+        if len(_texts) >= MAX_CACHED_TEXTS:
+            _texts.clear()
+        surface = _texts[key] = render_text(text, size, color)
+    return surface
+
+
+def clear_text_caches():
+    """清除所有图集和文字缓存（更换字体后调用）"""
+    _atlases.clear()
+    _texts.clear()
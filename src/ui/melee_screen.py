@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多人混战界面
+
+4-8名AI角色在同一个场地中战斗，可以是各自为战的混战，也可以分队（如2对2团队战，
+同队角色之间不会互相命中）。角色之间的命中和推挤先用x轴排序扫描做粗检测，
+只对足够近的角色对做精确判定；每个AI控制器以离自己最近的威胁作为目标。
+"""
+
+import random
+import pygame
+from src.engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, STAGE_WIDTH, WHITE, BLUE, RED, GREEN, YELLOW, ROUND_TIME
+from src.engine.constants import GameState
+from src.engine.i18n import get_text
+from src.ui.glyph_atlas import get_atlas, cached_text
+from src.engine.rng import derive_seed
+from src.engine.broad_phase import SweepAndPrune
+from src.engine.combat_events import CombatEventQueue, CombatEventType
+from src.engine.quality import QualityGovernor
+from src.ui.attack_effects import AttackEffects
+from src.ai.ai_controller import AIController
+from src.characters.character import CharacterState, Direction, observe_target
+
+# 各队伍的颜色（血条和名称）
+TEAM_COLORS = [BLUE, RED, GREEN, YELLOW, (255, 128, 0), (200, 0, 200), (0, 200, 200), (160, 160, 160)]
+
+# AI的行为模式，按角色编号轮流分配
+BEHAVIOR_MODES = ("aggressive", "defensive", "balanced")
+
+# 正在出招并朝向自己的对手，在选择目标时视为近了这么多像素
+ATTACKING_THREAT_BONUS = 100
+
+
+class MeleeScreen(AttackEffects):
+    """多人混战界面"""
+    
+    def __init__(self, game, fighters, teams=None, ai_difficulty=2, seed=None, controller_factory=None):
+        """初始化多人混战
+        
+        Args:
+            game: 游戏实例
+            fighters: 角色列表（2-8个）
+            teams: 每个角色的队伍编号，None表示各自为战
+            ai_difficulty: AI难度 (1-3)
+            seed: 随机种子，None表示随机生成
+            controller_factory: 以(角色, 时钟, 种子)为参数返回控制器的函数，None时使用AIController
+        """
+        self.game = game
+        self.fighters = list(fighters)
+        self.teams = list(teams) if teams is not None else list(range(len(self.fighters)))
+        if len(self.teams) != len(self.fighters):
+            raise ValueError("队伍编号的数量必须与角色数量一致")
+        
+        self.sim_time = 0.0
+        self.round_time = ROUND_TIME
+        self.round_over = False
+        self.winner_team = None
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        
+        # 角色名称以"AI"开头，使用AI角色的朝向和判定规则
+        count = len(self.fighters)
+        spacing = (STAGE_WIDTH - 60 - self.fighters[0].width) / max(1, count - 1)
+        for index, fighter in enumerate(self.fighters):
+            fighter.name = f"AI {index + 1}"
+            fighter.player_index = index
+            fighter.x = 30 + index * spacing
+            fighter.y = 400 - fighter.height
+            fighter.direction = Direction.RIGHT if index < count / 2 else Direction.LEFT
+            fighter.sync_rect()
+        
+        # 每个角色的AI控制器，随机数流由战斗种子按角色编号派生
+        self.controllers = []
+        for index, fighter in enumerate(self.fighters):
+            controller_seed = derive_seed(self.seed, "ai", f"p{index + 1}")
+            if controller_factory is not None:
+                controller = controller_factory(fighter, self.get_sim_time, controller_seed)
+            else:
+                controller = AIController(fighter, ai_difficulty, BEHAVIOR_MODES[index % len(BEHAVIOR_MODES)],
+                                          clock=self.get_sim_time, seed=controller_seed)
+            self.controllers.append(controller)
+        
+        # 战斗事件：所有角色共用一个队列
+        self.combat_events = CombatEventQueue()
+        for fighter in self.fighters:
+            fighter.events = self.combat_events
+        self.combat_events.subscribe(self._on_attack_started, (CombatEventType.ATTACK_STARTED,))
+        self.combat_events.subscribe(self._on_hit, (CombatEventType.HIT,))
+        
+        # 攻击特效（与FightScreen相同），画质由游戏调节，无界面时保持最高档
+        self.effects = []
+        self.effect_triggers = []
+        self.quality = game.quality if hasattr(game, "quality") else QualityGovernor()
+        
+        # x轴排序扫描：命中检测的范围取所有角色中最远的招式距离，推挤只需要角色宽度
+        self.broad_phase = SweepAndPrune(self.fighters)
+        self.hit_reach = max(fighter.hit_reach() for fighter in self.fighters)
+        self.push_reach = max(fighter.width for fighter in self.fighters)
+        self.candidate_pairs = 0  # 上一帧粗检测得到的角色对数量（性能统计）
+        
+        # 每个角色当前的目标，以及目标的观察
+        self.targets = [None] * count
+        self._choose_targets()
+        
+        self.all_sprites = pygame.sprite.Group(*self.fighters)
+        self.background_color = (50, 50, 100)
+    
+    def get_sim_time(self):
+        """获取当前模拟时间（秒），作为AI控制器的时钟"""
+        return self.sim_time
+    
+    def close(self):
+        """离开界面时调用（与FightScreen接口一致）"""
+        pass
+    
+    def handle_event(self, event):
+        """处理事件
+        
+        Args:
+            event: pygame事件
+        """
+        if event.type == pygame.KEYUP and event.key == pygame.K_ESCAPE:
+            self.game.change_state(GameState.MAIN_MENU)
+    
+    def alive_teams(self):
+        """获取还有角色存活的队伍
+        
+        Returns:
+            队伍编号集合
+        """
+        return {team for fighter, team in zip(self.fighters, self.teams) if fighter.health > 0}
+    
+    def update(self):
+        """更新一帧"""
+        dt = 1.0 / 60
+        if self.round_over:
+            return
+        
+        self.sim_time += dt
+        self.round_time = max(0, ROUND_TIME - self.sim_time)
+        
+        # 只剩一个队伍或时间到时结束
+        alive_teams = self.alive_teams()
+        if self.round_time <= 0 or len(alive_teams) <= 1:
+            self.round_over = True
+            self.winner_team = self._decide_winner(alive_teams)
+            return
+        
+        self.combat_events.clear()
+        self.effect_triggers.clear()
+        fighters = self.fighters
+        for fighter in fighters:
+            fighter.command_log.clear()
+        
+        # AI控制（被击败的角色不再行动）
+        for fighter, controller, target in zip(fighters, self.controllers, self.targets):
+            if controller is not None and target is not None and fighter.health > 0:
+                controller.update(dt, target)
+        
+        # 第一阶段：所有角色移动
+        for fighter, target in zip(fighters, self.targets):
+            fighter.update_motion(dt, target if target is not None else fighter)
+        
+        # 粗检测：找出招式可能够到的角色对，每个角色的候选对手按距离从近到远排列
+        self.broad_phase.update()
+        candidates = [[] for _ in fighters]
+        pairs = self.broad_phase.pairs(self.hit_reach)
+        self.candidate_pairs = len(pairs)
+        for left, right, distance in pairs:
+            if self.teams[left.player_index] == self.teams[right.player_index]:
+                continue
+            if right.state != CharacterState.DEFEATED:
+                candidates[left.player_index].append((distance, right.player_index, right))
+            if left.state != CharacterState.DEFEATED:
+                candidates[right.player_index].append((distance, left.player_index, left))
+        
+        # 第二阶段：按编号顺序出招判定
+        for fighter, fighter_candidates in zip(fighters, candidates):
+            fighter_candidates.sort(key=lambda item: item[:2])
+            fighter.update_combat(dt, [item[2] for item in fighter_candidates])
+        
+        # 第三阶段：推开重叠的角色（包括队友）
+        for left, right, _ in self.broad_phase.pairs(self.push_reach):
+            left._handle_character_collision(right)
+        
+        for fighter in fighters:
+            fighter.sync_rect()
+        
+        # 推挤改变了位置，重新排序后为下一帧选择目标
+        self.broad_phase.update()
+        self._choose_targets()
+        
+        # 分发本帧的战斗事件（出招特效、音效等），再更新特效
+        if len(self.effects) > self.quality.settings.max_effects:
+            self._clean_effects()
+        self.combat_events.dispatch()
+        self._update_effects(dt)
+    
+    def _choose_targets(self):
+        """为每个角色选择最近的威胁作为目标，并刷新观察"""
+        for fighter in self.fighters:
+            fighter.observation.fill(fighter)
+        
+        for index, fighter in enumerate(self.fighters):
+            target = self._nearest_threat(fighter)
+            self.targets[index] = target
+            if target is not None:
+                observe_target(fighter, target)
+    
+    def _nearest_threat(self, fighter):
+        """找出离角色最近的威胁
+        
+        正在出招并朝向自己的对手视为近了ATTACKING_THREAT_BONUS像素。
+        利用排序扫描的顺序从近到远查找，找到的对手足够近后就停止。
+        
+        Args:
+            fighter: 角色
+        
+        Returns:
+            目标角色，没有存活的对手时返回None
+        """
+        team = self.teams[fighter.player_index]
+        best, best_score = None, None
+        for other, distance in self.broad_phase.nearby(fighter, STAGE_WIDTH):
+            # 后面的对手至少这么远，即使正在出招也不会更近
+            if best_score is not None and distance - ATTACKING_THREAT_BONUS > best_score:
+                break
+            if self.teams[other.player_index] == team or other.health <= 0:
+                continue
+            score = distance
+            if other.is_attacking and (other.direction == Direction.RIGHT) == (other.x < fighter.x):
+                score -= ATTACKING_THREAT_BONUS
+            if best_score is None or score < best_score:
+                best, best_score = other, score
+        return best
+    
+    def _decide_winner(self, alive_teams):
+        """决定胜利的队伍
+        
+        Args:
+            alive_teams: 还有角色存活的队伍
+        
+        Returns:
+            队伍编号，平局时返回None
+        """
+        if len(alive_teams) == 1:
+            return next(iter(alive_teams))
+        if not alive_teams:
+            return None
+        
+        # 时间到：剩余生命值总和最多的队伍获胜
+        totals = {}
+        for fighter, team in zip(self.fighters, self.teams):
+            if team in alive_teams:
+                totals[team] = totals.get(team, 0) + fighter.health
+        best = max(totals.values())
+        leaders = [team for team, total in totals.items() if total == best]
+        return leaders[0] if len(leaders) == 1 else None
+    
+    def _on_attack_started(self, event):
+        """出招事件：播放攻击音效并在攻击者身前创建攻击特效
+        
+        Args:
+            event: CombatEvent
+        """
+        attacker = event.attacker
+        sound = attacker.punch_sound if "punch" in event.move else attacker.kick_sound
+        if sound:
+            sound.play()
+        self._spawn_attacker_effect(attacker, event.move)
+    
+    def _on_hit(self, event):
+        """命中事件：播放受击音效
+        
+        Args:
+            event: CombatEvent
+        """
+        if event.defender.hit_sound:
+            event.defender.hit_sound.play()
+    
+    def render(self, screen):
+        """渲染
+        
+        Args:
+            screen: 屏幕对象
+        """
+        screen.fill(self.background_color)
+        pygame.draw.rect(screen, (100, 70, 40), (0, 400, SCREEN_WIDTH, SCREEN_HEIGHT - 400))
+        self.all_sprites.draw(screen)
+        self._render_effects(screen)
+        
+        # 每个角色头顶的小血条，颜色表示队伍
+        for fighter, team in zip(self.fighters, self.teams):
+            color = TEAM_COLORS[team % len(TEAM_COLORS)]
+            x, y = int(fighter.x), int(fighter.y) - 16
+            pygame.draw.rect(screen, (50, 50, 50), (x, y, fighter.width, 8))
+            pygame.draw.rect(screen, color, (x, y, int(fighter.width * max(0, fighter.health) / 100), 8))
+            pygame.draw.rect(screen, WHITE, (x, y, fighter.width, 8), 1)
+        
+        get_atlas(48, YELLOW).draw(screen, str(int(self.round_time)), (SCREEN_WIDTH // 2, 50), "center")
+        
+        if self.round_over:
+            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 128))
+            screen.blit(overlay, (0, 0))
+            if self.winner_team is None:
+                result_text = get_text("fight.draw")
+            elif len(set(self.teams)) == len(self.teams):
+                result_text = get_text("fight.wins", name=f"AI {self.winner_team + 1}")
+            else:
+                result_text = get_text("fight.wins", name=get_text("fight.team", number=self.winner_team + 1))
+            text_surf = cached_text(result_text, 72, WHITE)
+            screen.blit(text_surf, text_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50)))
+            hint_text = cached_text(get_text("fight.back_hint"), 36, YELLOW)
+            screen.blit(hint_text, hint_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50)))
@@ -4,8 +4,10 @@
 import pygame
 import os
 from src.engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, BLACK, BLUE, RED, GREEN, YELLOW
+from src.engine.config import AI_SEARCH_DIFFICULTY
 from src.engine.constants import GameState
 from src.engine.font_utils import get_chinese_font, render_text
+from src.engine.i18n import get_text
 
 class Button:
     """按钮类"""
@@ -90,14 +92,17 @@ class MainMenu:
         
         # 添加AI对战AI选项
         self.buttons = [
-            Button(center_x, 200, button_width, button_height, "对战玩家", WHITE, BLUE),
-            Button(center_x, 280, button_width, button_height, "对战机器学习AI", WHITE, (128, 0, 128)),  # 紫色
-            Button(center_x, 360, button_width, button_height, "AI对战AI", WHITE, (0, 128, 0)),  # 绿色
-            Button(center_x, 440, button_width, button_height, "退出游戏", WHITE, (100, 100, 100))
+            Button(center_x, 160, button_width, button_height, get_text("menu.vs_player"), WHITE, BLUE),
+            Button(center_x, 220, button_width, button_height, get_text("menu.vs_ml_ai"), WHITE, (128, 0, 128)),  # 紫色
+            Button(center_x, 280, button_width, button_height, get_text("menu.vs_search_ai"), WHITE, (0, 100, 160)),  # 蓝绿色
+            Button(center_x, 340, button_width, button_height, get_text("menu.ai_vs_ai"), WHITE, (0, 128, 0)),  # 绿色
+            Button(center_x, 400, button_width, button_height, get_text("menu.melee"), WHITE, (160, 100, 0)),  # 橙色
+            Button(center_x, 460, button_width, button_height, get_text("menu.team_battle"), WHITE, (160, 60, 0)),  # 深橙色
+            Button(center_x, 520, button_width, button_height, get_text("menu.quit"), WHITE, (100, 100, 100))
         ]
         
         # 标题
-        self.title_text = render_text("格斗之王", 72, WHITE)
+        self.title_text = render_text(get_text("menu.title"), 72, WHITE)
         self.title_rect = self.title_text.get_rect(center=(SCREEN_WIDTH // 2, 100))
     
     def handle_event(self, event):
@@ -121,14 +126,20 @@ class MainMenu:
             self.game.start_vs_player()
         elif button_index == 1:  # 对战机器学习AI
             self.game.start_vs_ai(3)  # 使用困难模式（会启动ML AI）
-        elif button_index == 2:  # AI对战AI
+        elif button_index == 2:  # 对战搜索AI
+            self.game.start_vs_ai(AI_SEARCH_DIFFICULTY)
+        elif button_index == 3:  # AI对战AI
             self.game.start_ai_vs_ai(2)  # 使用AI对战AI模式
-        elif button_index == 3:  # 退出游戏
+        elif button_index == 4:  # 4人混战
+            self.game.start_melee([0, 1, 2, 3])
+        elif button_index == 5:  # 2对2团队战
+            self.game.start_melee([0, 0, 1, 1])
+        elif button_index == 6:  # 退出游戏
             self.game.exit_game()
     
     def update(self):
         """更新菜单状态"""
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.game.display.mouse_pos()  # 逻辑画面中的坐标
         for button in self.buttons:
             button.update(mouse_pos)
     
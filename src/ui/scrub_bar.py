@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pygame
+from src.engine.config import FPS, WHITE, YELLOW
+from src.engine.font_utils import render_text
+from src.engine.i18n import get_text
+
+
+def format_frame_time(frame):
+    """把帧号格式化为 分:秒
+    
+    Args:
+        frame: 帧号
+    
+    Returns:
+        时间字符串
+    """
+    seconds = int(frame / FPS)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class ScrubBar:
+    """回放进度条：显示播放进度和关键帧位置，点击或拖动跳转"""
+    
+    def __init__(self, x, y, width, height, total_frames, keyframes=()):
+        """初始化进度条
+        
+        Args:
+            x: 进度条x坐标
+            y: 进度条y坐标
+            width: 进度条宽度
+            height: 进度条高度
+            total_frames: 回放总帧数
+            keyframes: 关键帧帧号列表
+        """
+        self.rect = pygame.Rect(x, y, width, height)
+        self.total_frames = max(1, total_frames)
+        self.keyframes = list(keyframes)
+        self.dragging = False
+        self.font_size = 20
+    
+    def frame_at(self, x):
+        """获取屏幕x坐标对应的帧号
+        
+        Args:
+            x: 屏幕x坐标
+        
+        Returns:
+            帧号
+        """
+        ratio = (x - self.rect.x) / self.rect.width
+        return int(round(max(0.0, min(1.0, ratio)) * self.total_frames))
+    
+    def _x_of(self, frame):
+        """获取帧号对应的屏幕x坐标"""
+        return self.rect.x + int(self.rect.width * frame / self.total_frames)
+    
+    def handle_event(self, event):
+        """处理鼠标事件
+        
+        Args:
+            event: pygame事件
+        
+        Returns:
+            需要跳转到的帧号，没有跳转时返回None
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            # 点击区域比进度条略高，方便操作
+            if self.rect.inflate(0, 16).collidepoint(event.pos):
+                self.dragging = True
+                return self.frame_at(event.pos[0])
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            return self.frame_at(event.pos[0])
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.dragging:
+            self.dragging = False
+            return self.frame_at(event.pos[0])
+        return None
+    
+    def draw(self, screen, frame, paused=False):
+        """绘制进度条
+        
+        Args:
+            screen: 屏幕对象
+            frame: 当前帧号
+            paused: 是否暂停
+        """
+        # 背景和已播放部分
+        pygame.draw.rect(screen, (40, 40, 40), self.rect)
+        played = self.rect.copy()
+        played.width = self._x_of(frame) - self.rect.x
+        pygame.draw.rect(screen, (70, 130, 220), played)
+        
+        # 关键帧刻度
+        for keyframe in self.keyframes:
+            x = self._x_of(keyframe)
+            pygame.draw.line(screen, (150, 150, 150), (x, self.rect.bottom - 4), (x, self.rect.bottom - 1))
+        
+        pygame.draw.rect(screen, WHITE, self.rect, 1)
+        
+        # 播放位置
+        x = self._x_of(frame)
+        pygame.draw.rect(screen, YELLOW, (x - 2, self.rect.y - 3, 4, self.rect.height + 6))
+        
+        # 时间
+        text = f"{format_frame_time(frame)} / {format_frame_time(self.total_frames)}"
+        if paused:
+            text += "  " + get_text("replay.paused")
+        text_surf = render_text(text, self.font_size, WHITE)
+        screen.blit(text_surf, (self.rect.x, self.rect.y - text_surf.get_height() - 4))